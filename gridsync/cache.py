@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+Short-lived caching of Tahoe-LAFS directory listings.
+"""
+
+import time
+
+from twisted.internet.defer import Deferred, maybeDeferred, succeed
+from twisted.python.failure import Failure
+
+
+class ListingCache:
+    """
+    A time-to-live cache for the results of fetching directory listings,
+    keyed by capability string.
+
+    Concurrent requests for a key that is not (or no longer) cached are
+    coalesced such that only one fetch is in-flight at any time and all
+    callers receive its result.
+
+    :ivar float ttl: The number of seconds for which a listing remains valid.
+
+    :ivar int hits: The number of lookups answered from the cache.
+
+    :ivar int misses: The number of lookups that required a new fetch.
+
+    :ivar int coalesced: The number of lookups that waited on an already
+        in-flight fetch instead of starting a new one.
+    """
+
+    def __init__(self, ttl=10, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = {}
+        self._pending = {}
+        self._stale = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key, fetch):
+        """
+        Return the cached value for ``key``, calling ``fetch`` to (re)load it
+        if it is missing or expired.
+
+        :param str key: The cache key (typically a directory capability).
+        :param fetch: A callable returning the value (or a Deferred firing
+            with the value) for ``key``. ``None`` results are not cached.
+
+        :return Deferred: A Deferred that fires with the value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires = entry
+            if self._clock() < expires:
+                self.hits += 1
+                return succeed(value)
+            del self._entries[key]
+        if key in self._pending:
+            self.coalesced += 1
+            d = Deferred()
+            self._pending[key].append(d)
+            return d
+        self.misses += 1
+        self._pending[key] = []
+        d = maybeDeferred(fetch)
+        d.addBoth(self._fetched, key)
+        return d
+
+    def _fetched(self, result, key):
+        waiters = self._pending.pop(key, [])
+        stale = key in self._stale
+        self._stale.discard(key)
+        if not isinstance(result, Failure) and result is not None:
+            if not stale:
+                self._prune()
+                self._entries[key] = (result, self._clock() + self.ttl)
+        for waiter in waiters:
+            if isinstance(result, Failure):
+                waiter.errback(result)
+            else:
+                waiter.callback(result)
+        return result
+
+    def _prune(self):
+        now = self._clock()
+        for key, (_, expires) in list(self._entries.items()):
+            if now >= expires:
+                del self._entries[key]
+
+    def invalidate(self, key):
+        """
+        Discard any cached value for ``key``. If a fetch for ``key`` is
+        currently in-flight, its result will be delivered to waiting callers
+        but not cached.
+        """
+        self._entries.pop(key, None)
+        if key in self._pending:
+            self._stale.add(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._stale.update(self._pending)
+
+    def get_stats(self):
+        """
+        :return dict: The number of hits, misses, and coalesced lookups so
+            far and the number of listings currently cached.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._entries),
+        }
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import multiprocessing
 import subprocess
 import sys
 
@@ -19,6 +20,9 @@ class TahoeVersion(argparse.Action):
 
 
 def main():
+    # Required for worker processes (e.g., those used when filtering logs)
+    # to start correctly from a frozen (PyInstaller) executable.
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description=description)
     parser.add_argument(
         "--debug", action="store_true", help="Print debug messages to STDOUT."
@@ -29,6 +33,12 @@ def main():
         action=TahoeVersion,
         help="Call 'tahoe --version-and-path' and exit. For debugging.",
     )
+    parser.add_argument(
+        "--startup-timeline",
+        action="store_true",
+        help="Print a timeline of each startup phase to STDOUT once all "
+        "gateways have connected.",
+    )
     parser.add_argument(
         "-V", "--version", action="version", version="%(prog)s " + __version__
     )
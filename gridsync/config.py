@@ -1,48 +1,152 @@
 # -*- coding: utf-8 -*-
 
+import os
+import threading
 from collections import defaultdict
 from configparser import NoOptionError, NoSectionError, RawConfigParser
+from contextlib import contextmanager
 
 from atomicwrites import atomic_write
 
 
+class _CachedFile:
+    """
+    The parsed contents of a config file, shared by all ``Config`` objects
+    for the same path.
+
+    :ivar tuple signature: The ``(st_ino, st_mtime_ns, st_size)`` of the
+        file when it was last read or written, or ``None`` if it did not
+        exist.
+
+    :ivar int batch_depth: The number of ``Config.batch`` blocks currently
+        open for this file.
+
+    :ivar bool dirty: Whether ``parser`` holds changes not yet written.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.signature = None
+        self.parser = None
+        self.batch_depth = 0
+        self.dirty = False
+
+
+_cache = {}  # type: dict
+_cache_lock = threading.Lock()
+
+
+def _get_cached_file(filename):
+    key = os.path.abspath(filename)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is None:
+            cached = _cache[key] = _CachedFile()
+        return cached
+
+
+def _get_signature(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
 class Config:
+    """
+    An ini-style config file.
+
+    Parsed contents are cached in-process (and shared between instances)
+    until the file's inode, modification time or size changes, so repeated
+    reads cost no more than a ``stat``.
+    """
+
     def __init__(self, filename):
         self.filename = filename
+        self._cached = _get_cached_file(filename)
 
-    def set(self, section, option, value):
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        if not config.has_section(section):
-            config.add_section(section)
-        config.set(section, option, value)
-        with atomic_write(self.filename, mode="w", overwrite=True) as f:
-            config.write(f)
+    def _get_parser(self):
+        cached = self._cached
+        if cached.dirty:  # Unwritten changes take precedence
+            return cached.parser
+        signature = _get_signature(self.filename)
+        if cached.parser is None or signature != cached.signature:
+            parser = RawConfigParser(allow_no_value=True)
+            parser.read(self.filename)
+            cached.parser = parser
+            cached.signature = signature
+        return cached.parser
 
-    def get(self, section, option):
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
+    def _write(self):
+        cached = self._cached
         try:
-            return config.get(section, option)
-        except (NoOptionError, NoSectionError):
-            return None
+            with atomic_write(self.filename, mode="w", overwrite=True) as f:
+                cached.parser.write(f)
+        except Exception:
+            cached.parser = None
+            raise
+        finally:
+            cached.dirty = False
+        cached.signature = _get_signature(self.filename)
 
-    def save(self, settings_dict):
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        for section, d in settings_dict.items():
+    def _changed(self):
+        if self._cached.batch_depth:
+            self._cached.dirty = True
+        else:
+            self._write()
+
+    @contextmanager
+    def batch(self):
+        """
+        Coalesce all changes made by ``set`` or ``save`` (via any ``Config``
+        for this file) within the block into a single write at its end.
+
+        Gridsync itself currently makes at most one change at a time to any
+        file (and ``save`` already writes several options at once), so this
+        is only of use to callers which make a series of changes.
+        """
+        cached = self._cached
+        with cached.lock:
+            cached.batch_depth += 1
+            try:
+                yield self
+            finally:
+                cached.batch_depth -= 1
+                if not cached.batch_depth and cached.dirty:
+                    self._write()
+
+    def set(self, section, option, value):
+        with self._cached.lock:
+            config = self._get_parser()
             if not config.has_section(section):
                 config.add_section(section)
-            for option, value in d.items():
-                config.set(section, option, value)
-        with atomic_write(self.filename, mode="w", overwrite=True) as f:
-            config.write(f)
+            config.set(section, option, value)
+            self._changed()
+
+    def get(self, section, option):
+        with self._cached.lock:
+            config = self._get_parser()
+            try:
+                return config.get(section, option)
+            except (NoOptionError, NoSectionError):
+                return None
+
+    def save(self, settings_dict):
+        with self._cached.lock:
+            config = self._get_parser()
+            for section, d in settings_dict.items():
+                if not config.has_section(section):
+                    config.add_section(section)
+                for option, value in d.items():
+                    config.set(section, option, value)
+            self._changed()
 
     def load(self):
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        settings_dict = defaultdict(dict)
-        for section in config.sections():
-            for option, value in config.items(section):
-                settings_dict[section][option] = value
-        return dict(settings_dict)
+        with self._cached.lock:
+            config = self._get_parser()
+            settings_dict = defaultdict(dict)
+            for section in config.sections():
+                for option, value in config.items(section):
+                    settings_dict[section][option] = value
+            return dict(settings_dict)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+Persistent HTTP connection pooling for talking to a Tahoe-LAFS web API.
+"""
+
+from twisted.web.client import HTTPConnectionPool
+
+
+class ConnectionPool(HTTPConnectionPool):
+    """
+    A keep-alive ``HTTPConnectionPool`` that counts how many requests were
+    served over a cached connection versus a newly-opened one.
+
+    :ivar int connections_opened: The number of new TCP connections opened.
+
+    :ivar int connections_reused: The number of requests that were sent over
+        an already-open (cached) connection.
+    """
+
+    def __init__(self, reactor, max_connections=None, idle_timeout=None):
+        super().__init__(reactor, persistent=True)
+        if max_connections is not None:
+            self.maxPersistentPerHost = max_connections
+        if idle_timeout is not None:
+            self.cachedConnectionTimeout = idle_timeout
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def getConnection(self, key, endpoint):
+        opened = self.connections_opened
+        d = super().getConnection(key, endpoint)
+        if self.connections_opened == opened:
+            self.connections_reused += 1
+        return d
+
+    def _newConnection(self, key, endpoint):
+        self.connections_opened += 1
+        return super()._newConnection(key, endpoint)
+
+    def get_stats(self):
+        """
+        :return dict: The number of connections opened and reused so far and
+            the number of idle connections currently held in the pool.
+        """
+        return {
+            "opened": self.connections_opened,
+            "reused": self.connections_reused,
+            "idle": sum(len(c) for c in self._connections.values()),
+        }
@@ -35,14 +35,16 @@ import qt5reactor
 qt5reactor.install()
 
 from twisted.internet import reactor
-from twisted.internet.defer import inlineCallbacks
+from twisted.internet.defer import DeferredList, inlineCallbacks
 from twisted.python.log import PythonLoggingObserver, startLogging
 
 from gridsync import APP_NAME, config_dir, msg, resource, settings
 from gridsync.gui import Gui
 from gridsync.lock import FilesystemLock
 from gridsync.preferences import get_preference, set_preference
+from gridsync.shutdown import ShutdownCoordinator
 from gridsync.tahoe import Tahoe, get_nodedirs, select_executable
+from gridsync.timeline import Timeline
 from gridsync.tor import get_tor
 
 app.setWindowIcon(QIcon(resource(settings["application"]["tray_icon"])))
@@ -65,6 +67,7 @@ class Core:
         self.executable = None
         self.tahoe_version = None
         self.operations = []
+        self.startup_timeline = Timeline()
         log_deque_maxlen = 100000  # XXX
         debug_settings = settings.get("debug")
         if debug_settings:
@@ -72,6 +75,15 @@ class Core:
             if log_maxlen is not None:
                 log_deque_maxlen = int(log_maxlen)
         self.log_deque = collections.deque(maxlen=log_deque_maxlen)
+        self.shutdown_coordinator = ShutdownCoordinator(reactor)
+        shutdown_settings = settings.get("shutdown")
+        if shutdown_settings:
+            deadline = shutdown_settings.get("deadline")
+            if deadline is not None:
+                self.shutdown_coordinator.deadline = float(deadline)
+            grace_period = shutdown_settings.get("grace_period")
+            if grace_period is not None:
+                self.shutdown_coordinator.grace_period = float(grace_period)
 
     @inlineCallbacks
     def select_executable(self):
@@ -96,38 +108,66 @@ class Core:
             if self.tahoe_version.startswith("tahoe-lafs: "):
                 self.tahoe_version = self.tahoe_version.lstrip("tahoe-lafs: ")
 
+    def _warn_tor_unavailable(self, tor_available):
+        if tor_available:
+            return
+        for gateway in self.gateways:
+            tcp = gateway.config_get("connections", "tcp")
+            if tcp == "tor":
+                logging.error("No running tor daemon found")
+                msg.error(
+                    self.gui.main_window,
+                    "Error Connecting To Tor Daemon",
+                    'The "{}" connection is configured to use Tor, '
+                    "however, no running tor daemon was found.\n\n"
+                    "This connection will be disabled until you launch "
+                    "Tor again.".format(gateway.name),
+                )
+
+    def _on_gateways_ready(self, _):
+        self.startup_timeline.log("Startup timeline")
+        if getattr(self.args, "startup_timeline", False):
+            print(self.startup_timeline.format("Startup timeline"))
+
     @inlineCallbacks
     def start_gateways(self):
+        # Steps that don't depend on one another -- Tor detection, probing
+        # the Tahoe-LAFS version, and starting each gateway -- all overlap.
+        timeline = self.startup_timeline
         nodedirs = get_nodedirs(config_dir)
         if nodedirs:
             minimize_preference = get_preference("startup", "minimize")
             if not minimize_preference or minimize_preference == "false":
                 self.gui.show_main_window()
-            yield self.select_executable()
-            tor_available = yield get_tor(reactor)
+            tor_d = timeline.track(get_tor(reactor), "get_tor")
+            yield timeline.track(self.select_executable(), "select_executable")
+            version_d = timeline.track(
+                self.get_tahoe_version(), "get_tahoe_version"
+            )
             logging.debug("Starting Tahoe-LAFS gateway(s)...")
+            ready = []
             for nodedir in nodedirs:
                 gateway = Tahoe(nodedir, executable=self.executable)
-                tcp = gateway.config_get("connections", "tcp")
-                if tcp == "tor" and not tor_available:
-                    logging.error("No running tor daemon found")
-                    msg.error(
-                        self.gui.main_window,
-                        "Error Connecting To Tor Daemon",
-                        'The "{}" connection is configured to use Tor, '
-                        "however, no running tor daemon was found.\n\n"
-                        "This connection will be disabled until you launch "
-                        "Tor again.".format(gateway.name),
-                    )
                 self.gateways.append(gateway)
-                d = gateway.start()
+                d = timeline.track(gateway.start(), "start", gateway.name)
                 d.addCallback(gateway.ensure_folder_links)
+                ready.append(
+                    timeline.track(
+                        gateway.await_ready(), "connect", gateway.name
+                    )
+                )
             self.gui.populate(self.gateways)
+            DeferredList(ready).addCallback(self._on_gateways_ready)
+            tor_available = yield tor_d
+            self._warn_tor_unavailable(tor_available)
         else:
             self.gui.show_welcome_dialog()
-            yield self.select_executable()
+            yield timeline.track(self.select_executable(), "select_executable")
+            version_d = timeline.track(
+                self.get_tahoe_version(), "get_tahoe_version"
+            )
         try:
-            yield self.get_tahoe_version()
+            yield version_d
         except Exception as e:  # pylint: disable=broad-except
             logging.critical("Error getting Tahoe-LAFS version")
             msg.critical(
@@ -136,6 +176,28 @@ class Core:
             )
             reactor.stop()
 
+    def get_gateways(self):
+        """
+        :return list: Every gateway in use: both those started at launch
+            and any added since (e.g., via the welcome dialog).
+        """
+        gateways = list(self.gateways)
+        if self.gui:
+            for gateway in self.gui.main_window.gateways:
+                if gateway not in gateways:
+                    gateways.append(gateway)
+        return gateways
+
+    def stop_gateways(self):
+        logging.debug("Stopping Tahoe-LAFS gateway(s)...")
+        d = self.shutdown_coordinator.stop_gateways(self.get_gateways())
+        d.addCallback(
+            lambda _: self.shutdown_coordinator.timeline.log(
+                "Shutdown timeline"
+            )
+        )
+        return d
+
     @staticmethod
     def show_message():
         message_settings = settings.get("message")
@@ -207,7 +269,11 @@ class Core:
         self.gui.show_systray()
 
         reactor.callLater(0, self.start_gateways)
+        reactor.addSystemEventTrigger("before", "shutdown", self.stop_gateways)
         reactor.run()
+        # Signal any gateways whose pidfiles remain (e.g., those that did not
+        # finish stopping before the shutdown deadline) once more.
         for nodedir in get_nodedirs(config_dir):
-            Tahoe(nodedir, executable=self.executable).kill()
+            if os.path.isfile(os.path.join(nodedir, "twistd.pid")):
+                Tahoe(nodedir, executable=self.executable).kill()
         lock.release()
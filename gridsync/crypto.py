@@ -3,9 +3,6 @@
 import hashlib
 
 from nacl.exceptions import CryptoError
-from nacl.pwhash import argon2id
-from nacl.secret import SecretBox
-from nacl.utils import random
 from PyQt5.QtCore import QObject, pyqtSignal
 
 from gridsync.util import b58decode, b58encode
@@ -20,6 +17,10 @@ class VersionError(CryptoError):
 
 
 def encrypt(message, password):
+    from nacl.pwhash import argon2id
+    from nacl.secret import SecretBox
+    from nacl.utils import random
+
     version = b"1"
     salt = random(argon2id.SALTBYTES)  # 16
     key = argon2id.kdf(
@@ -35,6 +36,9 @@ def encrypt(message, password):
 
 
 def decrypt(ciphertext, password):
+    from nacl.pwhash import argon2id
+    from nacl.secret import SecretBox
+
     version = ciphertext[:1]
     ciphertext = b58decode(ciphertext[1:].decode())
     if version == b"1":
@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import json
+import logging
+import multiprocessing
 import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
 
 from gridsync import autostart_file_path, config_dir, pkgdir
 from gridsync.crypto import trunchash
@@ -94,12 +101,78 @@ def get_filters(core):
     return filters
 
 
+def _build_trie(strings):
+    trie = {}
+    for string in strings:
+        node = trie
+        for char in string:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return trie
+
+
+def _trie_to_regex(node):
+    branches = []
+    for char in sorted(k for k in node if k):
+        literal = char
+        child = node[char]
+        # Collapse runs of single-child nodes into one literal so that the
+        # nesting depth of the pattern only grows at branch points.
+        while len(child) == 1 and "" not in child:
+            ((char, child),) = child.items()
+            literal += char
+        branches.append(re.escape(literal) + _trie_to_regex(child))
+    if not branches:
+        return ""
+    if "" in node:
+        # The greedy "?" prefers the longer continuation but falls back to
+        # ending the match here, yielding longest-match semantics.
+        return "(?:{})?".format("|".join(branches))
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:{})".format("|".join(branches))
+
+
+class Redactor:
+    """
+    Replaces every string in a list of filters with its mask in a single
+    pass over the input.
+
+    The filter strings are compiled into a trie-shaped regular expression,
+    so the cost of redaction grows with the length of the input (and of the
+    longest secret) but not with the number of filters. Where filter strings
+    overlap, the longest match wins; where the same string appears more than
+    once, the first mask given for it is used.
+
+    :param list filters: ``(string, mask)`` tuples, as returned by
+        ``get_filters``.
+    """
+
+    def __init__(self, filters):
+        self._masks = {}
+        for string, mask in filters:
+            if string and mask and string not in self._masks:
+                self._masks[string] = "<Filtered:{}>".format(mask)
+        if self._masks:
+            self._pattern = re.compile(
+                _trie_to_regex(_build_trie(self._masks))
+            )
+        else:
+            self._pattern = None
+
+    def _replace(self, match):
+        return self._masks[match.group(0)]
+
+    def redact(self, in_str):
+        if self._pattern is None:
+            return in_str
+        return self._pattern.sub(self._replace, in_str)
+
+
 def apply_filters(in_str, filters):
-    filtered = in_str
-    for s, mask in filters:
-        if s and mask:
-            filtered = filtered.replace(s, "<Filtered:{}>".format(mask))
-    return filtered
+    if not isinstance(filters, Redactor):
+        filters = Redactor(filters)
+    return filters.redact(in_str)
 
 
 def get_mask(string, tag, identifier=None):
@@ -114,174 +187,201 @@ def apply_filter(dictionary, key, tag, identifier=None):
         dictionary[key] = get_mask(value, tag, identifier=identifier)
 
 
-def _apply_filter_by_action_type(  # noqa: max-complexity=30
-    msg, action_type, identifier=None
-):
-    if action_type == "dirnode:add-file":
-        apply_filter(msg, "name", "Path")
-
-    elif action_type == "invite-to-magic-folder":
-        apply_filter(msg, "nickname", "MemberName")
-
-    elif action_type == "join-magic-folder":
-        apply_filter(msg, "local_dir", "Path")
-        apply_filter(msg, "invite_code", "InviteCode")
-
-    elif action_type == "magic-folder-db:update-entry":
-        apply_filter(msg, "last_downloaded_uri", "Capability")
-        apply_filter(msg, "last_uploaded_uri", "Capability")
-        apply_filter(msg, "relpath", "Path")
-
-    elif action_type == "magic-folder:add-pending":
-        apply_filter(msg, "relpath", "Path")
-
-    elif action_type == "magic-folder:downloader:get-latest-file":
-        apply_filter(msg, "name", "Path")
-
-    elif action_type == "magic-folder:full-scan":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:iteration":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:notified":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-        apply_filter(msg, "path", "Path")
-
-    elif action_type == "magic-folder:process-directory":
-        apply_filter(msg, "created_directory", "Path")
-
-    elif action_type == "magic-folder:process-item":
-        item = msg.get("item")
-        if item:
-            relpath = item.get("relpath")
-            if relpath:
-                msg["item"]["relpath"] = get_mask(relpath, "Path")
-
-    elif action_type == "magic-folder:processing-loop":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:remove-from-pending":
-        apply_filter(msg, "relpath", "Path")
-        pending = msg.get("pending")
-        if pending:
-            new = []
-            for path in pending:
-                new.append(get_mask(path, "Path"))
-            msg["pending"] = new
-
-    elif action_type == "magic-folder:rename-conflicted":
-        apply_filter(msg, "abspath_u", "Path")
-        apply_filter(msg, "replacement_path_u", "Path")
-        apply_filter(msg, "result", "Path")
+# Fields to redact from Tahoe-LAFS log messages, keyed by "action_type" or
+# "message_type". Each rule gives a (possibly dotted) field path, the tag for
+# the mask and, optionally, whether the caller-supplied identifier should be
+# used in place of a hash. Lists of values have each element masked.
+ACTION_TYPE_RULES = {
+    "dirnode:add-file": [("name", "Path")],
+    "invite-to-magic-folder": [("nickname", "MemberName")],
+    "join-magic-folder": [
+        ("local_dir", "Path"),
+        ("invite_code", "InviteCode"),
+    ],
+    "magic-folder-db:update-entry": [
+        ("last_downloaded_uri", "Capability"),
+        ("last_uploaded_uri", "Capability"),
+        ("relpath", "Path"),
+    ],
+    "magic-folder:add-pending": [("relpath", "Path")],
+    "magic-folder:downloader:get-latest-file": [("name", "Path")],
+    "magic-folder:full-scan": [("nickname", "GatewayName", True)],
+    "magic-folder:iteration": [("nickname", "GatewayName", True)],
+    "magic-folder:notified": [
+        ("nickname", "GatewayName", True),
+        ("path", "Path"),
+    ],
+    "magic-folder:process-directory": [("created_directory", "Path")],
+    "magic-folder:process-item": [("item.relpath", "Path")],
+    "magic-folder:processing-loop": [("nickname", "GatewayName", True)],
+    "magic-folder:remove-from-pending": [
+        ("relpath", "Path"),
+        ("pending", "Path"),
+    ],
+    "magic-folder:rename-conflicted": [
+        ("abspath_u", "Path"),
+        ("replacement_path_u", "Path"),
+        ("result", "Path"),
+    ],
+    "magic-folder:rename-deleted": [
+        ("abspath_u", "Path"),
+        ("result", "Path"),
+    ],
+    "magic-folder:scan-remote-dmd": [("nickname", "MemberName")],
+    "magic-folder:start-downloading": [("nickname", "GatewayName", True)],
+    "magic-folder:start-monitoring": [("nickname", "GatewayName", True)],
+    "magic-folder:start-uploading": [("nickname", "GatewayName", True)],
+    "magic-folder:stop": [("nickname", "GatewayName", True)],
+    "magic-folder:stop-monitoring": [("nickname", "GatewayName", True)],
+    "magic-folder:write-downloaded-file": [("abspath", "Path")],
+    "notify-when-pending": [("filename", "Path")],
+    "watchdog:inotify:any-event": [("path", "Path")],
+}
+
+MESSAGE_TYPE_RULES = {
+    "fni": [("info", "Event")],
+    "magic-folder:add-to-download-queue": [("relpath", "Path")],
+    "magic-folder:all-files": [("files", "Path")],
+    "magic-folder:downloader:get-latest-file:collective-scan": [
+        ("dmds", "MemberName")
+    ],
+    "magic-folder:item:status-change": [("relpath", "Path")],
+    "magic-folder:maybe-upload": [("relpath", "Path")],
+    "magic-folder:notified-object-disappeared": [("path", "Path")],
+    "magic-folder:remote-dmd-entry": [
+        ("relpath", "Path"),
+        ("remote_uri", "Capability"),
+        ("pathentry.last_downloaded_uri", "Capability"),
+        ("pathentry.last_uploaded_uri", "Capability"),
+    ],
+    "magic-folder:scan-batch": [("batch", "Path")],
+    "processing": [("info", "Event")],
+}
+
+
+def _apply_rule(msg, path, tag, use_identifier=False, identifier=None):
+    *parents, key = path.split(".")
+    for parent in parents:
+        msg = msg.get(parent)
+        if not isinstance(msg, dict):
+            return
+    value = msg.get(key)
+    if not value:
+        return
+    if isinstance(value, list):
+        msg[key] = [get_mask(v, tag) for v in value]
+    elif use_identifier:
+        msg[key] = get_mask(value, tag, identifier=identifier)
+    else:
+        msg[key] = get_mask(value, tag)
+
+
+def _apply_rules(msg, rules, identifier=None):
+    for rule in rules:
+        _apply_rule(msg, *rule, identifier=identifier)
+    return msg
 
-    elif action_type == "magic-folder:rename-deleted":
-        apply_filter(msg, "abspath_u", "Path")
-        apply_filter(msg, "result", "Path")
 
-    elif action_type == "magic-folder:scan-remote-dmd":
-        apply_filter(msg, "nickname", "MemberName")
+def filter_tahoe_log_message(message, identifier):
+    """
+    Redact the sensitive fields of a single JSON-encoded Tahoe-LAFS log
+    message. Every message is re-encoded with sorted keys, whether or not
+    its type has any redaction rules.
+    """
+    msg = json.loads(message)
 
-    elif action_type == "magic-folder:start-downloading":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
+    rules = ACTION_TYPE_RULES.get(msg.get("action_type"))
+    if rules:
+        _apply_rules(msg, rules, identifier)
 
-    elif action_type == "magic-folder:start-monitoring":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
+    rules = MESSAGE_TYPE_RULES.get(msg.get("message_type"))
+    if rules:
+        _apply_rules(msg, rules, identifier)
 
-    elif action_type == "magic-folder:start-uploading":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
+    return json.dumps(msg, sort_keys=True)
 
-    elif action_type == "magic-folder:stop":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
 
-    elif action_type == "magic-folder:stop-monitoring":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
+def _filter_tahoe_log_chunk(messages, identifier):
+    return [filter_tahoe_log_message(m, identifier) for m in messages]
 
-    elif action_type == "magic-folder:write-downloaded-file":
-        apply_filter(msg, "abspath", "Path")
 
-    elif action_type == "notify-when-pending":
-        apply_filter(msg, "filename", "Path")
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
-    elif action_type == "watchdog:inotify:any-event":
-        apply_filter(msg, "path", "Path")
 
-    return msg
+def filter_tahoe_log_messages(
+    messages, identifier, processes=None, chunk_size=20000
+):
+    """
+    Apply ``filter_tahoe_log_message`` to each of ``messages``.
+
+    If there is more than one ``chunk_size`` worth of messages, the chunks
+    are filtered in parallel by a pool of ``processes`` worker processes
+    (defaulting to the number of CPUs). With a single CPU, or if
+    ``processes`` is 1, all filtering happens in the calling process.
+
+    :return list[str]: The filtered messages, in their original order.
+    """
+    return list(
+        iter_filter_tahoe_log_messages(
+            messages, identifier, processes, chunk_size
+        )
+    )
 
 
-def _apply_filter_by_message_type(msg, message_type):  # noqa: max-complexity
-    if message_type == "fni":
-        apply_filter(msg, "info", "Event")
-
-    elif message_type == "magic-folder:add-to-download-queue":
-        apply_filter(msg, "relpath", "Path")
-
-    elif message_type == "magic-folder:all-files":
-        files = msg.get("files")
-        if files:
-            new = []
-            for path in files:
-                new.append(get_mask(path, "Path"))
-            msg["files"] = new
-
-    elif message_type == (
-        "magic-folder:downloader:get-latest-file:collective-scan"
-    ):
-        dmds = msg.get("dmds")
-        if dmds:
-            new = []
-            for dmd in dmds:
-                new.append(get_mask(dmd, "MemberName"))
-            msg["dmds"] = new
-
-    elif message_type == "magic-folder:item:status-change":
-        apply_filter(msg, "relpath", "Path")
-
-    elif message_type == "magic-folder:maybe-upload":
-        apply_filter(msg, "relpath", "Path")
-
-    elif message_type == "magic-folder:notified-object-disappeared":
-        apply_filter(msg, "path", "Path")
-
-    elif message_type == "magic-folder:remote-dmd-entry":
-        apply_filter(msg, "relpath", "Path")
-        apply_filter(msg, "remote_uri", "Capability")
-        pathentry = msg.get("pathentry")
-        if pathentry:
-            last_downloaded_uri = pathentry.get("last_downloaded_uri")
-            if last_downloaded_uri:
-                pathentry["last_downloaded_uri"] = get_mask(
-                    last_downloaded_uri, "Capability"
-                )
-            last_uploaded_uri = pathentry.get("last_uploaded_uri")
-            if last_uploaded_uri:
-                pathentry["last_uploaded_uri"] = get_mask(
-                    last_uploaded_uri, "Capability"
+def iter_filter_tahoe_log_messages(
+    messages, identifier, processes=None, chunk_size=20000
+):
+    """
+    Like ``filter_tahoe_log_messages`` but yield the filtered messages as
+    they become available, holding no more than two chunks per worker
+    process in memory at a time.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    chunks = _chunked(messages, chunk_size)
+    first = next(chunks, [])
+    second = next(chunks, None)
+    if second is None or processes == 1:
+        yield from _filter_tahoe_log_chunk(first, identifier)
+        if second is not None:
+            for chunk in chain([second], chunks):
+                yield from _filter_tahoe_log_chunk(chunk, identifier)
+        return
+    yield from _iter_filter_in_pool(
+        chain([first, second], chunks), identifier, processes
+    )
+
+
+def _iter_filter_in_pool(chunks, identifier, processes):
+    pending = deque()  # (chunk, future) tuples, oldest first
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            for chunk in chunks:
+                future = executor.submit(
+                    _filter_tahoe_log_chunk, chunk, identifier
                 )
-
-    elif message_type == "magic-folder:scan-batch":
-        batch = msg.get("batch")
-        if batch:
-            new = []
-            for path in batch:
-                new.append(get_mask(path, "Path"))
-            msg["batch"] = new
-
-    elif message_type == "processing":
-        apply_filter(msg, "info", "Event")
-
-    return msg
-
-
-def filter_tahoe_log_message(message, identifier):
-    msg = json.loads(message)
-
-    action_type = msg.get("action_type")
-    if action_type:
-        _apply_filter_by_action_type(msg, action_type, identifier)
-
-    message_type = msg.get("message_type")
-    if message_type:
-        _apply_filter_by_message_type(msg, message_type)
-
-    return json.dumps(msg, sort_keys=True)
+                pending.append((chunk, future))
+                if len(pending) >= 2 * processes:
+                    filtered = pending[0][1].result()
+                    pending.popleft()
+                    yield from filtered
+            while pending:
+                filtered = pending[0][1].result()
+                pending.popleft()
+                yield from filtered
+    except (BrokenProcessPool, OSError) as e:
+        logging.warning(
+            "Error filtering log in parallel (%s); falling back to serial",
+            str(e),
+        )
+        for chunk in chain([c for c, _ in pending], chunks):
+            yield from _filter_tahoe_log_chunk(chunk, identifier)
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""
+An index of the remote state of a magic-folder, as assembled from the
+upload DMDs of each of its members, and an on-disk store of the same.
+"""
+
+import json
+import logging
+import sqlite3
+from operator import itemgetter
+
+
+class FolderState:
+    """
+    The files known to exist (or to have been deleted) in a magic-folder.
+
+    Entries are keyed by ``(member, path)`` so that files which happen to
+    share a link-modification time can no longer clobber one another. A
+    secondary index of the most recent entry for each path (across all
+    members) and an mtime-ordered view are maintained alongside.
+
+    Each entry is a ``dict`` as produced by ``Tahoe._extract_metadata`` with
+    the additional keys "path" and "member".
+    """
+
+    def __init__(self, entries=None):
+        self._entries = {}
+        self._latest = {}
+        self._ordered = None
+        self.total_size = 0
+        if entries:
+            for entry in entries:
+                self.add(entry)
+
+    def add(self, entry):
+        key = (entry["member"], entry["path"])
+        previous = self._entries.get(key)
+        if previous is not None:
+            self.total_size -= previous["size"]
+        self._entries[key] = entry
+        self.total_size += entry["size"]
+        latest = self._latest.get(entry["path"])
+        if latest is None or entry["mtime"] >= latest["mtime"]:
+            self._latest[entry["path"]] = entry
+        self._ordered = None
+
+    def get(self, member, path):
+        return self._entries.get((member, path))
+
+    def latest(self, path):
+        """
+        :return dict: The most recently modified entry for ``path`` from any
+            member, or ``None`` if ``path`` is unknown.
+        """
+        return self._latest.get(path)
+
+    def values(self):
+        """
+        :return list: All entries, ordered from oldest to newest mtime.
+        """
+        if self._ordered is None:
+            self._ordered = sorted(
+                self._entries.values(), key=itemgetter("mtime")
+            )
+        return self._ordered
+
+    @property
+    def latest_mtime(self):
+        entries = self.values()
+        if entries:
+            return entries[-1]["mtime"]
+        return 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def diff(self, previous):
+        """
+        Compare this state against an earlier snapshot.
+
+        :param FolderState previous: The earlier snapshot.
+
+        :return list: ``(action, entry)`` tuples for each entry that is new
+            or has changed since ``previous``, ordered by mtime, where
+            ``action`` is one of "added", "created", "updated", "deleted"
+            or "restored".
+        """
+        changes = []
+        for entry in self.values():
+            path = entry["path"]
+            prev_entry = previous.get(entry["member"], path)
+            if (
+                prev_entry is not None
+                and prev_entry["mtime"] == entry["mtime"]
+            ):
+                continue
+            if entry["deleted"]:
+                action = "deleted"
+            else:
+                prev_entry = previous.latest(path)
+                if prev_entry:
+                    if prev_entry["deleted"]:
+                        action = "restored"
+                    else:
+                        action = "updated"
+                elif path.endswith("/"):
+                    action = "created"
+                else:
+                    action = "added"
+            changes.append((action, entry))
+        return changes
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    name TEXT PRIMARY KEY,
+    collective_dircap TEXT,
+    members TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    folder TEXT NOT NULL,
+    member TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    deleted INTEGER NOT NULL,
+    cap TEXT,
+    PRIMARY KEY (folder, member, path)
+);
+"""
+
+
+def _get_values(entry):
+    return (
+        entry["size"],
+        entry["mtime"],
+        bool(entry["deleted"]),
+        entry["cap"],
+    )
+
+
+class FolderStateStore:
+    """
+    A SQLite database holding the last-known members and ``FolderState`` of
+    each of a gateway's magic-folders, so that they can be shown at startup
+    before the first remote scan has completed.
+
+    Saving writes only the entries that changed since the previous save.
+
+    :ivar str path: The path of the database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._members = {}
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def load(self, name, collective_dircap=None):
+        """
+        :param str collective_dircap: If given, ignore any saved state
+            that belongs to a different collective (e.g., that of an
+            earlier folder with the same name).
+
+        :return tuple: A ``(members, FolderState)`` tuple, or ``None`` if
+            no usable state has been saved for the folder.
+        """
+        try:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT collective_dircap, members FROM folders "
+                "WHERE name = ?",
+                (name,),
+            ).fetchone()
+            if row is None:
+                return None
+            if collective_dircap and row[0] != collective_dircap:
+                return None
+            members = [tuple(member) for member in json.loads(row[1])]
+            rows = connection.execute(
+                "SELECT member, path, size, mtime, deleted, cap FROM entries "
+                "WHERE folder = ?",
+                (name,),
+            )
+            state = FolderState(
+                {
+                    "member": member,
+                    "path": path,
+                    "size": size,
+                    "mtime": mtime,
+                    "deleted": bool(deleted),
+                    "cap": cap,
+                }
+                for member, path, size, mtime, deleted, cap in rows
+            )
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            logging.warning(
+                'Error loading saved state of folder "%s": %s', name, str(e)
+            )
+            return None
+        self._members[name] = members
+        return members, state
+
+    def save(self, name, collective_dircap, members, state, previous=None):
+        """
+        :param FolderState previous: The state as last saved (or loaded),
+            relative to which changes are written. If ``None``, any state
+            saved previously is replaced entirely.
+
+        :return int: The number of entries written or removed, or ``None``
+            if the state could not be saved.
+        """
+        if previous is None:
+            previous = FolderState()
+            replace = True
+        else:
+            replace = False
+        upserts = []
+        for entry in state.values():
+            prev_entry = previous.get(entry["member"], entry["path"])
+            values = _get_values(entry)
+            if prev_entry is None or _get_values(prev_entry) != values:
+                upserts.append((name, entry["member"], entry["path"]) + values)
+        deletes = [
+            (name, entry["member"], entry["path"])
+            for entry in previous.values()
+            if (entry["member"], entry["path"]) not in state
+        ]
+        members = [tuple(member) for member in members]
+        if (
+            not replace
+            and not upserts
+            and not deletes
+            and self._members.get(name) == members
+        ):
+            return 0
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO folders VALUES (?, ?, ?)",
+                    (name, collective_dircap, json.dumps(members)),
+                )
+                if replace:
+                    connection.execute(
+                        "DELETE FROM entries WHERE folder = ?", (name,)
+                    )
+                connection.executemany(
+                    "DELETE FROM entries "
+                    "WHERE folder = ? AND member = ? AND path = ?",
+                    deletes,
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    upserts,
+                )
+        except sqlite3.Error as e:
+            logging.warning(
+                'Error saving state of folder "%s": %s', name, str(e)
+            )
+            self._members.pop(name, None)
+            return None
+        self._members[name] = members
+        return len(upserts) + len(deletes)
+
+    def delete(self, name):
+        self._members.pop(name, None)
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "DELETE FROM folders WHERE name = ?", (name,)
+                )
+                connection.execute(
+                    "DELETE FROM entries WHERE folder = ?", (name,)
+                )
+        except sqlite3.Error as e:
+            logging.warning(
+                'Error deleting saved state of folder "%s": %s', name, str(e)
+            )
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import gzip
 import logging
 import os
 import platform
@@ -24,7 +25,7 @@ from PyQt5.QtWidgets import (
 
 from gridsync import APP_NAME, __version__, resource
 from gridsync.desktop import get_clipboard_modes, set_clipboard_text
-from gridsync.filter import apply_filters, get_filters, get_mask
+from gridsync.filter import Redactor, get_filters, get_mask
 from gridsync.msg import error
 
 if sys.platform == "darwin":
@@ -64,48 +65,156 @@ warning_text = (
 
 
 class LogLoader(QObject):
+    """
+    Assembles the debug log from the application's own log and those of
+    each gateway's Tahoe-LAFS node.
+
+    The log is produced lazily, a line at a time, by ``iter_chunks``, so
+    that it can be written out without ever being held in memory in its
+    entirety. ``load`` only retains a preview -- the last ``preview_lines``
+    lines of each section -- for display.
+    """
 
     done = pyqtSignal()
 
-    def __init__(self, core):
+    def __init__(self, core, preview_lines=5000):
         super().__init__()
         self.core = core
+        self.preview_lines = preview_lines
         self.content = ""
         self.filtered_content = ""
 
-    def load(self):
-        start_time = time.time()
-        self.content = (
+    def iter_sections(self, filtered=False, tail=None):
+        """
+        Yield a ``(preamble, lines, postamble, count)`` tuple for each
+        section of the debug log, where ``lines`` is an iterable of ``str``
+        (only the last ``tail`` of them, if given) and ``count`` is the
+        total number of lines in the section.
+        """
+        preamble = (
             header
             + "Tahoe-LAFS:   {}\n".format(self.core.tahoe_version)
             + "Datetime:     {}\n\n\n".format(datetime.utcnow().isoformat())
             + warning_text
             + "\n----- Beginning of {} debug log -----\n".format(APP_NAME)
-            + "\n".join(self.core.log_deque)
-            + "\n----- End of {} debug log -----\n".format(APP_NAME)
         )
-        filters = get_filters(self.core)
-        self.filtered_content = apply_filters(self.content, filters)
+        postamble = "\n----- End of {} debug log -----\n".format(APP_NAME)
+        lines = list(self.core.log_deque)
+        count = len(lines)
+        if tail is not None:
+            lines = lines[max(0, count - tail) :]
+        if filtered:
+            redactor = Redactor(get_filters(self.core))
+            yield (
+                redactor.redact(preamble),
+                (redactor.redact(line) for line in lines),
+                redactor.redact(postamble),
+                count,
+            )
+        else:
+            yield preamble, lines, postamble, count
         for i, gateway in enumerate(self.core.gui.main_window.gateways):
             gateway_id = str(i + 1)
-            gateway_mask = get_mask(gateway.name, "GatewayName", gateway_id)
-            self.content = self.content + (
-                "\n----- Beginning of Tahoe-LAFS log for {0} -----\n{1}"
-                "\n----- End of Tahoe-LAFS log for {0} -----\n".format(
-                    gateway.name, gateway.get_log()
+            if filtered:
+                gateway_label = get_mask(
+                    gateway.name, "GatewayName", gateway_id
                 )
+            else:
+                gateway_label = gateway.name
+            yield (
+                "\n----- Beginning of Tahoe-LAFS log for {} -----\n".format(
+                    gateway_label
+                ),
+                gateway.iter_log(
+                    apply_filter=filtered, identifier=gateway_id, tail=tail
+                ),
+                "\n----- End of Tahoe-LAFS log for {} -----\n".format(
+                    gateway_label
+                ),
+                gateway.get_log_line_count(apply_filter=filtered),
             )
-            self.filtered_content = self.filtered_content + (
-                "\n----- Beginning of Tahoe-LAFS log for {0} -----\n{1}"
-                "\n----- End of Tahoe-LAFS log for {0} -----\n".format(
-                    gateway_mask,
-                    gateway.get_log(apply_filter=True, identifier=gateway_id),
+
+    def iter_chunks(self, filtered=False):
+        """
+        Yield the debug log as a sequence of ``str`` chunks which, when
+        concatenated, form the complete log.
+        """
+        for preamble, lines, postamble, _ in self.iter_sections(filtered):
+            yield preamble
+            for i, line in enumerate(lines):
+                yield "\n" + line if i else line
+            yield postamble
+
+    def _build_preview(self, filtered=False):
+        # Only the tail of each section is filtered (or re-encoded) at all
+        parts = []
+        sections = self.iter_sections(filtered, tail=self.preview_lines)
+        for preamble, lines, postamble, count in sections:
+            lines = list(lines)
+            parts.append(preamble)
+            if count > len(lines):
+                parts.append(
+                    "[{} earlier lines omitted from preview; export to a "
+                    "file to include them]\n".format(count - len(lines))
                 )
-            )
+            parts.append("\n".join(lines))
+            parts.append(postamble)
+        return "".join(parts)
+
+    def load(self):
+        start_time = time.time()
+        self.content = self._build_preview()
+        self.filtered_content = self._build_preview(filtered=True)
         self.done.emit()
         logging.debug("Loaded logs in %f seconds", time.time() - start_time)
 
 
+class LogExporter(QObject):
+    """
+    Writes the debug log produced by a ``LogLoader`` to ``dest``, streaming
+    it (gzip-compressed, if ``dest`` ends with ".gz") a line at a time.
+
+    :ivar pyqtSignal progress: Emitted periodically with the (approximate)
+        number of lines written so far.
+    """
+
+    done = pyqtSignal()
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int)
+
+    def __init__(self, log_loader, progress_interval=10000):
+        super().__init__()
+        self.log_loader = log_loader
+        self.progress_interval = progress_interval
+        self.dest = ""
+        self.filtered = True
+
+    def _write(self, f):
+        count = 0
+        for chunk in self.log_loader.iter_chunks(self.filtered):
+            f.write(chunk)
+            count += 1
+            if count % self.progress_interval == 0:
+                self.progress.emit(count)
+
+    def export(self):
+        start_time = time.time()
+        try:
+            if self.dest.endswith(".gz"):
+                with atomic_write(self.dest, mode="wb", overwrite=True) as f:
+                    with gzip.open(f, "wt", encoding="utf-8") as gz:
+                        self._write(gz)
+            else:
+                with atomic_write(self.dest, mode="w", overwrite=True) as f:
+                    self._write(f)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error("%s: %s", type(e).__name__, str(e))
+            self.failed.emit(str(e))
+            return
+        logging.debug("Exported logs in %f seconds", time.time() - start_time)
+        self.done.emit()
+
+
 class DebugExporter(QDialog):
     def __init__(self, core, parent=None):
         super().__init__(parent=None)
@@ -118,6 +227,14 @@ class DebugExporter(QDialog):
         self.log_loader.done.connect(self.on_loaded)
         self.log_loader_thread.started.connect(self.log_loader.load)
 
+        self.log_exporter = LogExporter(self.log_loader)
+        self.log_exporter_thread = QThread()
+        self.log_exporter.moveToThread(self.log_exporter_thread)
+        self.log_exporter.done.connect(self.on_exported)
+        self.log_exporter.failed.connect(self.on_export_failed)
+        self.log_exporter.progress.connect(self.on_export_progress)
+        self.log_exporter_thread.started.connect(self.log_exporter.export)
+
         self.setMinimumSize(800, 600)
         self.setWindowTitle("{} - Debug Information".format(APP_NAME))
 
@@ -227,20 +344,38 @@ class DebugExporter(QDialog):
         self.close()
 
     def export_to_file(self):
+        if self.log_exporter_thread.isRunning():
+            logging.warning("LogExporter thread is already running; returning")
+            return
         dest, _ = QFileDialog.getSaveFileName(
             self,
             "Select a destination",
             os.path.join(
                 os.path.expanduser("~"), APP_NAME + " Debug Information.txt"
             ),
+            "Text files (*.txt);;Gzip-compressed text files (*.txt.gz)",
         )
         if not dest:
             return
-        try:
-            with atomic_write(dest, mode="w", overwrite=True) as f:
-                f.write(self.plaintextedit.toPlainText())
-        except Exception as e:  # pylint: disable=broad-except
-            logging.error("%s: %s", type(e).__name__, str(e))
-            error(self, "Error exporting debug information", str(e))
-            return
+        self.log_exporter.dest = dest
+        self.log_exporter.filtered = self.checkbox.checkState() == Qt.Checked
+        self.export_button.setEnabled(False)
+        self.export_button.setText("Exporting...")
+        self.log_exporter_thread.start()
+
+    def _on_export_finished(self):
+        self.log_exporter_thread.quit()
+        self.log_exporter_thread.wait()
+        self.export_button.setText("Export to file...")
+        self.export_button.setEnabled(True)
+
+    def on_export_progress(self, count):
+        self.export_button.setText("Exporting ({:,} lines)...".format(count))
+
+    def on_exported(self):
+        self._on_export_finished()
         self.close()
+
+    def on_export_failed(self, message):
+        self._on_export_finished()
+        error(self, "Error exporting debug information", message)
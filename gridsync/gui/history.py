@@ -2,235 +2,453 @@
 
 import os
 import time
+from bisect import bisect_left
+from collections import OrderedDict
 from datetime import datetime
 
 from humanize import naturalsize, naturaltime
-from PyQt5.QtCore import QFileInfo, Qt, QTimer
-from PyQt5.QtGui import QCursor, QIcon, QPixmap
+from PyQt5.QtCore import (
+    QAbstractListModel,
+    QEvent,
+    QFileInfo,
+    QModelIndex,
+    QPoint,
+    QRect,
+    QSize,
+    Qt,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt5.QtGui import QCursor, QFontMetrics, QIcon, QImageReader, QPixmap
 from PyQt5.QtWidgets import (
     QAbstractItemView,
     QAction,
     QFileIconProvider,
     QGridLayout,
-    QLabel,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMenu,
-    QPushButton,
-    QSizePolicy,
-    QSpacerItem,
+    QStyle,
+    QStyledItemDelegate,
     QWidget,
 )
 
-from gridsync import resource
+from gridsync import resource, settings
 from gridsync.desktop import open_enclosing_folder, open_path
 from gridsync.gui.color import BlendedColor
 from gridsync.gui.font import Font
 from gridsync.gui.status import StatusPanel
 
+HistoryItemRole = Qt.UserRole
 
-class HistoryItemWidget(QWidget):
-    def __init__(self, gateway, folder_name, data, parent):
-        super().__init__()
-        self.gateway = gateway
-        self.data = data
-        self.parent = parent
 
-        self.path = data["path"]
-        self.size = data["size"]
-        self.action = data["action"]
-        self.mtime = data["mtime"]
-        self._thumbnail_loaded = False
+class HistoryItem:
+    """
+    A single entry of a gateway's file history (i.e., the most recent
+    change made by ``member`` to the file at ``path``).
 
-        self.setAutoFillBackground(True)
+    :ivar str path: The local path of the file, if the directory of the
+        magic-folder it belongs to is known, otherwise its path within the
+        folder.
+    """
 
-        directory = self.gateway.get_magic_folder_directory(folder_name)
-        if directory:
-            self.path = os.path.join(directory, self.path)
-        self.basename = os.path.basename(os.path.normpath(self.path))
+    __slots__ = ("path", "member", "action", "size", "mtime")
 
-        self.setToolTip(
-            "{}\n\nSize: {}\nModified: {}".format(
-                self.path, naturalsize(self.size), time.ctime(self.mtime)
-            )
+    def __init__(self, path, member, action, size, mtime):
+        self.path = path
+        self.member = member
+        self.action = action
+        self.size = size
+        self.mtime = mtime
+
+    @classmethod
+    def from_data(cls, data, directory=None):
+        path = data["path"]
+        if directory:
+            path = os.path.join(directory, path)
+        return cls(
+            path, data["member"], data["action"], data["size"], data["mtime"]
         )
 
-        self.icon = QLabel()
-        self.icon.setPixmap(
-            QFileIconProvider().icon(QFileInfo(self.path)).pixmap(48, 48)
+    @property
+    def key(self):
+        return (self.member, self.path)
+
+    @property
+    def basename(self):
+        return os.path.basename(os.path.normpath(self.path))
+
+    @property
+    def details(self):
+        return "{} {}".format(
+            self.action.capitalize(),
+            naturaltime(datetime.fromtimestamp(self.mtime)),
         )
 
-        self.basename_label = QLabel(self.basename)
-        self.basename_label.setFont(Font(11))
-
-        self.details_label = QLabel()
-        self.details_label.setFont(Font(10))
-        palette = self.palette()
-        dimmer_grey = BlendedColor(
-            palette.text().color(), palette.base().color(), 0.6
-        ).name()
-        self.details_label.setStyleSheet("color: {}".format(dimmer_grey))
-
-        self.button = QPushButton()
-        self.button.setIcon(QIcon(resource("dots-horizontal-triple.png")))
-        self.button.setStyleSheet("border: none;")
-        self.button.clicked.connect(self.parent.on_right_click)
-        self.button.hide()
-
-        self.layout = QGridLayout(self)
-        self.layout.addWidget(self.icon, 1, 1, 2, 2)
-        self.layout.addWidget(self.basename_label, 1, 3)
-        self.layout.addWidget(self.details_label, 2, 3)
-        self.layout.addItem(QSpacerItem(0, 0, QSizePolicy.Expanding, 0), 4, 4)
-        self.layout.addWidget(self.button, 1, 5, 2, 2)
-
-        self.update_text()
-        QTimer.singleShot(50, self.load_thumbnail)
-
-    def update_text(self):
-        self.details_label.setText(
-            "{} {}".format(
-                self.action.capitalize(),
-                naturaltime(datetime.fromtimestamp(self.mtime)),
-            )
+    @property
+    def tooltip(self):
+        return "{}\n\nSize: {}\nModified: {}".format(
+            self.path, naturalsize(self.size), time.ctime(self.mtime)
         )
 
-    def _do_load_thumbnail(self):
-        pixmap = QPixmap(self.path)
-        if not pixmap.isNull():
-            self.icon.setPixmap(
-                pixmap.scaled(
-                    48, 48, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
-                )
-            )
 
-    def load_thumbnail(self):
-        if self.isVisible() and not self._thumbnail_loaded:
-            self._thumbnail_loaded = True
-            QTimer.singleShot(50, self._do_load_thumbnail)
-
-    def unhighlight(self):
-        self.button.hide()
-        palette = self.palette()
-        palette.setColor(self.backgroundRole(), self.parent.base_color)
-        self.setPalette(palette)
-
-    def enterEvent(self, _):
-        self.button.show()
-        palette = self.palette()
-        palette.setColor(self.backgroundRole(), self.parent.highlighted_color)
-        self.setPalette(palette)
-        if self.parent.highlighted and self.parent.highlighted is not self:
-            try:
-                self.parent.highlighted.unhighlight()
-            except RuntimeError:  # Object has been deleted
-                pass
-        self.parent.highlighted = self
-
-
-class HistoryListWidget(QListWidget):
-    def __init__(self, gateway, deduplicate=True, max_items=30):
-        super().__init__()
-        self.gateway = gateway
+class HistoryModel(QAbstractListModel):
+    """
+    The ``max_items`` most recent ``HistoryItem`` objects, newest first.
+
+    Items are kept in a plain list (along with a parallel list of sort keys
+    for bisection) and, if ``deduplicate`` is set, indexed by their
+    ``(member, path)`` key so that an item replacing an older change to the
+    same file can be found without scanning every row.
+
+    :ivar int reset_threshold: The size of a batch above which the model is
+        rebuilt (and reset) in one pass rather than one row at a time.
+    """
+
+    def __init__(self, deduplicate=True, max_items=100000, parent=None):
+        super().__init__(parent)
         self.deduplicate = deduplicate
         self.max_items = max_items
+        self.reset_threshold = 256
+        self._items = []
+        self._sort_keys = []  # -mtime, parallel to _items
+        self._index = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        item = self._items[index.row()]
+        if role == HistoryItemRole:
+            return item
+        if role == Qt.DisplayRole:
+            return item.basename
+        if role == Qt.ToolTipRole:
+            return item.tooltip
+        return None
+
+    def item(self, row):
+        return self._items[row]
+
+    def _find_row(self, item):
+        row = bisect_left(self._sort_keys, -item.mtime)
+        while self._items[row] is not item:
+            row += 1
+        return row
+
+    def _remove(self, item):
+        row = self._find_row(item)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        del self._sort_keys[row]
+        self.endRemoveRows()
+        del self._index[item.key]
+
+    def _trim(self):
+        count = len(self._items)
+        if count <= self.max_items:
+            return
+        self.beginRemoveRows(QModelIndex(), self.max_items, count - 1)
+        removed = self._items[self.max_items :]
+        del self._items[self.max_items :]
+        del self._sort_keys[self.max_items :]
+        self.endRemoveRows()
+        if self.deduplicate:
+            for item in removed:
+                del self._index[item.key]
+
+    def add_item(self, item):
+        if self.deduplicate:
+            duplicate = self._index.get(item.key)
+            if duplicate is not None:
+                self._remove(duplicate)
+        # Newest on top; of items with the same mtime, the last added.
+        row = bisect_left(self._sort_keys, -item.mtime)
+        if row >= self.max_items:
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.insert(row, item)
+        self._sort_keys.insert(row, -item.mtime)
+        self.endInsertRows()
+        if self.deduplicate:
+            self._index[item.key] = item
+        self._trim()
+
+    def _rebuild(self, items):
+        kept = self._items
+        if self.deduplicate:
+            replaced = self._index_of(items)
+            kept = [i for i in kept if i.key not in replaced]
+        # Sorting is stable, so reversing the batch first puts the last of
+        # any items with the same mtime on top -- as ``add_item`` would.
+        merged = sorted(items[::-1], key=lambda i: -i.mtime)
+        merged = sorted(merged + kept, key=lambda i: -i.mtime)
+        del merged[self.max_items :]
+        self.beginResetModel()
+        self._items = merged
+        self._sort_keys = [-i.mtime for i in merged]
+        if self.deduplicate:
+            self._index = {i.key: i for i in merged}
+        self.endResetModel()
+
+    @staticmethod
+    def _index_of(items):
+        return {i.key: i for i in items}
+
+    def add_items(self, items):
+        items = sorted(items, key=lambda i: i.mtime)
+        if self.deduplicate:
+            # Only the newest change to each file in a batch could remain.
+            newest = self._index_of(items)
+            items = [i for i in items if newest[i.key] is i]
+        if len(items) > self.reset_threshold:
+            self._rebuild(items)
+            return
+        for item in items:
+            self.add_item(item)
 
-        palette = self.palette()
+    def clear(self):
+        self.beginResetModel()
+        self._items = []
+        self._sort_keys = []
+        self._index = {}
+        self.endResetModel()
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    """
+    Paints the rows of a ``HistoryListView`` -- an icon (or a thumbnail, for
+    images), the file's name and a description of the change -- so that no
+    widgets need to be created per row.
+
+    Thumbnails are loaded shortly after the row is first painted (i.e.,
+    only for rows that have been scrolled into view) and the most recently
+    used ``max_thumbnails`` of them are cached.
+    """
+
+    action_button_clicked = pyqtSignal(QPoint)
+
+    icon_size = 48
+    margin = 9
+
+    def __init__(self, parent, max_thumbnails=256):
+        super().__init__(parent)
+        self.max_thumbnails = max_thumbnails
+
+        palette = parent.palette()
         self.base_color = palette.base().color()
         self.highlighted_color = BlendedColor(
             self.base_color, palette.highlight().color(), 0.88
         )  # Was #E6F1F7
-        self.highlighted = None
+        self.dimmer_grey = BlendedColor(
+            palette.text().color(), self.base_color, 0.6
+        )
 
         self.action_icon = QIcon(resource("dots-horizontal-triple.png"))
+        self.basename_font = Font(11)
+        self.details_font = Font(10)
+        text_height = (
+            QFontMetrics(self.basename_font).height()
+            + QFontMetrics(self.details_font).height()
+        )
+        self.row_height = max(self.icon_size, text_height) + 2 * self.margin
+
+        self._icon_provider = QFileIconProvider()
+        self._file_icons = {}
+        self._image_suffixes = {
+            bytes(fmt).decode().lower()
+            for fmt in QImageReader.supportedImageFormats()
+        }
+        self._thumbnails = OrderedDict()
+        self._pending_thumbnails = OrderedDict()  # In order requested
+
+    def sizeHint(self, option, _index):
+        return QSize(option.rect.width(), self.row_height)
+
+    def get_file_icon(self, path):
+        suffix = os.path.splitext(path)[1].lower()
+        pixmap = self._file_icons.get(suffix)
+        if pixmap is None:
+            pixmap = self._icon_provider.icon(QFileInfo(path)).pixmap(
+                self.icon_size, self.icon_size
+            )
+            self._file_icons[suffix] = pixmap
+        return pixmap
+
+    def load_thumbnails(self):
+        for key in self._pending_thumbnails:
+            pixmap = QPixmap(key[0])
+            if pixmap.isNull():
+                self._thumbnails[key] = None
+            else:
+                self._thumbnails[key] = pixmap.scaled(
+                    self.icon_size,
+                    self.icon_size,
+                    Qt.IgnoreAspectRatio,
+                    Qt.SmoothTransformation,
+                )
+        self._pending_thumbnails.clear()
+        while len(self._thumbnails) > self.max_thumbnails:
+            self._thumbnails.popitem(last=False)
+        self.parent().viewport().update()
+
+    def get_pixmap(self, item):
+        suffix = os.path.splitext(item.path)[1].lower().lstrip(".")
+        if suffix in self._image_suffixes:
+            key = (item.path, item.mtime)
+            if key in self._thumbnails:
+                self._thumbnails.move_to_end(key)
+                thumbnail = self._thumbnails[key]
+                if thumbnail is not None:
+                    return thumbnail
+            elif key not in self._pending_thumbnails:
+                if not self._pending_thumbnails:
+                    QTimer.singleShot(50, self.load_thumbnails)
+                self._pending_thumbnails[key] = None
+        return self.get_file_icon(item.path)
+
+    def get_action_rect(self, rect):
+        size = self.icon_size // 2
+        return QRect(
+            rect.right() - self.margin - size,
+            rect.top() + (rect.height() - size) // 2,
+            size,
+            size,
+        )
+
+    def paint(self, painter, option, index):
+        item = index.data(HistoryItemRole)
+        if item is None:
+            return
+        rect = option.rect
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        painter.save()
+        if hovered:
+            painter.fillRect(rect, self.highlighted_color)
+        icon_rect = QRect(
+            rect.left() + self.margin,
+            rect.top() + (rect.height() - self.icon_size) // 2,
+            self.icon_size,
+            self.icon_size,
+        )
+        painter.drawPixmap(icon_rect, self.get_pixmap(item))
+
+        left = icon_rect.right() + self.margin
+        right = rect.right() - self.margin
+        if hovered:
+            action_rect = self.get_action_rect(rect)
+            self.action_icon.paint(painter, action_rect)
+            right = action_rect.left() - self.margin
+        width = max(0, right - left)
+        middle = rect.top() + rect.height() // 2
+
+        painter.setFont(self.basename_font)
+        painter.setPen(option.palette.text().color())
+        painter.drawText(
+            QRect(left, rect.top(), width, middle - rect.top()),
+            Qt.AlignLeft | Qt.AlignBottom,
+            QFontMetrics(self.basename_font).elidedText(
+                item.basename, Qt.ElideMiddle, width
+            ),
+        )
+        painter.setFont(self.details_font)
+        painter.setPen(self.dimmer_grey)
+        painter.drawText(
+            QRect(left, middle, width, rect.bottom() - middle),
+            Qt.AlignLeft | Qt.AlignTop,
+            QFontMetrics(self.details_font).elidedText(
+                item.details, Qt.ElideRight, width
+            ),
+        )
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and self.get_action_rect(option.rect).contains(event.pos())
+        ):
+            self.action_button_clicked.emit(event.pos())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+class HistoryListView(QListView):
+    def __init__(self, gateway, deduplicate=True, max_items=100000):
+        super().__init__()
+        self.gateway = gateway
+
+        self.setModel(HistoryModel(deduplicate, max_items, self))
+        self.delegate = HistoryItemDelegate(self)
+        self.setItemDelegate(self.delegate)
 
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.setFocusPolicy(Qt.NoFocus)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        # self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.setSelectionMode(QAbstractItemView.NoSelection)
-        # self.setStyleSheet("QListWidget::item:hover { background: #E6F1F7 }")
         self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        # Every row is the same height, so the view needn't measure them all
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover)
 
-        self.sb = self.verticalScrollBar()
-
-        self.sb.valueChanged.connect(self.update_visible_widgets)
-        self.itemDoubleClicked.connect(self.on_double_click)
+        self.doubleClicked.connect(self.on_double_click)
         self.customContextMenuRequested.connect(self.on_right_click)
+        self.delegate.action_button_clicked.connect(self.on_right_click)
 
-        self.gateway.monitor.file_updated.connect(self.add_item)
-        self.gateway.monitor.check_finished.connect(
-            self.update_visible_widgets
-        )
+        self.gateway.monitor.file_updates_batched.connect(self.add_items)
+        self.gateway.monitor.check_finished.connect(self.update_visible_rows)
 
-    def on_double_click(self, item):
-        open_enclosing_folder(self.itemWidget(item).path)
+    def on_double_click(self, index):
+        open_enclosing_folder(self.model().item(index.row()).path)
 
     def on_right_click(self, position):
         if not position:
             position = self.viewport().mapFromGlobal(QCursor().pos())
-        item = self.itemAt(position)
-        if not item:
+        index = self.indexAt(position)
+        if not index.isValid():
             return
-        widget = self.itemWidget(item)
+        path = self.model().item(index.row()).path
         menu = QMenu(self)
         open_file_action = QAction("Open file")
-        open_file_action.triggered.connect(lambda: open_path(widget.path))
+        open_file_action.triggered.connect(lambda: open_path(path))
         menu.addAction(open_file_action)
         open_folder_action = QAction("Open enclosing folder")
         open_folder_action.triggered.connect(
-            lambda: self.on_double_click(item)
+            lambda: self.on_double_click(index)
         )
         menu.addAction(open_folder_action)
         menu.exec_(self.viewport().mapToGlobal(position))
 
     def add_item(self, folder_name, data):
-        duplicate = None
-        if self.deduplicate:
-            for i in range(self.count()):
-                widget = self.itemWidget(self.item(i))
-                if (
-                    widget
-                    and widget.data["path"] == data["path"]
-                    and widget.data["member"] == data["member"]
-                ):
-                    duplicate = i
-                    break
-        if duplicate is not None:
-            item = self.takeItem(duplicate)
-        else:
-            self.takeItem(self.max_items)
-            item = QListWidgetItem()
-        self.insertItem(0 - int(data["mtime"]), item)  # Newest on top
-        custom_widget = HistoryItemWidget(
-            self.gateway, folder_name, data, self
+        directory = self.gateway.get_magic_folder_directory(folder_name)
+        self.model().add_item(HistoryItem.from_data(data, directory))
+
+    def add_items(self, folder_name, items):
+        directory = self.gateway.get_magic_folder_directory(folder_name)
+        self.model().add_items(
+            [HistoryItem.from_data(data, directory) for data in items]
         )
-        item.setSizeHint(custom_widget.sizeHint())
-        self.setItemWidget(item, custom_widget)
 
-    def update_visible_widgets(self):
-        if not self.isVisible():
-            return
-        rect = self.viewport().contentsRect()
-        top = self.indexAt(rect.topLeft())
-        if top.isValid():
-            bottom = self.indexAt(rect.bottomLeft())
-            if not bottom.isValid():
-                bottom = self.model().index(self.count() - 1)
-            for index in range(top.row(), bottom.row() + 1):
-                widget = self.itemWidget(self.item(index))
-                if widget:
-                    widget.update_text()
-                    widget.load_thumbnail()
-
-    def showEvent(self, _):
-        self.update_visible_widgets()
+    def update_visible_rows(self):
+        # The "details" text (e.g., "Added 5 minutes ago") is generated when
+        # a row is painted, so refreshing it only requires a repaint.
+        if self.isVisible():
+            self.viewport().update()
 
 
 class HistoryView(QWidget):
-    def __init__(self, gateway, gui, deduplicate=True, max_items=30):
+    def __init__(self, gateway, gui, deduplicate=True, max_items=None):
         super().__init__()
+        if max_items is None:
+            max_items = 100000
+            history_settings = settings.get("history")
+            if history_settings and history_settings.get("max_items"):
+                max_items = int(history_settings.get("max_items"))
         layout = QGridLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(HistoryListWidget(gateway, deduplicate, max_items))
+        layout.addWidget(HistoryListView(gateway, deduplicate, max_items))
         layout.addWidget(StatusPanel(gateway, gui))
@@ -26,19 +26,13 @@ from PyQt5.QtWidgets import (
 )
 from twisted.internet import reactor
 from twisted.internet.defer import CancelledError, inlineCallbacks
-from wormhole.errors import (
-    LonelyError,
-    ServerConnectionError,
-    WelcomeError,
-    WrongPasswordError,
-)
 
 from gridsync import APP_NAME, resource
 from gridsync.desktop import get_clipboard_modes, get_clipboard_text
 from gridsync.errors import UpgradeRequiredError
 from gridsync.gui.color import BlendedColor
 from gridsync.gui.font import Font
-from gridsync.invite import is_valid_code, wordlist
+from gridsync.invite import get_wordlist, is_valid_code
 from gridsync.tor import get_tor
 
 
@@ -68,7 +62,7 @@ class InviteCodeLineEdit(QLineEdit):
         super().__init__()
         self.parent = parent
         model = QStringListModel()
-        model.setStringList(wordlist)
+        model.setStringList(get_wordlist())
         completer = InviteCodeCompleter()
         completer.setModel(model)
         self.setFont(Font(16))
@@ -371,6 +365,13 @@ class InviteCodeWidget(QWidget):
 
 
 def show_failure(failure, parent=None):
+    from wormhole.errors import (
+        LonelyError,
+        ServerConnectionError,
+        WelcomeError,
+        WrongPasswordError,
+    )
+
     msg = QMessageBox(parent)
     msg.setIcon(QMessageBox.Warning)
     msg.setStandardButtons(QMessageBox.Retry)
@@ -4,7 +4,14 @@ import logging
 import os
 import sys
 
-from PyQt5.QtCore import QFileInfo, QItemSelectionModel, QSize, Qt, QTimer
+from PyQt5.QtCore import (
+    QEvent,
+    QFileInfo,
+    QItemSelectionModel,
+    QSize,
+    Qt,
+    QTimer,
+)
 from PyQt5.QtGui import QIcon, QKeySequence
 from PyQt5.QtWidgets import (
     QAction,
@@ -557,7 +564,15 @@ class MainWindow(QMainWindow):
             event.ignore()
             self.confirm_quit()
 
+    def changeEvent(self, event):
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            for gateway in self.gateways:
+                gateway.monitor.wake()
+        super().changeEvent(event)
+
     def showEvent(self, _):
+        for gateway in self.gateways:
+            gateway.monitor.wake()
         if self.pending_news_message:
             gateway, title, message = self.pending_news_message
             self.pending_news_message = ()
@@ -13,7 +13,6 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
     QSpacerItem,
 )
-from zxcvbn import zxcvbn
 
 from gridsync import resource
 from gridsync.gui.font import Font
@@ -96,6 +95,8 @@ class PasswordDialog(QDialog):
             self.rating_label.setText("")
             self.progressbar.setValue(0)
             return
+        from zxcvbn import zxcvbn
+
         res = zxcvbn(text)
         t = res["crack_times_display"]["offline_slow_hashing_1e4_per_second"]
         self.time_label.setText("Time to crack: {}".format(t))
@@ -5,7 +5,6 @@ import os
 import sys
 from datetime import datetime
 
-import wormhole.errors
 from PyQt5.QtCore import QFileInfo, Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
 from PyQt5.QtWidgets import (
@@ -263,7 +262,9 @@ class InviteSenderDialog(QDialog):
                         view.model().on_members_updated(folder, [None, None])
 
     def handle_failure(self, failure):
-        if failure.type == wormhole.errors.LonelyError:
+        from wormhole.errors import LonelyError
+
+        if failure.type == LonelyError:
             return
         logging.error(str(failure))
         show_failure(failure, self)
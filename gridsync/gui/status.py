@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from humanize import naturalsize
+from humanize import naturaldelta, naturalsize
 from PyQt5.QtCore import QSize, Qt
 from PyQt5.QtGui import QIcon, QMovie
 from PyQt5.QtWidgets import (
@@ -30,6 +30,9 @@ class StatusPanel(QWidget):
         self.num_connected = 0
         self.num_known = 0
         self.available_space = 0
+        self.transfer_progress = None
+        self.transfer_speed = None
+        self.seconds_remaining = None
 
         self.checkmark_icon = QLabel()
         self.checkmark_icon.setPixmap(Pixmap("checkmark.png", 20))
@@ -98,6 +101,15 @@ class StatusPanel(QWidget):
         )
         self.gateway.monitor.space_updated.connect(self.on_space_updated)
         self.gateway.monitor.nodes_updated.connect(self.on_nodes_updated)
+        self.gateway.monitor.total_transfer_progress_updated.connect(
+            self.on_transfer_progress_updated
+        )
+        self.gateway.monitor.total_transfer_speed_updated.connect(
+            self.on_transfer_speed_updated
+        )
+        self.gateway.monitor.total_transfer_seconds_remaining_updated.connect(
+            self.on_transfer_seconds_remaining_updated
+        )
 
         self.on_sync_state_updated(0)
 
@@ -122,7 +134,7 @@ class StatusPanel(QWidget):
             self.syncing_icon.hide()
             self.checkmark_icon.hide()
         elif self.state == 1:
-            self.status_label.setText("Syncing")
+            self.status_label.setText("Syncing" + self._transfer_details())
             self.checkmark_icon.hide()
             self.syncing_icon.show()
             self.sync_movie.setPaused(False)
@@ -132,22 +144,54 @@ class StatusPanel(QWidget):
             self.syncing_icon.hide()
             self.checkmark_icon.show()
         if self.available_space:
-            self.status_label.setToolTip(
+            tooltip = (
                 "Connected to {} of {} storage nodes\n{} available".format(
                     self.num_connected, self.num_known, self.available_space
                 )
             )
         else:
-            self.status_label.setToolTip(
-                "Connected to {} of {} storage nodes".format(
-                    self.num_connected, self.num_known
-                )
+            tooltip = "Connected to {} of {} storage nodes".format(
+                self.num_connected, self.num_known
+            )
+        if self.state == 1 and self.transfer_speed:
+            tooltip += "\nTransferring at {}/s".format(
+                naturalsize(self.transfer_speed)
+            )
+        self.status_label.setToolTip(tooltip)
+
+    def _transfer_details(self):
+        if not self.transfer_progress:
+            return ""
+        bytes_transferred, bytes_total = self.transfer_progress
+        details = " ({} of {}".format(
+            naturalsize(bytes_transferred), naturalsize(bytes_total)
+        )
+        if self.seconds_remaining is not None:
+            details += "; {} remaining".format(
+                naturaldelta(self.seconds_remaining)
             )
+        return details + ")"
 
     def on_sync_state_updated(self, state):
+        if state != 1:
+            self.transfer_progress = None
+            self.transfer_speed = None
+            self.seconds_remaining = None
         self.state = state
         self._update_status_label()
 
+    def on_transfer_progress_updated(self, bytes_transferred, bytes_total):
+        self.transfer_progress = (bytes_transferred, bytes_total)
+        self._update_status_label()
+
+    def on_transfer_speed_updated(self, speed):
+        self.transfer_speed = speed
+        self._update_status_label()
+
+    def on_transfer_seconds_remaining_updated(self, seconds_remaining):
+        self.seconds_remaining = seconds_remaining
+        self._update_status_label()
+
     def on_space_updated(self, space):
         self.available_space = naturalsize(space)
         self._update_status_label()
@@ -20,11 +20,6 @@ from PyQt5.QtWidgets import (
 )
 from twisted.internet import reactor
 from twisted.internet.defer import CancelledError
-from wormhole.errors import (
-    ServerConnectionError,
-    WelcomeError,
-    WrongPasswordError,
-)
 
 from gridsync import APP_NAME, resource
 from gridsync import settings as global_settings
@@ -329,6 +324,12 @@ class WelcomeDialog(QStackedWidget):
         self.page_2.icon_overlay.setPixmap(Pixmap(filepath, 100))
 
     def handle_failure(self, failure):
+        from wormhole.errors import (
+            ServerConnectionError,
+            WelcomeError,
+            WrongPasswordError,
+        )
+
         log.error(str(failure))
         if failure.type == CancelledError:
             if self.progressbar.value() <= 2:
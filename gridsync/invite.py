@@ -7,15 +7,9 @@ from PyQt5.QtCore import QObject
 from PyQt5.QtCore import pyqtSignal as Signal
 from twisted.internet.defer import DeferredList, inlineCallbacks
 
-try:
-    from wormhole.wordlist import raw_words
-except ImportError:  # TODO: Switch to new magic-wormhole completion API?
-    from wormhole._wordlist import raw_words
-
 from gridsync import pkgdir
 from gridsync.setup import SetupRunner, validate_settings
 from gridsync.util import b58encode
-from gridsync.wormhole_ import Wormhole
 
 cheatcodes = []
 try:
@@ -25,12 +19,28 @@ except OSError:
     pass
 
 
-wordlist = []  # type: list
-for word in raw_words.items():
-    wordlist.extend(word[1])
-for c in cheatcodes:
-    wordlist.extend(c.split("-"))
-wordlist = sorted([word.lower() for word in wordlist])
+_wordlist = []  # type: list
+
+
+def get_wordlist():
+    """
+    :return list: The (sorted, lower-case) words which may appear in an
+        invite code. Built on first use, since doing so requires importing
+        magic-wormhole.
+    """
+    if not _wordlist:
+        try:
+            from wormhole.wordlist import raw_words
+        except ImportError:  # TODO: Switch to new magic-wormhole API?
+            from wormhole._wordlist import raw_words
+
+        words = []
+        for word in raw_words.items():
+            words.extend(word[1])
+        for c in cheatcodes:
+            words.extend(c.split("-"))
+        _wordlist.extend(sorted([word.lower() for word in words]))
+    return _wordlist
 
 
 def load_settings_from_cheatcode(cheatcode):
@@ -48,6 +58,7 @@ def is_valid_code(code):
         return False
     if not words[0].isdigit():
         return False
+    wordlist = get_wordlist()
     if not words[1] in wordlist:
         return False
     if not words[2] in wordlist:
@@ -89,6 +100,8 @@ class InviteReceiver(QObject):
         self.setup_runner.joined_folders.connect(self.joined_folders.emit)
         self.setup_runner.done.connect(self.done.emit)
 
+        from gridsync.wormhole_ import Wormhole
+
         self.wormhole = Wormhole(use_tor)
         self.wormhole.got_welcome.connect(self.got_welcome.emit)
         self.wormhole.got_introduction.connect(self.got_introduction.emit)
@@ -134,6 +147,8 @@ class InviteSender(QObject):
         super().__init__()
         self.use_tor = use_tor
 
+        from gridsync.wormhole_ import Wormhole
+
         self.wormhole = Wormhole(use_tor)
         self.wormhole.got_welcome.connect(self.got_welcome.emit)
         self.wormhole.got_code.connect(self.got_code.emit)
@@ -3,12 +3,15 @@
 import logging
 import os
 import sys
+import time
 
 try:
     import fcntl
 except ImportError:  # win32
     pass
 
+from twisted.internet.defer import Deferred, DeferredLock, succeed
+
 from gridsync.errors import FilesystemLockError
 
 
@@ -61,3 +64,102 @@ class FilesystemLock:
             os.remove(self.filepath)
         except OSError:
             pass
+
+
+class KeyedDeferredLock:
+    """
+    A set of ``DeferredLock``s, one per key (e.g., the capability of the
+    directory being modified), such that operations on the same key are
+    serialized (in the order requested) while operations on different keys
+    may proceed concurrently. Locks are created on demand and discarded
+    once no longer held or awaited.
+
+    :ivar int acquisitions: The number of times any lock has been acquired.
+
+    :ivar int contended: The number of acquisitions that had to wait for
+        another holder of the same lock.
+
+    :ivar float total_wait: The total number of seconds spent waiting.
+
+    :ivar float max_wait: The longest single wait, in seconds.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._locks = {}
+        self._idle_waiters = []
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def locked(self):
+        """
+        Whether any lock is currently held.
+        """
+        return bool(self._locks)
+
+    def is_locked(self, key):
+        return key in self._locks
+
+    def _acquired(self, result, started):
+        wait = self._clock() - started
+        self.acquisitions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return result
+
+    def acquire(self, key):
+        """
+        :return Deferred: A Deferred that fires once the lock for ``key``
+            has been acquired.
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = DeferredLock()
+        elif lock.locked:
+            self.contended += 1
+        d = lock.acquire()
+        d.addCallback(self._acquired, self._clock())
+        return d
+
+    def release(self, key):
+        lock = self._locks[key]
+        lock.release()
+        # Releasing may have handed the lock to (and run) the next waiter,
+        # which may itself have released it already.
+        if (
+            not lock.locked
+            and not lock.waiting
+            and self._locks.get(key) is lock
+        ):
+            del self._locks[key]
+            if not self._locks:
+                waiters, self._idle_waiters = self._idle_waiters, []
+                for waiter in waiters:
+                    waiter.callback(None)
+
+    def when_idle(self):
+        """
+        :return Deferred: A Deferred that fires once no lock is held.
+        """
+        if not self._locks:
+            return succeed(None)
+        d = Deferred()
+        self._idle_waiters.append(d)
+        return d
+
+    def get_stats(self):
+        """
+        :return dict: The number of acquisitions and contended acquisitions
+            so far, the total and longest times spent waiting, and the
+            number of locks currently held.
+        """
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "total_wait": self.total_wait,
+            "max_wait": self.max_wait,
+            "held": len(self._locks),
+        }
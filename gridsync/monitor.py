@@ -1,14 +1,26 @@
 # -*- coding: utf-8 -*-
 
+import json
 import logging
+import os
+import random
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from PyQt5.QtCore import QObject, pyqtSignal
-from twisted.internet.defer import inlineCallbacks
-from twisted.internet.task import LoopingCall
-
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredLock,
+    DeferredSemaphore,
+    inlineCallbacks,
+    succeed,
+)
+
+from gridsync import settings
 from gridsync.crypto import trunchash
+from gridsync.folderstate import FolderState
+from gridsync.transfers import OperationsTable, RateEstimator
 
 
 class MagicFolderChecker(QObject):
@@ -45,13 +57,17 @@ class MagicFolderChecker(QObject):
         self.size = 0
 
         self.members = []
-        self.history = {}
-        self.operations = {}
+        self.history = FolderState()
+        self.operations = OperationsTable()
+        self.rate_estimator = RateEstimator()
 
         self.updated_files = []
         self.initial_scan_completed = False
 
         self.sync_time_started = 0
+        self._lock = DeferredLock()
+        self._saved_history = None
+        self._scanned_size = 0
 
     def notify_updated_files(self):
         changes = defaultdict(list)
@@ -72,30 +88,32 @@ class MagicFolderChecker(QObject):
                 author = ""  # XXX
                 self.files_updated.emit(files, action, author)
 
-    def emit_transfer_signals(self, status):
+    def emit_transfer_signals(self, status=None):
+        """
+        :param list status: The tasks to report on, as returned by the
+            magic-folder "status" API. If not given, report on the
+            operations recorded by ``parse_status``.
+        """
+        if status is None:
+            operations = self.operations
+        else:
+            operations = OperationsTable()
+            operations.update(status, self.sync_time_started)
         # This does not take into account erasure coding overhead
-        bytes_transferred = 0
-        bytes_total = 0
-        for task in status:
-            if task["queued_at"] >= self.sync_time_started:
-                size = task["size"]
-                if not size:
-                    continue
-                if task["status"] in ("queued", "started", "success"):
-                    bytes_total += size
-                if task["status"] in ("started", "success"):
-                    # A (temporary?) workaround for Tahoe-LAFS ticket #2954
-                    # whereby 'percent_done' will sometimes exceed 100%
-                    # https://tahoe-lafs.org/trac/tahoe-lafs/ticket/2954
-                    percent_done = min(100, task["percent_done"])
-                    bytes_transferred += size * percent_done / 100
+        bytes_transferred, bytes_total = operations.get_progress(
+            self.sync_time_started
+        )
         if bytes_transferred and bytes_total:
             self.transfer_progress_updated.emit(bytes_transferred, bytes_total)
-            duration = time.time() - self.sync_time_started
-            speed = bytes_transferred / duration
+            speed = self.rate_estimator.update(
+                bytes_transferred, time.time(), self.sync_time_started
+            )
+            if not speed:
+                return
             self.transfer_speed_updated.emit(speed)
-            bytes_remaining = bytes_total - bytes_transferred
-            seconds_remaining = bytes_remaining / speed
+            seconds_remaining = self.rate_estimator.get_seconds_remaining(
+                bytes_total - bytes_transferred
+            )
             self.transfer_seconds_remaining_updated.emit(seconds_remaining)
             logging.debug(
                 "%s: %s / %s (%s%%); %s seconds remaining",
@@ -106,7 +124,14 @@ class MagicFolderChecker(QObject):
                 seconds_remaining,
             )
 
+    def _update_operations(self, status_data, previous_sync_time_started):
+        if self.sync_time_started and not previous_sync_time_started:
+            # A new sync has started; forget the operations of earlier ones
+            self.operations.clear()
+        self.operations.update(status_data, self.sync_time_started)
+
     def parse_status(self, status_data):
+        previous_sync_time_started = self.sync_time_started
         state = MagicFolderChecker.LOADING
         kind = ""
         filepath = ""
@@ -127,7 +152,7 @@ class MagicFolderChecker(QObject):
                         filepath = path
                 elif status == "failure":
                     failures.append(task)
-                self.operations["{}@{}".format(path, queued_at)] = task
+            self._update_operations(status_data, previous_sync_time_started)
             if state == MagicFolderChecker.LOADING:
                 if (
                     self.gateway.monitor.grid_checker.is_connected  # XXX
@@ -143,6 +168,7 @@ class MagicFolderChecker(QObject):
         if state == MagicFolderChecker.SYNCING:
             if self.state != MagicFolderChecker.SYNCING:  # Sync just started
                 logging.debug("Sync started (%s)", self.name)
+                self.rate_estimator.reset()
                 self.sync_started.emit()
             elif self.state == MagicFolderChecker.SYNCING:
                 # Sync started earlier; still going
@@ -153,7 +179,7 @@ class MagicFolderChecker(QObject):
                     self.name,
                 )
                 # TODO: Emit uploading/downloading signal?
-            self.emit_transfer_signals(self.operations.values())
+            self.emit_transfer_signals()
             remote_scan_needed = True
         elif state == MagicFolderChecker.UP_TO_DATE:
             if self.state == MagicFolderChecker.SYNCING:  # Sync just finished
@@ -167,7 +193,7 @@ class MagicFolderChecker(QObject):
                 logging.debug("Final scan complete (%s)", self.name)
                 self.sync_finished.emit()
                 self.notify_updated_files()
-                self.operations = {}
+                self.operations.clear()
         if state != self.state:
             self.status_updated.emit(state)
         self.state = state
@@ -175,32 +201,70 @@ class MagicFolderChecker(QObject):
         return remote_scan_needed
 
     def compare_states(self, current, previous):
-        for mtime, data in current.items():
-            if mtime not in previous:
-                if data["deleted"]:
-                    data["action"] = "deleted"
-                else:
-                    path = data["path"]
-                    prev_entry = None
-                    for prev_data in previous.values():
-                        if prev_data["path"] == path:
-                            prev_entry = prev_data
-                    if prev_entry:
-                        if prev_entry["deleted"]:
-                            data["action"] = "restored"
-                        else:
-                            data["action"] = "updated"
-                    elif path.endswith("/"):
-                        data["action"] = "created"
-                    else:
-                        data["action"] = "added"
-                self.file_updated.emit(data)
-                self.updated_files.append(data)
+        for action, data in current.diff(previous):
+            data["action"] = action
+            self.file_updated.emit(data)
+            self.updated_files.append(data)
+
+    def _get_collective_dircap(self):
+        dircap = self.gateway.get_collective_dircap(self.name)
+        if not dircap:
+            remote_folder = self.gateway.remote_magic_folders.get(self.name)
+            if remote_folder:
+                dircap = remote_folder.get("collective_dircap")
+        return dircap
+
+    def load_saved_state(self):
+        """
+        Show the remote state of the folder as of the last remote scan (of
+        this or a previous session), if one was saved, such that the first
+        remote scan need only reconcile whatever has changed since.
+        """
+        saved = self.gateway.folder_state_store.load(
+            self.name, self._get_collective_dircap()
+        )
+        if not saved:
+            return
+        members, history = saved
+        logging.debug(
+            'Loaded saved state of folder "%s" (%i entries)',
+            self.name,
+            len(history),
+        )
+        self._saved_history = history
+        if members:
+            self.members = sorted(members)
+            self.members_updated.emit(self.members)
+            self.size_updated.emit(history.total_size)
+            self.mtime_updated.emit(history.latest_mtime)
+            self.compare_states(history, self.history)
+            self.updated_files = []  # Skip notifications
+        self.history = history
+
+    def save_state(self):
+        written = self.gateway.folder_state_store.save(
+            self.name,
+            self._get_collective_dircap(),
+            self.members,
+            self.history,
+            self._saved_history,
+        )
+        # If saving failed, rewrite the whole state next time.
+        self._saved_history = self.history if written is not None else None
+
+    def _on_scan_progress(self, entries):
+        # Show a running total while a folder is scanned for the first time
+        # (unless a saved total is already shown).
+        if self.initial_scan_completed or len(self.history):
+            return
+        self._scanned_size += sum(entry["size"] for entry in entries)
+        self.size_updated.emit(self._scanned_size)
 
     @inlineCallbacks
     def do_remote_scan(self, members=None):
+        self._scanned_size = 0
         members, size, t, history = yield self.gateway.get_magic_folder_state(
-            self.name, members
+            self.name, members, self._on_scan_progress
         )
         if members:
             members = sorted(members)
@@ -214,15 +278,79 @@ class MagicFolderChecker(QObject):
             if not self.initial_scan_completed:
                 self.updated_files = []  # Skip notifications
                 self.initial_scan_completed = True
+            self.save_state()
+
+    def invalidate_cached_listings(self):
+        cache = self.gateway.listing_cache
+        cache.invalidate(self.gateway.get_collective_dircap(self.name))
+        for _, dircap in self.members:
+            cache.invalidate(dircap)
 
-    @inlineCallbacks
     def do_check(self):
+        return self._lock.run(self._do_check)
+
+    def check_now(self, remote_scan=False):
+        """
+        Check this folder outside of the regular ``Monitor`` cycle, e.g.,
+        in response to a magic-folder log event. Checks and scans started
+        here are serialized with those started by the ``Monitor``.
+
+        :param bool remote_scan: Whether to (unconditionally) do a remote
+            scan instead of checking the folder's magic-folder status.
+        """
+        if remote_scan:
+            return self._lock.run(self._do_event_scan)
+        return self._lock.run(self._do_check)
+
+    def _do_event_scan(self):
+        # The event means a DMD has just changed; cached listings would hide
+        # the change for up to the listing cache's TTL.
+        self.invalidate_cached_listings()
+        return self.do_remote_scan()
+
+    @inlineCallbacks
+    def _do_check(self):
         status = yield self.gateway.get_magic_folder_status(self.name)
         scan_needed = self.process_status(status)
+        if self.state == MagicFolderChecker.SCANNING:
+            # The final scan after a sync must reflect the latest changes
+            self.invalidate_cached_listings()
         if scan_needed or not self.initial_scan_completed:
             yield self.do_remote_scan()
 
 
+class ReadinessTracker:
+    """
+    Tracks whether a gateway is connected to enough storage servers to
+    satisfy its "shares.happy" threshold, as last observed by its
+    ``GridChecker``.
+
+    :ivar bool ready: Whether the gateway is currently ready for use.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._waiters = []
+
+    def set_ready(self, ready):
+        self.ready = ready
+        if ready:
+            waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                waiter.callback(None)
+
+    def when_ready(self):
+        """
+        :return Deferred: A Deferred that fires once the gateway is ready
+            (or one that has already fired, if it is ready now).
+        """
+        if self.ready:
+            return succeed(None)
+        d = Deferred()
+        self._waiters.append(d)
+        return d
+
+
 class GridChecker(QObject):
 
     connected = pyqtSignal()
@@ -267,10 +395,199 @@ class GridChecker(QObject):
             self.num_connected = num_connected
             self.num_known = num_known
             self.num_happy = num_happy
+        self.gateway.readiness.set_ready(
+            bool(num_happy and num_connected >= num_happy)
+        )
+
+
+class SignalBatcher(QObject):
+    """
+    Collects per-folder events and delivers them in batches -- one list of
+    events per folder -- no more often than every ``interval`` seconds, so
+    that bursts of events (such as one for each file found by the first
+    scan of a large folder) cost subscribers a handful of slot calls rather
+    than tens of thousands.
+
+    Delivery applies back-pressure: if subscribers take longer to process
+    a round of batches than the interval allows for, the interval is
+    stretched accordingly (up to ``max_interval``) so that the event loop
+    remains free to process user input in between.
+
+    :ivar float interval: The current minimum time between deliveries.
+    """
+
+    batch_ready = pyqtSignal(str, list)
+
+    def __init__(self, reactor, min_interval=0.2, max_interval=5.0):
+        super().__init__()
+        self._reactor = reactor
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._pending = {}
+        self._delayed_call = None
+
+    def add(self, folder, event):
+        self._pending.setdefault(folder, []).append(event)
+        if self._delayed_call is None:
+            self._delayed_call = self._reactor.callLater(
+                self.interval, self.flush
+            )
+
+    def flush(self):
+        if self._delayed_call is not None and self._delayed_call.active():
+            self._delayed_call.cancel()
+        self._delayed_call = None
+        pending, self._pending = self._pending, {}
+        started = time.monotonic()
+        for folder, events in pending.items():
+            self.batch_ready.emit(folder, events)
+        elapsed = time.monotonic() - started
+        # Leave the event loop idle for at least as long as it was busy
+        self.interval = min(
+            self.max_interval, max(self.min_interval, elapsed * 2)
+        )
+
+
+class MagicFolderEventDispatcher:
+    """
+    Routes magic-folder events from a gateway's streamed Eliot log to the
+    corresponding ``MagicFolderChecker`` so that changes are noticed as soon
+    as they happen rather than on the ``Monitor``'s next polling cycle.
+
+    Tahoe-LAFS does not include the magic-folder name in its log messages,
+    so events are attributed to a folder by the local path they carry or,
+    failing that, by the Eliot task they belong to. Events that cannot be
+    attributed to a single folder wake the ``Monitor`` instead.
+    """
+
+    # Events indicating local activity; a status check will follow.
+    CHECK_EVENTS = frozenset(
+        [
+            "magic-folder:add-pending",
+            "magic-folder:item:status-change",
+            "magic-folder:maybe-upload",
+            "magic-folder:notified",
+            "magic-folder:process-item",
+        ]
+    )
+    # Events indicating remote changes; a remote scan will follow.
+    SCAN_EVENTS = frozenset(
+        [
+            "magic-folder:add-to-download-queue",
+            "magic-folder:write-downloaded-file",
+        ]
+    )
+    PATH_FIELDS = ("path", "abspath", "abspath_u")
+
+    def __init__(self, monitor, delay=0.1, max_tasks=1000):
+        self.monitor = monitor
+        self.delay = delay
+        self.max_tasks = max_tasks
+        self._task_folders = OrderedDict()
+        self._pending = {}
+
+    def _folder_for_path(self, path):
+        for name, data in list(self.monitor.gateway.magic_folders.items()):
+            directory = data.get("directory")
+            if not directory:
+                continue
+            directory = directory.rstrip(os.sep)
+            if path == directory or path.startswith(directory + os.sep):
+                return name
+        return None
+
+    def _remember_task(self, task_uuid, folder):
+        self._task_folders[task_uuid] = folder
+        self._task_folders.move_to_end(task_uuid)
+        while len(self._task_folders) > self.max_tasks:
+            self._task_folders.popitem(last=False)
+
+    def _get_folder(self, msg):
+        task_uuid = msg.get("task_uuid")
+        for field in self.PATH_FIELDS:
+            path = msg.get(field)
+            if path and isinstance(path, str):
+                folder = self._folder_for_path(path)
+                if folder:
+                    if task_uuid:
+                        self._remember_task(task_uuid, folder)
+                    return folder
+        folder = self._task_folders.get(task_uuid)
+        if folder:
+            return folder
+        if len(self.monitor.gateway.magic_folders) == 1:
+            return next(iter(self.monitor.gateway.magic_folders))
+        return None
+
+    def dispatch(self, message):
+        """
+        :param bytes message: A UTF-8 & JSON encoded Eliot log message.
+        """
+        if b'"magic-folder:' not in message:
+            return
+        try:
+            msg = json.loads(message.decode("utf-8"))
+        except ValueError:
+            return
+        event = msg.get("action_type") or msg.get("message_type")
+        if event in self.SCAN_EVENTS:
+            remote_scan = True
+        elif event in self.CHECK_EVENTS:
+            remote_scan = False
+        else:
+            return
+        folder = self._get_folder(msg)
+        if folder:
+            self.schedule_check(folder, remote_scan)
+        else:
+            self.monitor.wake()
+
+    def schedule_check(self, folder, remote_scan=False):
+        """
+        Check ``folder`` after a short delay, coalescing any further events
+        for the same folder that arrive in the meantime.
+        """
+        if folder in self._pending:
+            self._pending[folder] = self._pending[folder] or remote_scan
+            return
+        self._pending[folder] = remote_scan
+        self.monitor._reactor.callLater(self.delay, self._run_check, folder)
+
+    @inlineCallbacks
+    def _run_check(self, folder):
+        remote_scan = self._pending.pop(folder, False)
+        checker = self.monitor.magic_folder_checkers.get(folder)
+        if not checker or checker.remote:
+            self.monitor.wake()
+            return
+        try:
+            yield checker.check_now(remote_scan)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(
+                'Error checking folder "%s": %s: %s',
+                folder,
+                type(e).__name__,
+                str(e),
+            )
+        if checker.state in (
+            MagicFolderChecker.SYNCING,
+            MagicFolderChecker.SCANNING,
+        ):
+            # Follow the sync's progress at the Monitor's fastest rate
+            self.monitor.wake()
 
 
 class Monitor(QObject):
     """
+    Periodically checks the state of a gateway's grid connection and
+    magic-folders.
+
+    Checks are scheduled adaptively: every ``min_interval`` seconds while
+    any folder is syncing, every ``interval`` seconds while connecting or
+    loading, and backing off exponentially up to ``max_interval`` seconds
+    while the gateway is connected and every folder is up to date. Calling
+    ``wake`` snaps the schedule back to ``min_interval``.
 
     :ivar bool _started: Whether or not ``start`` has already been called.
     """
@@ -298,16 +615,49 @@ class Monitor(QObject):
     members_updated = pyqtSignal(str, list)
 
     file_updated = pyqtSignal(str, object)
+    # Batches of the above, as delivered by ``file_update_batcher``
+    file_updates_batched = pyqtSignal(str, list)
     files_updated = pyqtSignal(str, list, str, str)
 
     total_sync_state_updated = pyqtSignal(int)
 
+    total_transfer_progress_updated = pyqtSignal(object, object)
+    total_transfer_speed_updated = pyqtSignal(object)
+    total_transfer_seconds_remaining_updated = pyqtSignal(object)
+
     check_finished = pyqtSignal()
 
-    def __init__(self, gateway):
+    def __init__(self, gateway, reactor=None):
         super().__init__()
         self.gateway = gateway
-        self.timer = LoopingCall(self.do_checks)
+        if reactor is None:
+            from twisted.internet import reactor
+        self._reactor = reactor
+        self._delayed_call = None
+
+        self.min_interval = 0.5
+        self.base_interval = 2.0
+        self.max_interval = 60.0
+        self.jitter = 0.1
+        self.max_concurrent_checks = 8
+        monitor_settings = settings.get("monitor")
+        if monitor_settings:
+            min_interval = monitor_settings.get("min_interval")
+            if min_interval:
+                self.min_interval = float(min_interval)
+            base_interval = monitor_settings.get("interval")
+            if base_interval:
+                self.base_interval = float(base_interval)
+            max_interval = monitor_settings.get("max_interval")
+            if max_interval:
+                self.max_interval = float(max_interval)
+            max_concurrent_checks = monitor_settings.get(
+                "max_concurrent_checks"
+            )
+            if max_concurrent_checks:
+                self.max_concurrent_checks = int(max_concurrent_checks)
+        self.interval = self.base_interval
+        self.check_semaphore = DeferredSemaphore(self.max_concurrent_checks)
 
         self.grid_checker = GridChecker(self.gateway)
         self.grid_checker.connected.connect(self.connected.emit)
@@ -317,6 +667,13 @@ class Monitor(QObject):
         self.grid_checker.space_updated.connect(self.space_updated.emit)
         self.magic_folder_checkers = {}
         self.total_sync_state = 0
+        self.rate_estimator = RateEstimator()
+        self.last_check_duration = 0
+        self.event_dispatcher = MagicFolderEventDispatcher(self)
+        self.file_update_batcher = SignalBatcher(self._reactor)
+        self.file_update_batcher.batch_ready.connect(
+            self.file_updates_batched.emit
+        )
 
     def add_magic_folder_checker(self, name, remote=False):
         mfc = MagicFolderChecker(self.gateway, name, remote)
@@ -343,11 +700,15 @@ class Monitor(QObject):
         )
 
         mfc.file_updated.connect(lambda x: self.file_updated.emit(name, x))
+        mfc.file_updated.connect(
+            lambda x: self.file_update_batcher.add(name, x)
+        )
         mfc.files_updated.connect(
             lambda x, y, z: self.files_updated.emit(name, x, y, z)
         )
 
         self.magic_folder_checkers[name] = mfc
+        mfc.load_saved_state()
 
     @inlineCallbacks
     def scan_rootcap(self, overlay_file=None):
@@ -369,17 +730,31 @@ class Monitor(QObject):
 
     @inlineCallbacks
     def do_checks(self):
+        started = time.monotonic()
         yield self.grid_checker.do_check()
         for folder in list(self.gateway.magic_folders.keys()):
             if folder not in self.magic_folder_checkers:
                 self.add_magic_folder_checker(folder)
             elif self.magic_folder_checkers[folder].remote:
                 self.magic_folder_checkers[folder].remote = False
+        checkers = [
+            mfc
+            for mfc in list(self.magic_folder_checkers.values())
+            if not mfc.remote
+        ]
+        results = yield DeferredList(
+            [self.check_semaphore.run(mfc.do_check) for mfc in checkers],
+            consumeErrors=True,
+        )
         states = set()
-        for magic_folder_checker in list(self.magic_folder_checkers.values()):
-            if not magic_folder_checker.remote:
-                yield magic_folder_checker.do_check()
-                states.add(magic_folder_checker.state)
+        for magic_folder_checker, (success, result) in zip(checkers, results):
+            if not success:
+                logging.error(
+                    'Error checking folder "%s": %s',
+                    magic_folder_checker.name,
+                    result.getErrorMessage(),
+                )
+            states.add(magic_folder_checker.state)
         if (
             MagicFolderChecker.SYNCING in states
             or MagicFolderChecker.SCANNING in states
@@ -394,9 +769,108 @@ class Monitor(QObject):
         if state != self.total_sync_state:
             self.total_sync_state = state
             self.total_sync_state_updated.emit(state)
+        self.emit_total_transfer_signals(checkers)
+        self.last_check_duration = time.monotonic() - started
+        logging.debug(
+            "Checked %i folder(s) on %s in %.3f seconds",
+            len(checkers),
+            self.gateway.name,
+            self.last_check_duration,
+        )
         self.check_finished.emit()
 
-    def start(self, interval=2):
+    def emit_total_transfer_signals(self, checkers):
+        """
+        Report the combined progress, speed, and time remaining of all of
+        the gateway's folders that are currently syncing.
+        """
+        bytes_transferred = 0
+        bytes_total = 0
+        started = None
+        for mfc in checkers:
+            if mfc.state != MagicFolderChecker.SYNCING:
+                continue
+            transferred, total = mfc.operations.get_progress(
+                mfc.sync_time_started
+            )
+            bytes_transferred += transferred
+            bytes_total += total
+            if mfc.sync_time_started:
+                started = min(
+                    started or mfc.sync_time_started, mfc.sync_time_started
+                )
+        if not bytes_transferred or not bytes_total:
+            if not bytes_total:
+                self.rate_estimator.reset()
+            return
+        self.total_transfer_progress_updated.emit(
+            bytes_transferred, bytes_total
+        )
+        speed = self.rate_estimator.update(
+            bytes_transferred, time.time(), started
+        )
+        if speed:
+            self.total_transfer_speed_updated.emit(speed)
+            self.total_transfer_seconds_remaining_updated.emit(
+                self.rate_estimator.get_seconds_remaining(
+                    bytes_total - bytes_transferred
+                )
+            )
+
+    def _is_idle(self):
+        if not self.grid_checker.is_connected:
+            return False
+        if self.total_sync_state == MagicFolderChecker.UP_TO_DATE:
+            return True
+        return not any(
+            not mfc.remote for mfc in self.magic_folder_checkers.values()
+        )
+
+    def _update_interval(self):
+        if self.total_sync_state == MagicFolderChecker.SYNCING:
+            self.interval = self.min_interval
+        elif self._is_idle():
+            self.interval = min(self.interval * 2, self.max_interval)
+        else:
+            self.interval = min(self.interval * 2, self.base_interval)
+
+    def _schedule_next_check(self):
+        delay = self.interval * random.uniform(
+            1 - self.jitter, 1 + self.jitter
+        )
+        self._delayed_call = self._reactor.callLater(delay, self._run_checks)
+
+    @inlineCallbacks
+    def _run_checks(self):
+        self._delayed_call = None
+        try:
+            yield self.do_checks()
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(
+                "Error checking %s: %s: %s",
+                self.gateway.name,
+                type(e).__name__,
+                str(e),
+            )
+        self._update_interval()
+        self._schedule_next_check()
+
+    def wake(self):
+        """
+        Switch back to checking at the fastest rate, e.g., in response to
+        user activity or a magic-folder event, rescheduling the next check
+        if it would otherwise happen later than ``min_interval`` from now.
+        """
+        self.interval = self.min_interval
+        if self._delayed_call and self._delayed_call.active():
+            remaining = self._delayed_call.getTime() - self._reactor.seconds()
+            if remaining > self.min_interval:
+                self._delayed_call.reset(self.min_interval)
+
+    def start(self, interval=None):
         if not self._started:
             self._started = True
-            self.timer.start(interval, now=True)
+            if interval is not None:
+                self.base_interval = interval
+                self.interval = interval
+            self._run_checks()
@@ -283,18 +283,22 @@ class SetupRunner(QObject):
     @inlineCallbacks
     def join_folders(self, folders_data):
         folders = []
+        children = {}
         for folder, data in folders_data.items():
-            self.update_progress.emit('Joining folder "{}"...'.format(folder))
             collective, personal = data["code"].split("+")
-            yield self.gateway.link(
-                self.gateway.get_rootcap(),
-                folder + " (collective)",
-                collective,
+            children[folder + " (collective)"] = collective
+            children[folder + " (personal)"] = personal
+            folders.append(folder)
+        if len(folders) == 1:
+            self.update_progress.emit(
+                'Joining folder "{}"...'.format(folders[0])
             )
-            yield self.gateway.link(
-                self.gateway.get_rootcap(), folder + " (personal)", personal
+        elif folders:
+            self.update_progress.emit(
+                "Joining {} folders...".format(len(folders))
             )
-            folders.append(folder)
+        # All folders are linked into the rootcap with a single write
+        yield self.gateway.set_children(self.gateway.get_rootcap(), children)
         if folders:
             self.joined_folders.emit(folders)
 
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stopping Tahoe-LAFS gateway processes, concurrently and within a deadline.
+"""
+
+import errno
+import logging
+import os
+import signal
+import sys
+
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    inlineCallbacks,
+    maybeDeferred,
+)
+from twisted.internet.task import deferLater
+
+from gridsync.timeline import Timeline
+
+# Windows has no SIGKILL; there, SIGTERM is already unconditional.
+SIGKILL = getattr(signal, "SIGKILL", signal.SIGTERM)
+
+
+def read_pid(pidfile):
+    """
+    :return int: The process ID stored in ``pidfile``, or ``None`` if it
+        could not be read.
+    """
+    try:
+        with open(pidfile, "r") as f:
+            return int(f.read())
+    except (EnvironmentError, ValueError) as err:
+        logging.warning("Error loading pid from pidfile: %s", str(err))
+        return None
+
+
+def send_signal(pid, sig):
+    """
+    :return bool: Whether the signal was delivered (i.e., whether a process
+        with the given ID existed).
+    """
+    try:
+        os.kill(pid, sig)
+    except OSError as err:
+        if err.errno not in (errno.ESRCH, errno.EINVAL):
+            logging.error(err)
+        return False
+    return True
+
+
+def is_running(pid):
+    if sys.platform == "win32":
+        # On Windows, os.kill() with any signal number other than CTRL_C_EVENT
+        # or CTRL_BREAK_EVENT terminates the process (so it cannot be used to
+        # probe for one) but termination is also immediate.
+        return False
+    try:
+        os.kill(pid, 0)
+    except OSError as err:
+        return err.errno == errno.EPERM
+    return True
+
+
+@inlineCallbacks
+def terminate(pid, grace_period=5, poll_interval=0.1, reactor=None):
+    """
+    Ask the process ``pid`` to exit (with SIGTERM) and, if it is still
+    running after ``grace_period`` seconds, force it to (with SIGKILL).
+
+    :return Deferred: A Deferred that fires with ``True`` if the process had
+        to be killed forcefully, otherwise ``False``.
+    """
+    if reactor is None:
+        from twisted.internet import reactor
+    if not send_signal(pid, signal.SIGTERM):
+        return False
+    polls = max(1, int(grace_period / poll_interval))
+    for _ in range(polls):
+        yield deferLater(reactor, poll_interval, lambda: None)
+        if not is_running(pid):
+            return False
+    logging.warning(
+        "PID %d still running %s seconds after SIGTERM; sending SIGKILL...",
+        pid,
+        grace_period,
+    )
+    send_signal(pid, SIGKILL)
+    return True
+
+
+class ShutdownCoordinator:
+    """
+    Stops a collection of gateways at the same time, giving up on any that
+    have not finished stopping by a global deadline.
+
+    :ivar float deadline: The number of seconds after which to stop waiting
+        for gateways and forcefully kill any processes that remain.
+
+    :ivar float grace_period: The number of seconds to allow each process to
+        exit after SIGTERM before sending SIGKILL.
+
+    :ivar Timeline timeline: The "stop" phase of each gateway.
+
+    :ivar list killed: The names of the gateways still stopping when the
+        deadline passed.
+    """
+
+    def __init__(self, reactor, deadline=10, grace_period=5):
+        self._reactor = reactor
+        self.deadline = deadline
+        self.grace_period = grace_period
+        self.timeline = Timeline(clock=reactor.seconds)
+        self.killed = []
+
+    def _stop_gateway(self, gateway):
+        d = maybeDeferred(gateway.stop, grace_period=self.grace_period)
+        d.addErrback(
+            lambda f: logging.error(
+                'Error stopping "%s": %s', gateway.name, f.getErrorMessage()
+            )
+        )
+        return self.timeline.track(d, "stop", gateway.name)
+
+    def _deadline_passed(self, pending, done):
+        for gateway, d in pending:
+            if d.called:
+                continue
+            logging.warning(
+                'Gateway "%s" did not stop within %s seconds; killing...',
+                gateway.name,
+                self.deadline,
+            )
+            self.killed.append(gateway.name)
+            self.timeline.end("stop", gateway.name)
+            pid = read_pid(gateway.pidfile)
+            if pid is not None:
+                send_signal(pid, SIGKILL)
+        done.callback(None)
+
+    def stop_gateways(self, gateways):
+        """
+        :return Deferred: A Deferred that fires when every gateway has
+            stopped or the deadline has passed, whichever is sooner.
+        """
+        done = Deferred()
+        pending = [
+            (gateway, self._stop_gateway(gateway)) for gateway in gateways
+        ]
+        timer = self._reactor.callLater(
+            self.deadline, self._deadline_passed, pending, done
+        )
+
+        def _all_stopped(_):
+            if timer.active():
+                timer.cancel()
+                done.callback(None)
+
+        DeferredList([d for _, d in pending]).addCallback(_all_stopped)
+        return done
+
+    def get_durations(self):
+        """
+        :return dict: The number of seconds each gateway took to stop (or
+            had been stopping when the deadline passed), keyed by name.
+        """
+        return {
+            subject: end - start
+            for subject, _, start, end in self.timeline.phases
+            if end is not None
+        }
@@ -6,6 +6,10 @@ node.
 """
 
 import logging
+import lzma
+import struct
+import time
+import zlib
 from collections import deque
 
 from autobahn.twisted.websocket import (
@@ -17,6 +21,8 @@ from twisted.application.internet import ClientService
 from twisted.application.service import MultiService
 from twisted.internet.endpoints import TCP4ClientEndpoint
 
+from gridsync.filter import filter_tahoe_log_message, get_mask
+
 
 class TahoeLogReader(
     WebSocketClientProtocol
@@ -31,29 +37,203 @@ class TahoeLogReader(
             self.factory.streamedlogs.add_message(payload)
 
 
+_LENGTH = struct.Struct(">I")
+
+
+class CompressedLogBuffer:
+    """
+    Storage for log messages, bounded by total size in bytes.
+
+    Messages are packed into blocks of roughly ``block_size`` bytes. All but
+    the newest block are held compressed and, once the total size of the
+    buffer exceeds ``max_bytes``, whole blocks are evicted oldest-first.
+
+    :ivar int max_bytes: The maximum number of (mostly compressed) bytes to
+        retain.
+
+    :ivar int block_size: The uncompressed size at which the newest block is
+        compressed and a new one started.
+    """
+
+    def __init__(self, max_bytes, block_size=262144, compression="zlib"):
+        self.max_bytes = max_bytes
+        self.block_size = min(block_size, max(max_bytes // 4, 1))
+        if compression == "lzma":
+            self._compress = lzma.compress
+            self._decompress = lzma.decompress
+        else:
+            self._compress = zlib.compress
+            self._decompress = zlib.decompress
+        self._blocks = deque()  # (compressed_bytes, message_count) tuples
+        self._blocks_size = 0
+        self._blocks_count = 0
+        self._current = deque()
+        self._current_size = 0
+
+    @property
+    def size(self):
+        """
+        :return int: The number of bytes currently held.
+        """
+        return self._blocks_size + self._current_size
+
+    def __len__(self):
+        return self._blocks_count + len(self._current)
+
+    def append(self, message):
+        self._current.append(message)
+        self._current_size += len(message)
+        if self._current_size >= self.block_size:
+            self._compress_current()
+        self._evict()
+
+    def _compress_current(self):
+        data = b"".join(_LENGTH.pack(len(msg)) + msg for msg in self._current)
+        block = self._compress(data)
+        self._blocks.append((block, len(self._current)))
+        self._blocks_size += len(block)
+        self._blocks_count += len(self._current)
+        self._current = deque()
+        self._current_size = 0
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._blocks:
+            block, count = self._blocks.popleft()
+            self._blocks_size -= len(block)
+            self._blocks_count -= count
+        while self.size > self.max_bytes and self._current:
+            self._current_size -= len(self._current.popleft())
+
+    def _iter_block(self, block):
+        data = memoryview(self._decompress(block))
+        offset = 0
+        while offset < len(data):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            yield bytes(data[offset : offset + length])
+            offset += length
+
+    def __iter__(self):
+        """
+        Yield every message, oldest first, decompressing only one block at a
+        time.
+        """
+        for block, _ in list(self._blocks):
+            yield from self._iter_block(block)
+        yield from list(self._current)
+
+
 class StreamedLogs(MultiService):
     """
     :ivar _reactor: A reactor that can connect using whatever transport the
         Tahoe-LAFS node requires (TCP, etc).
 
-    :ivar deque _buffer: Bounded storage for the streamed messages.
+    :ivar CompressedLogBuffer _buffer: Bounded storage for the streamed
+        messages.
+
+    :ivar str filter_mode: One of ``UNFILTERED`` (keep only the messages as
+        received), ``BOTH`` (also keep a redacted copy of each message) or
+        ``FILTERED`` (keep only the redacted copy). Redaction happens
+        incrementally, in batches of ``filter_batch_size`` messages per
+        reactor iteration, so that exporting a filtered log later requires
+        no further work.
+
+    :ivar CompressedLogBuffer _filtered_buffer: Bounded storage for the
+        redacted messages, or ``None`` if ``filter_mode`` is ``UNFILTERED``.
     """
 
+    UNFILTERED = "unfiltered"
+    BOTH = "both"
+    FILTERED = "filtered"
+
+    # Stands in for the gateway identifier, which is only known at export
+    # time, in the masks of messages that were redacted on ingest.
+    IDENTIFIER_PLACEHOLDER = "?"
+
     _started = False
 
-    def __init__(self, reactor, maxlen=None):
+    def __init__(
+        self,
+        reactor,
+        max_bytes=None,
+        filter_mode=UNFILTERED,
+        filter_batch_size=500,
+    ):
         super().__init__()
         self._reactor = reactor
         self._client_service = None
-        if maxlen is None:
-            # This deque limit is based on average message size of 260 bytes
-            # and a desire to limit maximum memory consumption here to around
-            # 500 MiB.
-            maxlen = 2000000
-        self._buffer = deque(maxlen=maxlen)
+        if max_bytes is None:
+            # At a typical compression ratio of 8-10x for Eliot JSON, this
+            # retains roughly the same ~500 MiB of message history as the
+            # previous 2,000,000-message deque.
+            max_bytes = 64 * 1024 * 1024
+        if filter_mode not in (self.UNFILTERED, self.BOTH, self.FILTERED):
+            raise ValueError("Unknown filter mode: {}".format(filter_mode))
+        self.filter_mode = filter_mode
+        self.filter_batch_size = filter_batch_size
+        self._buffer = CompressedLogBuffer(max_bytes)
+        self._filtered_buffer = None
+        if filter_mode != self.UNFILTERED:
+            self._filtered_buffer = CompressedLogBuffer(max_bytes)
+        self._unfiltered = deque()
+        self._filter_call = None
+        self.filtered_count = 0
+        self.filter_seconds = 0.0
+        self._observers = []
+
+    def add_observer(self, observer):
+        """
+        Call ``observer`` with each message as it is received.
+
+        :param observer: A callable accepting one ``bytes`` argument.
+        """
+        self._observers.append(observer)
 
     def add_message(self, message):
-        self._buffer.append(message)
+        if self.filter_mode != self.FILTERED:
+            self._buffer.append(message)
+        if self._filtered_buffer is not None:
+            self._unfiltered.append(message)
+            if self._filter_call is None:
+                self._filter_call = self._reactor.callLater(
+                    0, self._filter_batch
+                )
+        for observer in self._observers:
+            observer(message)
+
+    def _filter_message(self, message):
+        try:
+            filtered = filter_tahoe_log_message(
+                message.decode("utf-8"), self.IDENTIFIER_PLACEHOLDER
+            )
+        except ValueError:  # Includes JSONDecodeError and UnicodeDecodeError
+            return None
+        return filtered.encode("utf-8")
+
+    def _filter_batch(self):
+        self._filter_call = None
+        start = time.perf_counter()
+        count = min(len(self._unfiltered), self.filter_batch_size)
+        for _ in range(count):
+            filtered = self._filter_message(self._unfiltered.popleft())
+            if filtered is not None:
+                self._filtered_buffer.append(filtered)
+        self.filter_seconds += time.perf_counter() - start
+        self.filtered_count += count
+        if self._unfiltered:
+            self._filter_call = self._reactor.callLater(0, self._filter_batch)
+
+    def get_filter_stats(self):
+        """
+        :return dict: The number of messages redacted on ingest so far, the
+            total time spent doing so (in seconds), and the number of
+            messages still waiting to be redacted.
+        """
+        return {
+            "filtered": self.filtered_count,
+            "seconds": self.filter_seconds,
+            "pending": len(self._unfiltered),
+        }
 
     def start(self, nodeurl, api_token):
         """
@@ -77,11 +257,62 @@ class StreamedLogs(MultiService):
             return super().stopService()
         return None
 
+    def iter_streamed_log_messages(self):
+        """
+        :return: An iterator over the messages currently in the message
+            buffer, as ``str``, oldest first.
+        """
+        return (msg.decode("utf-8") for msg in self._buffer)
+
+    def count_messages(self, filtered=False):
+        """
+        :param bool filtered: Whether to count the redacted copies of the
+            messages (including any not yet redacted) instead.
+
+        :return int: The number of messages currently held.
+        """
+        if filtered:
+            return len(self._filtered_buffer) + len(self._unfiltered)
+        return len(self._buffer)
+
     def get_streamed_log_messages(self):
         """
         :return list[str]: The messages currently in the message buffer.
         """
-        return list(msg.decode("utf-8") for msg in list(self._buffer))
+        return list(self.iter_streamed_log_messages())
+
+    def iter_filtered_log_messages(self, identifier=None):
+        """
+        :param str identifier: The identifier to use in the masks of
+            gateway names.
+
+        :return: An iterator over the redacted copies of the messages
+            received so far, as ``str``, oldest first. Any messages that have
+            not yet been redacted in the background are redacted now.
+        """
+        placeholder = get_mask("", "GatewayName", self.IDENTIFIER_PLACEHOLDER)
+        replacement = get_mask("", "GatewayName", identifier)
+        for msg in self._iter_filtered_bytes():
+            line = msg.decode("utf-8")
+            if identifier:
+                line = line.replace(placeholder, replacement)
+            yield line
+
+    def _iter_filtered_bytes(self):
+        yield from self._filtered_buffer
+        for msg in list(self._unfiltered):
+            filtered = self._filter_message(msg)
+            if filtered is not None:
+                yield filtered
+
+    def get_filtered_log(self, identifier=None):
+        """
+        :param str identifier: The identifier to use in the masks of
+            gateway names.
+
+        :return str: The redacted messages, joined by newlines.
+        """
+        return "\n".join(self.iter_filtered_log_messages(identifier))
 
     def _create_client_service(self, nodeurl, api_token):
         url = parse(nodeurl)
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 
-import errno
 import hashlib
 import json
 import logging as log
@@ -10,7 +9,8 @@ import shutil
 import signal
 import sys
 import tempfile
-from collections import OrderedDict, defaultdict
+import time
+from collections import defaultdict, deque
 from io import BytesIO
 from pathlib import Path
 
@@ -20,7 +20,7 @@ from atomicwrites import atomic_write
 from twisted.internet.defer import (
     Deferred,
     DeferredList,
-    DeferredLock,
+    DeferredSemaphore,
     inlineCallbacks,
 )
 from twisted.internet.error import ConnectError, ProcessDone
@@ -28,16 +28,22 @@ from twisted.internet.protocol import ProcessProtocol
 from twisted.internet.task import deferLater
 from twisted.python.procutils import which
 
-from gridsync import pkgdir
+from gridsync import config_dir, pkgdir
 from gridsync import settings as global_settings
+from gridsync.cache import ListingCache
 from gridsync.config import Config
+from gridsync.connectionpool import ConnectionPool
 from gridsync.crypto import trunchash
 from gridsync.errors import TahoeCommandError, TahoeError, TahoeWebError
-from gridsync.filter import filter_tahoe_log_message
-from gridsync.monitor import Monitor
+from gridsync.filter import iter_filter_tahoe_log_messages
+from gridsync.folderstate import FolderState, FolderStateStore
+from gridsync.lock import KeyedDeferredLock
+from gridsync.monitor import Monitor, ReadinessTracker
 from gridsync.news import NewscapChecker
 from gridsync.preferences import get_preference, set_preference
+from gridsync.shutdown import read_pid, send_signal, terminate
 from gridsync.streamedlogs import StreamedLogs
+from gridsync.util import lazy_property
 
 
 def is_valid_furl(furl):
@@ -117,22 +123,75 @@ class Tahoe:
         self.name = os.path.basename(self.nodedir)
         self.api_token = None
         self.magic_folders_dir = os.path.join(self.nodedir, "magic-folders")
-        self.lock = DeferredLock()
+        self.lock = KeyedDeferredLock()
         self.rootcap = None
         self.magic_folders = defaultdict(dict)
         self.remote_magic_folders = defaultdict(dict)
         self.use_tor = False
-        self.monitor = Monitor(self)
-        streamedlogs_maxlen = None
-        debug_settings = global_settings.get("debug")
-        if debug_settings:
-            log_maxlen = debug_settings.get("log_maxlen")
-            if log_maxlen is not None:
-                streamedlogs_maxlen = int(log_maxlen)
-        self.streamedlogs = StreamedLogs(reactor, streamedlogs_maxlen)
+        self.readiness = ReadinessTracker()
+        self._reactor = reactor
+        self.pool = self._create_connection_pool(reactor)
+        self.listing_cache = ListingCache()
+        cache_settings = global_settings.get("listing_cache")
+        if cache_settings:
+            ttl = cache_settings.get("ttl")
+            if ttl is not None:
+                self.listing_cache.ttl = float(ttl)
+        max_concurrent_scans = 8
+        monitor_settings = global_settings.get("monitor")
+        if monitor_settings:
+            value = monitor_settings.get("max_concurrent_scans")
+            if value is not None:
+                max_concurrent_scans = int(value)
+        self.scan_semaphore = DeferredSemaphore(max_concurrent_scans)
         self.state = Tahoe.STOPPED
         self.newscap = ""
-        self.newscap_checker = NewscapChecker(self)
+
+    # The following subsystems are only needed once a gateway is started (or
+    # its state inspected) and so are not created for short-lived instances
+    # such as those used to probe or kill a node.
+
+    @lazy_property
+    def monitor(self):
+        return Monitor(self)
+
+    @lazy_property
+    def folder_state_store(self):
+        return FolderStateStore(
+            os.path.join(self.nodedir, "private", "folder-state.sqlite")
+        )
+
+    @lazy_property
+    def streamedlogs(self):
+        max_bytes = None
+        filter_mode = StreamedLogs.UNFILTERED
+        debug_settings = global_settings.get("debug")
+        if debug_settings:
+            log_max_bytes = debug_settings.get("log_max_bytes")
+            if log_max_bytes is not None:
+                max_bytes = int(log_max_bytes)
+            filter_mode = debug_settings.get("log_filter_mode", filter_mode)
+        streamedlogs = StreamedLogs(self._reactor, max_bytes, filter_mode)
+        streamedlogs.add_observer(self.monitor.event_dispatcher.dispatch)
+        return streamedlogs
+
+    @lazy_property
+    def newscap_checker(self):
+        return NewscapChecker(self)
+
+    def _create_connection_pool(self, reactor):
+        max_connections = None
+        idle_timeout = None
+        for section in ("connection_pool", "connection_pool:" + self.name):
+            pool_settings = global_settings.get(section)
+            if pool_settings:
+                value = pool_settings.get("max_connections")
+                if value is not None:
+                    max_connections = int(value)
+                value = pool_settings.get("idle_timeout")
+                if value is not None:
+                    idle_timeout = int(value)
+        return ConnectionPool(reactor, max_connections, idle_timeout)
 
     @staticmethod
     def read_cap_from_file(filepath):
@@ -405,48 +464,80 @@ class Tahoe:
                 log.debug("Successfully removed %s", fullpath)
 
     def kill(self):
-        try:
-            with open(self.pidfile, "r") as f:
-                pid = int(f.read())
-        except (EnvironmentError, ValueError) as err:
-            log.warning("Error loading pid from pidfile: %s", str(err))
+        pid = read_pid(self.pidfile)
+        if pid is None:
             return
         log.debug("Trying to kill PID %d...", pid)
-        try:
-            os.kill(pid, signal.SIGTERM)
-        except OSError as err:
-            if err.errno not in (errno.ESRCH, errno.EINVAL):
-                log.error(err)
+        send_signal(pid, signal.SIGTERM)
         if sys.platform == "win32":
             self._win32_cleanup()
 
     @inlineCallbacks
-    def stop(self):
+    def _terminate(self, grace_period=None):
+        if sys.platform == "win32":
+            self.kill()
+        elif grace_period is not None:
+            pid = read_pid(self.pidfile)
+            if pid is not None:
+                yield terminate(pid, grace_period, reactor=self._reactor)
+        else:
+            try:
+                yield self.command(["stop"])
+            except TahoeCommandError:  # Process already dead/not running
+                pass
+
+    @inlineCallbacks
+    def stop(self, grace_period=None):
+        """
+        Stop the gateway's Tahoe-LAFS process, waiting first for any
+        in-progress rootcap modification to finish.
+
+        :param float grace_period: If given, signal the process directly,
+            escalating to SIGKILL if it has not exited after this many
+            seconds, instead of running ``tahoe stop``.
+        """
         log.debug('Stopping "%s" tahoe client...', self.name)
         if not os.path.isfile(self.pidfile):
             log.error('No "twistd.pid" file found in %s', self.nodedir)
             return
         self.state = Tahoe.STOPPING
+        self.readiness.set_ready(False)
         self.streamedlogs.stop()
         if self.lock.locked:
             log.warning(
                 "Delaying stop operation; "
-                "another operation is trying to modify the rootcap..."
+                "other operations are trying to modify directories..."
             )
-            yield self.lock.acquire()
-            yield self.lock.release()
-            log.debug("Lock released; resuming stop operation...")
-        if sys.platform == "win32":
-            self.kill()
-        else:
-            try:
-                yield self.command(["stop"])
-            except TahoeCommandError:  # Process already dead/not running
-                pass
+            yield self.lock.when_idle()
+            log.debug("Locks released; resuming stop operation...")
+        yield self._terminate(grace_period)
         try:
             os.remove(self.pidfile)
         except EnvironmentError:
             pass
+        self.monitor.wake()
+        stats = self.pool.get_stats()
+        log.debug(
+            'HTTP connections for "%s": %i opened, %i reused',
+            self.name,
+            stats["opened"],
+            stats["reused"],
+        )
+        yield self.pool.closeCachedConnections()
+        log.debug(
+            'Directory locks for "%s": %s', self.name, self.lock.get_stats()
+        )
+        log.debug(
+            'Directory listing cache for "%s": %s',
+            self.name,
+            self.listing_cache.get_stats(),
+        )
+        if self.streamedlogs.filter_mode != StreamedLogs.UNFILTERED:
+            log.debug(
+                'Log messages filtered on ingest for "%s": %s',
+                self.name,
+                self.streamedlogs.get_filter_stats(),
+            )
         self.state = Tahoe.STOPPED
         log.debug('Finished stopping "%s" tahoe client', self.name)
 
@@ -514,15 +605,41 @@ class Tahoe:
         """
         return self.streamedlogs.get_streamed_log_messages()
 
-    def get_log(self, apply_filter=False, identifier=None):
-        messages = []
+    def _use_filtered_on_ingest_log(self, apply_filter):
+        return self.streamedlogs.filter_mode == StreamedLogs.FILTERED or (
+            apply_filter and self.streamedlogs.filter_mode == StreamedLogs.BOTH
+        )
+
+    def iter_log(self, apply_filter=False, identifier=None, tail=None):
+        """
+        Like ``get_log`` but yield the lines of the log one at a time so
+        that the whole log need never be held in memory at once.
+
+        :param int tail: If given, yield only the last ``tail`` lines. These
+            are selected before any messages are filtered or re-encoded.
+        """
+        if self._use_filtered_on_ingest_log(apply_filter):
+            lines = self.streamedlogs.iter_filtered_log_messages(identifier)
+            if tail is not None:
+                lines = deque(lines, maxlen=tail)
+            yield from lines
+            return
+        messages = self.streamedlogs.iter_streamed_log_messages()
+        if tail is not None:
+            messages = deque(messages, maxlen=tail)
         if apply_filter:
-            for line in self.streamedlogs.get_streamed_log_messages():
-                messages.append(filter_tahoe_log_message(line, identifier))
+            yield from iter_filter_tahoe_log_messages(messages, identifier)
         else:
-            for line in self.streamedlogs.get_streamed_log_messages():
-                messages.append(json.dumps(json.loads(line), sort_keys=True))
-        return "\n".join(messages)
+            for line in messages:
+                yield json.dumps(json.loads(line), sort_keys=True)
+
+    def get_log(self, apply_filter=False, identifier=None):
+        return "\n".join(self.iter_log(apply_filter, identifier))
+
+    def get_log_line_count(self, apply_filter=False):
+        return self.streamedlogs.count_messages(
+            filtered=self._use_filtered_on_ingest_log(apply_filter)
+        )
 
     @inlineCallbacks
     def start(self):
@@ -552,6 +669,7 @@ class Tahoe:
         self.load_newscap()
         self.newscap_checker.start()
         self.state = Tahoe.STARTED
+        self.monitor.wake()
         log.debug(
             'Finished starting "%s" tahoe client (pid: %s)', self.name, pid
         )
@@ -594,7 +712,7 @@ class Tahoe:
         if not self.nodeurl:
             return None
         try:
-            resp = yield treq.get(self.nodeurl + "?t=json")
+            resp = yield treq.get(self.nodeurl + "?t=json", pool=self.pool)
         except ConnectError:
             return None
         if resp.code == 200:
@@ -614,46 +732,18 @@ class Tahoe:
             return servers_connected, servers_known, available_space
         return None
 
-    @inlineCallbacks
-    def get_connected_servers(self):
-        if not self.nodeurl:
-            return None
-        try:
-            resp = yield treq.get(self.nodeurl)
-        except ConnectError:
-            return None
-        if resp.code == 200:
-            html = yield treq.content(resp)
-            match = re.search(
-                "Connected to <span>(.+?)</span>", html.decode("utf-8")
-            )
-            if match:
-                return int(match.group(1))
-        return None
-
-    @inlineCallbacks
-    def is_ready(self):
-        if not self.shares_happy:
-            return False
-        connected_servers = yield self.get_connected_servers()
-        return bool(
-            connected_servers and connected_servers >= self.shares_happy
-        )
-
-    @inlineCallbacks
     def await_ready(self):
         # TODO: Replace with "readiness" API?
         # https://tahoe-lafs.org/trac/tahoe-lafs/ticket/2844
-        from twisted.internet import reactor
-
-        ready = yield self.is_ready()
-        if not ready:
-            log.debug('Connecting to "%s"...', self.name)
-        while not ready:
-            yield deferLater(reactor, 0.2, lambda: None)
-            ready = yield self.is_ready()
-            if ready:
-                log.debug('Connected to "%s"', self.name)
+        if self.readiness.ready:
+            return self.readiness.when_ready()
+        log.debug('Connecting to "%s"...', self.name)
+        # Readiness is only updated by the Monitor's checks, which may have
+        # backed off to "max_interval"; check again as soon as possible.
+        self.monitor.wake()
+        d = self.readiness.when_ready()
+        d.addCallback(lambda _: log.debug('Connected to "%s"', self.name))
+        return d
 
     @inlineCallbacks
     def mkdir(self, parentcap=None, childname=None):
@@ -663,7 +753,9 @@ class Tahoe:
         if parentcap and childname:
             url += "/" + parentcap
             params["name"] = childname
-        resp = yield treq.post(url, params=params)
+        resp = yield treq.post(url, params=params, pool=self.pool)
+        if parentcap:
+            self.listing_cache.invalidate(parentcap)
         if resp.code == 200:
             content = yield treq.content(resp)
             return content.decode("utf-8").strip()
@@ -689,7 +781,9 @@ class Tahoe:
         log.debug("Uploading %s...", local_path)
         yield self.await_ready()
         with open(local_path, "rb") as f:
-            resp = yield treq.put("{}uri".format(self.nodeurl), f)
+            resp = yield treq.put(
+                "{}uri".format(self.nodeurl), f, pool=self.pool
+            )
         if resp.code == 200:
             content = yield treq.content(resp)
             log.debug("Successfully uploaded %s", local_path)
@@ -701,7 +795,9 @@ class Tahoe:
     def download(self, cap, local_path):
         log.debug("Downloading %s...", local_path)
         yield self.await_ready()
-        resp = yield treq.get("{}uri/{}".format(self.nodeurl, cap))
+        resp = yield treq.get(
+            "{}uri/{}".format(self.nodeurl, cap), pool=self.pool
+        )
         if resp.code == 200:
             with atomic_write(local_path, mode="wb", overwrite=True) as f:
                 yield treq.collect(resp, f.write)
@@ -721,15 +817,17 @@ class Tahoe:
             dircap_hash,
         )
         yield self.await_ready()
-        yield self.lock.acquire()
+        yield self.lock.acquire(dircap)
         try:
             resp = yield treq.post(
                 "{}uri/{}/?t=uri&name={}&uri={}".format(
                     self.nodeurl, dircap, childname, childcap
-                )
+                ),
+                pool=self.pool,
             )
         finally:
-            yield self.lock.release()
+            self.listing_cache.invalidate(dircap)
+            yield self.lock.release(dircap)
         if resp.code != 200:
             content = yield treq.content(resp)
             raise TahoeWebError(content.decode("utf-8"))
@@ -740,40 +838,86 @@ class Tahoe:
             dircap_hash,
         )
 
+    @inlineCallbacks
+    def set_children(self, dircap, children):
+        """
+        Link several children into a directory with a single
+        ``t=set_children`` request (and so, a single write of the directory
+        to the grid). Existing children with the same names are replaced.
+
+        :param str dircap: The writecap of the directory.
+        :param dict children: Capability strings, keyed by child name.
+        """
+        if not children:
+            return
+        dircap_hash = trunchash(dircap)
+        log.debug("Linking %i children into %s...", len(children), dircap_hash)
+        body = {}
+        for childname, childcap in children.items():
+            if childcap.startswith("URI:DIR"):
+                node_type = "dirnode"
+            else:
+                node_type = "filenode"
+            if "-RO:" in childcap or childcap.startswith(
+                ("URI:CHK:", "URI:LIT:")
+            ):
+                body[childname] = [node_type, {"ro_uri": childcap}]
+            else:
+                body[childname] = [node_type, {"rw_uri": childcap}]
+        yield self.await_ready()
+        yield self.lock.acquire(dircap)
+        try:
+            resp = yield treq.post(
+                "{}uri/{}/?t=set_children".format(self.nodeurl, dircap),
+                json.dumps(body).encode("utf-8"),
+                pool=self.pool,
+            )
+        finally:
+            self.listing_cache.invalidate(dircap)
+            yield self.lock.release(dircap)
+        if resp.code != 200:
+            content = yield treq.content(resp)
+            raise TahoeWebError(content.decode("utf-8"))
+        log.debug(
+            "Done linking %i children into %s", len(children), dircap_hash
+        )
+
     @inlineCallbacks
     def unlink(self, dircap, childname):
         dircap_hash = trunchash(dircap)
         log.debug('Unlinking "%s" from %s...', childname, dircap_hash)
         yield self.await_ready()
-        yield self.lock.acquire()
+        yield self.lock.acquire(dircap)
         try:
             resp = yield treq.post(
                 "{}uri/{}/?t=unlink&name={}".format(
                     self.nodeurl, dircap, childname
-                )
+                ),
+                pool=self.pool,
             )
         finally:
-            yield self.lock.release()
+            self.listing_cache.invalidate(dircap)
+            yield self.lock.release(dircap)
         if resp.code != 200:
             content = yield treq.content(resp)
             raise TahoeWebError(content.decode("utf-8"))
         log.debug('Done unlinking "%s" from %s', childname, dircap_hash)
 
+    def _get_rootcap_children(self, name):
+        children = {}
+        admin_dircap = self.get_admin_dircap(name)
+        if admin_dircap:
+            children[name + " (admin)"] = admin_dircap
+        children[name + " (collective)"] = self.get_collective_dircap(name)
+        children[name + " (personal)"] = self.get_magic_folder_dircap(name)
+        return children
+
     @inlineCallbacks
     def link_magic_folder_to_rootcap(self, name):
         log.debug("Linking folder '%s' to rootcap...", name)
-        rootcap = self.get_rootcap()
-        tasks = []
-        admin_dircap = self.get_admin_dircap(name)
-        if admin_dircap:
-            tasks.append(self.link(rootcap, name + " (admin)", admin_dircap))
-        collective_dircap = self.get_collective_dircap(name)
-        tasks.append(
-            self.link(rootcap, name + " (collective)", collective_dircap)
+        yield self.set_children(
+            self.get_rootcap(), self._get_rootcap_children(name)
         )
-        personal_dircap = self.get_magic_folder_dircap(name)
-        tasks.append(self.link(rootcap, name + " (personal)", personal_dircap))
-        yield DeferredList(tasks)
         log.debug("Successfully linked folder '%s' to rootcap", name)
 
     @inlineCallbacks
@@ -927,6 +1071,7 @@ class Tahoe:
     def remove_magic_folder(self, name):
         if name in self.magic_folders:
             del self.magic_folders[name]
+            self.folder_state_store.delete(name)
             yield self.command(["magic-folder", "leave", "-n", name])
             self.remove_alias(hashlib.sha256(name.encode()).hexdigest())
 
@@ -938,6 +1083,7 @@ class Tahoe:
             resp = yield treq.post(
                 self.nodeurl + "magic_folder",
                 {"token": self.api_token, "name": name, "t": "json"},
+                pool=self.pool,
             )
         except ConnectError:
             return None
@@ -950,9 +1096,16 @@ class Tahoe:
     def get_json(self, cap):
         if not cap or not self.nodeurl:
             return None
+        content = yield self.listing_cache.get(
+            cap, lambda: self._get_json(cap)
+        )
+        return content
+
+    @inlineCallbacks
+    def _get_json(self, cap):
         uri = "{}uri/{}/?t=json".format(self.nodeurl, cap)
         try:
-            resp = yield treq.get(uri)
+            resp = yield treq.get(uri, pool=self.pool)
         except ConnectError:
             return None
         if resp.code == 200:
@@ -1022,14 +1175,17 @@ class Tahoe:
             yield self.create_rootcap()
         if self.magic_folders:
             remote_folders = yield self.get_magic_folders_from_rootcap()
+            children = {}
             for folder in self.magic_folders:
                 if folder not in remote_folders:
-                    self.link_magic_folder_to_rootcap(folder)
+                    log.debug('Linking folder "%s" to rootcap...', folder)
+                    children.update(self._get_rootcap_children(folder))
                 else:
                     log.debug(
                         'Folder "%s" already linked to rootcap; ' "skipping.",
                         folder,
                     )
+            yield self.set_children(self.get_rootcap(), children)
 
     @inlineCallbacks
     def get_magic_folder_members(self, name, content=None):
@@ -1071,49 +1227,116 @@ class Tahoe:
             "cap": cap,
         }
 
+    def _extract_dmd_entries(self, member, json_data):
+        entries = []
+        try:
+            children = json_data[1]["children"]
+        except (TypeError, KeyError):
+            return entries
+        for filenode, data in children.items():
+            if filenode.endswith("@_"):
+                # Ignore subdirectories, due to Tahoe-LAFS bug #2924
+                # https://tahoe-lafs.org/trac/tahoe-lafs/ticket/2924
+                continue
+            try:
+                metadata = self._extract_metadata(data[1])
+            except KeyError:
+                continue
+            metadata["path"] = filenode.replace("@_", os.path.sep)
+            metadata["member"] = member
+            entries.append(metadata)
+        return entries
+
+    def _on_dmd_fetched(self, json_data, member, on_progress):
+        entries = self._extract_dmd_entries(member, json_data)
+        if entries and on_progress:
+            on_progress(entries)
+        return entries
+
     @inlineCallbacks
-    def get_magic_folder_state(self, name, members=None):
-        total_size = 0
-        history_dict = {}
+    def get_magic_folder_state(self, name, members=None, on_progress=None):
+        """
+        :param on_progress: A callable to pass the entries of each member's
+            DMD to as soon as it is fetched (i.e., before the whole scan is
+            complete).
+        """
+        state = FolderState()
         if not members:
             members = yield self.get_magic_folder_members(name)
         if members:
-            for member, dircap in members:
-                json_data = yield self.get_json(dircap)
-                try:
-                    children = json_data[1]["children"]
-                except (TypeError, KeyError):
-                    continue
-                for filenode, data in children.items():
-                    if filenode.endswith("@_"):
-                        # Ignore subdirectories, due to Tahoe-LAFS bug #2924
-                        # https://tahoe-lafs.org/trac/tahoe-lafs/ticket/2924
-                        continue
-                    try:
-                        metadata = self._extract_metadata(data[1])
-                    except KeyError:
-                        continue
-                    metadata["path"] = filenode.replace("@_", os.path.sep)
-                    metadata["member"] = member
-                    history_dict[metadata["mtime"]] = metadata
-                    total_size += metadata["size"]
-        history_od = OrderedDict(sorted(history_dict.items()))
-        latest_mtime = next(reversed(history_od), 0)
-        return members, total_size, latest_mtime, history_od
+            tasks = [
+                self.scan_semaphore.run(self.get_json, dircap).addCallback(
+                    self._on_dmd_fetched, member, on_progress
+                )
+                for member, dircap in members
+            ]
+            results = yield DeferredList(tasks, consumeErrors=True)
+            for success, entries in results:
+                if not success:
+                    entries.raiseException()
+                for metadata in entries:
+                    state.add(metadata)
+        return members, state.total_size, state.latest_mtime, state
+
+
+def _get_executable_signature(executable):
+    try:
+        st = os.stat(executable)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
 
 
-@inlineCallbacks
-def select_executable():
-    if getattr(sys, "frozen", False):
-        # Always select the bundled tahoe executable if using a binary build.
-        # To prevent issues caused by potentially broken or outdated tahoe
-        # installations on the user's PATH.
-        if sys.platform == "win32":
-            return os.path.join(pkgdir, "Tahoe-LAFS", "tahoe.exe")
-        return os.path.join(pkgdir, "Tahoe-LAFS", "tahoe")
-    executables = which("tahoe")
-    if not executables:
+def _load_feature_cache(path):
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_feature_cache(path, cache):
+    try:
+        with atomic_write(path, mode="w", overwrite=True) as f:
+            f.write(json.dumps(cache))
+    except OSError as e:
+        log.warning("Error saving executable feature cache: %s", str(e))
+
+
+def _get_cached_features(cache, executable):
+    entry = cache.get(executable)
+    if not isinstance(entry, dict):
         return None
+    signature = _get_executable_signature(executable)
+    if signature is None or entry.get("signature") != signature:
+        return None
+    features = entry.get("features")
+    if not isinstance(features, list) or len(features) != 2:
+        return None
+    return tuple(features)
+
+
+def _get_known_features(executables, cache):
+    features = {}
+    to_probe = []
+    saved_seconds = 0.0
+    for executable in executables:
+        cached = _get_cached_features(cache, executable)
+        if cached is None:
+            to_probe.append(executable)
+            continue
+        features[executable] = cached
+        saved_seconds = max(
+            saved_seconds, cache[executable].get("probe_seconds", 0.0)
+        )
+        if all(cached):
+            break  # Nothing later on the PATH would be selected anyway
+    return features, to_probe, saved_seconds
+
+
+@inlineCallbacks
+def _probe_features(executables, cache):
     tmpdir = tempfile.TemporaryDirectory()
     tasks = []
     for executable in executables:
@@ -1121,11 +1344,66 @@ def select_executable():
             "Found %s; checking for multi-magic-folder support...", executable
         )
         tasks.append(Tahoe(tmpdir.name, executable=executable).get_features())
+    start_time = time.monotonic()
     results = yield DeferredList(tasks)
+    probe_seconds = time.monotonic() - start_time
+    features = {}
     for success, result in results:
         if success:
             path, has_folder_support, has_multi_folder_support = result
-            if has_folder_support and has_multi_folder_support:
-                log.debug("Found suitable executable: %s", path)
-                return path
+            features[path] = (has_folder_support, has_multi_folder_support)
+            # A probe that fails outright may have done so for transient
+            # reasons (e.g., a timeout) so only cache definitive results.
+            if has_folder_support:
+                cache[path] = {
+                    "signature": _get_executable_signature(path),
+                    "features": [has_folder_support, has_multi_folder_support],
+                    "probe_seconds": probe_seconds,
+                }
+    return features
+
+
+@inlineCallbacks
+def select_executable(cache_file=None):
+    """
+    Select the first ``tahoe`` executable on the PATH with multi-magic-folder
+    support.
+
+    Probing an executable's features means running it (and thereby importing
+    all of Tahoe-LAFS) so results are persisted in ``cache_file``, keyed by
+    path and invalidated whenever the executable's size, mtime, or inode
+    changes.
+    """
+    if getattr(sys, "frozen", False):
+        # Always select the bundled tahoe executable if using a binary build.
+        # To prevent issues caused by potentially broken or outdated tahoe
+        # installations on the user's PATH.
+        if sys.platform == "win32":
+            return os.path.join(pkgdir, "Tahoe-LAFS", "tahoe.exe")
+        return os.path.join(pkgdir, "Tahoe-LAFS", "tahoe")
+    executables = which("tahoe")
+    if not executables:
+        return None
+    if cache_file is None:
+        cache_file = os.path.join(config_dir, "executables.json")
+    start_time = time.monotonic()
+    cache = _load_feature_cache(cache_file)
+    features, to_probe, saved_seconds = _get_known_features(executables, cache)
+    if to_probe:
+        probed = yield _probe_features(to_probe, cache)
+        features.update(probed)
+        _save_feature_cache(cache_file, cache)
+    log.debug(
+        "Checked %i tahoe executable(s) in %.3f seconds "
+        "(%i probed, %i cached; ~%.3f seconds saved)",
+        len(features),
+        time.monotonic() - start_time,
+        len(to_probe),
+        len(features) - len(to_probe),
+        saved_seconds,
+    )
+    for executable in executables:
+        if all(features.get(executable, (False, False))):
+            log.debug("Found suitable executable: %s", executable)
+            return executable
     return None
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+A simple instrument for recording when the phases of a multi-step process
+(such as application startup) begin and end.
+"""
+
+import logging
+import time
+
+
+class Timeline:
+    """
+    Records the start and end times of named phases, optionally grouped by
+    subject (e.g., the name of a gateway), relative to an origin.
+
+    :ivar float origin: The time at which the timeline was created, as given
+        by ``clock``.
+
+    :ivar list phases: ``[subject, phase, start, end]`` lists, in the order
+        in which the phases began. ``end`` is ``None`` for phases which are
+        still in progress.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.origin = clock()
+        self.phases = []
+
+    def begin(self, phase, subject=None):
+        self.phases.append([subject, phase, self._clock() - self.origin, None])
+
+    def end(self, phase, subject=None):
+        for entry in reversed(self.phases):
+            if entry[0] == subject and entry[1] == phase and entry[3] is None:
+                entry[3] = self._clock() - self.origin
+                return
+
+    def track(self, d, phase, subject=None):
+        """
+        Record ``phase`` as beginning now and ending when the Deferred ``d``
+        fires (whether successfully or not).
+
+        :return Deferred: ``d``, with its result passed through unchanged.
+        """
+        self.begin(phase, subject)
+
+        def _end(result):
+            self.end(phase, subject)
+            return result
+
+        return d.addBoth(_end)
+
+    def format(self, title="Timeline"):
+        lines = ["{} (seconds since start):".format(title)]
+        for subject, phase, start, end in self.phases:
+            name = "{}: {}".format(subject, phase) if subject else phase
+            if end is None:
+                lines.append(
+                    "  {:9.3f} ->       ...  (running)  {}".format(start, name)
+                )
+            else:
+                lines.append(
+                    "  {:9.3f} -> {:9.3f}  ({:7.3f})  {}".format(
+                        start, end, end - start, name
+                    )
+                )
+        return "\n".join(lines)
+
+    def log(self, title="Timeline"):
+        logging.debug(self.format(title))
@@ -2,7 +2,6 @@
 
 import logging
 
-import txtorcon
 from PyQt5.QtWidgets import QMessageBox
 from twisted.internet.defer import inlineCallbacks
 
@@ -39,6 +38,8 @@ def get_tor(reactor):  # TODO: Add launch option?
         if tor_setting and tor_setting.lower() == "false":
             return tor
     logging.debug("Looking for a running Tor daemon...")
+    import txtorcon
+
     try:
         tor = yield txtorcon.connect(reactor)
     except RuntimeError:
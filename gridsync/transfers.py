@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bookkeeping for the transfers (uploads and downloads) reported by the
+magic-folder "status" API.
+"""
+
+from collections import OrderedDict
+
+
+class OperationsTable:
+    """
+    The magic-folder operations of a sync in progress.
+
+    Only active ("queued" or "started") operations are kept; once an
+    operation has finished, only its key, the time at which it was queued
+    and (if it succeeded) its size are remembered -- in a bounded,
+    least-recently-seen table -- so that it is not counted again when
+    reported by subsequent polls.
+
+    :ivar int bytes_completed: The total size of the operations that have
+        finished successfully and were queued at or after the ``since`` most
+        recently given to ``update`` or ``get_progress``.
+    """
+
+    def __init__(self, max_finished=10000):
+        self.max_finished = max_finished
+        self.active = {}
+        self.bytes_completed = 0
+        self._since = 0
+        self._finished = OrderedDict()  # key -> (queued_at, size)
+
+    @staticmethod
+    def _get_key(task):
+        return "{}@{}".format(task["path"], task["queued_at"])
+
+    def _set_since(self, since):
+        # A different start time means a different sync; recount which of
+        # the remembered operations belong to it.
+        if since == self._since:
+            return
+        self._since = since
+        self.bytes_completed = sum(
+            size
+            for queued_at, size in self._finished.values()
+            if queued_at >= since
+        )
+
+    def _finish(self, key, task):
+        if key in self._finished:
+            self._finished.move_to_end(key)
+            return
+        size = (task["status"] == "success" and task["size"]) or 0
+        self._finished[key] = (task["queued_at"], size)
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+        if task["queued_at"] >= self._since:
+            self.bytes_completed += size
+
+    def update(self, tasks, since=0):
+        """
+        Replace the set of active operations with those in ``tasks`` (as
+        returned by a single poll of the "status" API), accounting for any
+        that have finished.
+
+        :param float since: The time at which the sync started; operations
+            which finished but were queued before then are not counted.
+        """
+        self._set_since(since)
+        active = {}
+        for task in tasks:
+            key = self._get_key(task)
+            if task["status"] in ("queued", "started"):
+                active[key] = task
+            else:
+                self._finish(key, task)
+        self.active = active
+
+    def get_progress(self, since=0):
+        """
+        :return tuple: The number of bytes transferred and the total number
+            of bytes to transfer (not taking into account erasure coding
+            overhead) for the operations queued at or after ``since``.
+        """
+        self._set_since(since)
+        bytes_transferred = self.bytes_completed
+        bytes_total = self.bytes_completed
+        for task in self.active.values():
+            size = task["size"]
+            if not size or task["queued_at"] < since:
+                continue
+            bytes_total += size
+            if task["status"] == "started":
+                # A (temporary?) workaround for Tahoe-LAFS ticket #2954
+                # whereby 'percent_done' will sometimes exceed 100%
+                # https://tahoe-lafs.org/trac/tahoe-lafs/ticket/2954
+                percent_done = min(100, task["percent_done"])
+                bytes_transferred += size * percent_done / 100
+        return bytes_transferred, bytes_total
+
+    def __len__(self):
+        return len(self.active)
+
+    def clear(self):
+        self.active = {}
+        self.bytes_completed = 0
+        self._since = 0
+        self._finished.clear()
+
+
+class RateEstimator:
+    """
+    An exponentially-weighted moving average of a transfer rate, given
+    successive samples of a cumulative byte count, such that estimates
+    follow changes in throughput within a few ``half_life`` seconds.
+
+    :ivar float rate: The current estimate, in bytes per second, or
+        ``None`` if no estimate has been made yet.
+    """
+
+    def __init__(self, half_life=10.0):
+        self.half_life = half_life
+        self.rate = None
+        self._last = None
+
+    def update(self, count, now, started=None):
+        """
+        :param float count: The number of bytes transferred so far.
+        :param float now: The time at which ``count`` was sampled.
+        :param float started: The time at which the transfer began, used to
+            make an initial estimate (the average rate since then) from the
+            first sample.
+
+        :return float: The updated estimate, or ``None``.
+        """
+        if self._last is None:
+            self._last = (count, now)
+            if started is not None and now > started:
+                self.rate = count / (now - started)
+            return self.rate
+        last_count, last_time = self._last
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return self.rate
+        # Counts can fall (e.g., when one of several transfers is dropped);
+        # treat that as a new baseline rather than as negative throughput.
+        instant = max(0, count - last_count) / elapsed
+        if self.rate is None:
+            self.rate = instant
+        else:
+            weight = 1 - 0.5 ** (elapsed / self.half_life)
+            self.rate += weight * (instant - self.rate)
+        self._last = (count, now)
+        return self.rate
+
+    def get_seconds_remaining(self, bytes_remaining):
+        if not self.rate:
+            return None
+        return bytes_remaining / self.rate
+
+    def reset(self):
+        self.rate = None
+        self._last = None
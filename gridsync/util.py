@@ -77,3 +77,23 @@ def strip_html_tags(s):
     ts = _TagStripper()
     ts.feed(s)
     return ts.get_data()
+
+
+class lazy_property:  # pylint: disable=too-few-public-methods
+    """
+    A property whose value is computed on first access and then stored on
+    the instance (where it may also be replaced by assignment), like
+    ``functools.cached_property`` in Python 3.8+.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        self.name = func.__name__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
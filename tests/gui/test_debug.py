@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import gzip
 from collections import deque
 from unittest.mock import Mock
 
@@ -8,6 +9,7 @@ from PyQt5.QtCore import Qt
 
 from gridsync.gui.debug import (
     DebugExporter,
+    LogExporter,
     LogLoader,
     header,
     system,
@@ -37,7 +39,8 @@ def core():
     fake_gateway.name = "TestGridOne"
     fake_gateway.newscap = "URI:NEWSCAP"
     fake_gateway.magic_folders = {}
-    fake_gateway.get_log = Mock(return_value="tahoe msg 1")
+    fake_gateway.iter_log = Mock(side_effect=lambda **_: iter(["tahoe msg 1"]))
+    fake_gateway.get_log_line_count = Mock(return_value=1)
     fake_gateway.get_settings = Mock(return_value={})
     fake_core.gui.main_window.gateways = [fake_gateway]
     return fake_core
@@ -169,35 +172,116 @@ def test_debug_exporter_export_to_file_no_dest_return(monkeypatch, tmpdir):
     assert de.close.call_count == 0
 
 
-def test_debug_exporter_export_to_file_success(monkeypatch, tmpdir):
-    de = DebugExporter(None)
-    expected_content = "EXPECTED_CONTENT"
-    de.plaintextedit.setPlainText(expected_content)
+def test_log_loader_iter_chunks_matches_full_log_format(core):
+    log_loader = LogLoader(core)
+    content = "".join(log_loader.iter_chunks())
+    assert content.endswith(
+        "\n----- Beginning of Tahoe-LAFS log for TestGridOne -----\n"
+        "tahoe msg 1"
+        "\n----- End of Tahoe-LAFS log for TestGridOne -----\n"
+    )
+    assert "debug msg 1\n/test/tahoe\ndebug msg 3\n----- End of" in content
+
+
+def test_log_loader_iter_chunks_filtered(core):
+    log_loader = LogLoader(core)
+    content = "".join(log_loader.iter_chunks(filtered=True))
+    assert core.executable not in content
+    assert "TestGridOne" not in content
+    core.gui.main_window.gateways[0].iter_log.assert_called_with(
+        apply_filter=True, identifier="1", tail=None
+    )
+
+
+def test_log_loader_preview_keeps_most_recent_lines(core):
+    core.log_deque = deque("debug msg {}".format(i) for i in range(10))
+    log_loader = LogLoader(core, preview_lines=3)
+    log_loader.load()
+    assert "[7 earlier lines omitted from preview" in log_loader.content
+    assert "debug msg 6" not in log_loader.content
+    assert "debug msg 7\ndebug msg 8\ndebug msg 9" in log_loader.content
+
+
+def test_log_loader_preview_requests_only_tail_of_tahoe_logs(core):
+    gateway = core.gui.main_window.gateways[0]
+    gateway.get_log_line_count = Mock(return_value=1000)
+    log_loader = LogLoader(core, preview_lines=3)
+    log_loader.load()
+    gateway.iter_log.assert_called_with(
+        apply_filter=True, identifier="1", tail=3
+    )
+    assert "[999 earlier lines omitted from preview" in log_loader.content
+
+
+def test_log_exporter_export_writes_full_log(core, tmpdir):
+    log_loader = LogLoader(core, preview_lines=1)
+    log_exporter = LogExporter(log_loader)
+    log_exporter.dest = str(tmpdir.join("log.txt"))
+    log_exporter.filtered = False
+    log_exporter.export()
+    with open(log_exporter.dest) as f:
+        content = f.read()
+    assert "debug msg 1\n/test/tahoe\ndebug msg 3" in content
+
+
+def test_log_exporter_export_gzip(core, tmpdir):
+    log_exporter = LogExporter(LogLoader(core))
+    log_exporter.dest = str(tmpdir.join("log.txt.gz"))
+    log_exporter.filtered = True
+    log_exporter.export()
+    with gzip.open(log_exporter.dest, "rt") as f:
+        content = f.read()
+    assert warning_text in content
+    assert core.executable not in content
+
+
+def test_log_exporter_export_emits_progress(core, qtbot, tmpdir):
+    core.log_deque = deque(str(i) for i in range(25))
+    log_exporter = LogExporter(LogLoader(core), progress_interval=10)
+    log_exporter.dest = str(tmpdir.join("log.txt"))
+    with qtbot.wait_signal(log_exporter.progress) as blocker:
+        log_exporter.export()
+    assert blocker.args == [10]
+
+
+def test_log_exporter_export_failed_signal(core, qtbot, tmpdir):
+    log_exporter = LogExporter(LogLoader(core))
+    log_exporter.dest = str(tmpdir.join("missing-dir", "log.txt"))
+    with qtbot.wait_signal(log_exporter.failed):
+        log_exporter.export()
+
+
+def test_debug_exporter_export_to_file_success(
+    core, monkeypatch, qtbot, tmpdir
+):
+    de = DebugExporter(core)
+    de.close = Mock()
     dest = str(tmpdir.join("log.txt"))
     fake_get_save_file_name = Mock(return_value=(dest, None))
     monkeypatch.setattr(
         "gridsync.gui.debug.QFileDialog.getSaveFileName",
         fake_get_save_file_name,
     )
-    de.export_to_file()
+    with qtbot.wait_signal(de.log_exporter.done):
+        de.export_to_file()
+    qtbot.wait_until(lambda: de.close.call_count == 1)
     with open(dest) as f:
-        assert f.read() == expected_content
+        assert warning_text in f.read()
 
 
-def test_debug_exporter_export_to_file_failure(monkeypatch, tmpdir):
-    de = DebugExporter(None)
-    de.plaintextedit.setPlainText("TEST_CONTENT")
-    dest = str(tmpdir.join("log.txt"))
+def test_debug_exporter_export_to_file_failure(
+    core, monkeypatch, qtbot, tmpdir
+):
+    de = DebugExporter(core)
+    dest = str(tmpdir.join("missing-dir", "log.txt"))
     fake_getSaveFileName = Mock(return_value=(dest, None))
     monkeypatch.setattr(
         "gridsync.gui.debug.QFileDialog.getSaveFileName", fake_getSaveFileName
     )
-    error_message = "Something Bad Happened"
-    fake_to_plain_text = Mock(side_effect=OSError(error_message))
-    monkeypatch.setattr(
-        "gridsync.gui.debug.QPlainTextEdit.toPlainText", fake_to_plain_text
-    )
     fake_error = Mock()
     monkeypatch.setattr("gridsync.gui.debug.error", fake_error)
-    de.export_to_file()
-    assert fake_error.call_args[0][2] == error_message
+    with qtbot.wait_signal(de.log_exporter.failed):
+        de.export_to_file()
+    qtbot.wait_until(lambda: fake_error.call_count == 1)
+    assert "missing-dir" in fake_error.call_args[0][2]
+    assert de.export_button.isEnabled()
@@ -2,129 +2,180 @@
 
 import os
 import shutil
-from unittest.mock import MagicMock, call
+from unittest.mock import MagicMock
 
 import pytest
+from PyQt5.QtCore import QEvent, QModelIndex, QRect, Qt
+from PyQt5.QtGui import QPainter, QPixmap
+from PyQt5.QtWidgets import QStyle, QStyleOptionViewItem
 
 from gridsync.gui.history import (
-    HistoryItemWidget,
-    HistoryListWidget,
+    HistoryItem,
+    HistoryItemRole,
+    HistoryListView,
+    HistoryModel,
     HistoryView,
 )
 
 
-@pytest.fixture(scope="function")
-def hiw(tmpdir_factory):
-    src = os.path.join(os.getcwd(), "gridsync", "resources", "pixel.png")
-    dst = str(tmpdir_factory.mktemp("test-magic-folder"))
-    shutil.copy(src, dst)
-    gateway = MagicMock()
-    gateway.get_magic_folder_directory.return_value = dst
-    return HistoryItemWidget(
-        gateway,
-        "TestFolder",
+def make_item(path="file.txt", mtime=123456789, member="admin"):
+    return HistoryItem(path, member, "added", 0, mtime)
+
+
+def paths(model):
+    return [model.item(row).path for row in range(model.rowCount())]
+
+
+def test_history_item_from_data_joins_directory():
+    item = HistoryItem.from_data(
         {
             "action": "added",
             "member": "admin",
             "mtime": 123456789,
-            "path": "pixel.png",
+            "path": "subdir/pixel.png",
             "size": 0,
         },
-        HistoryListWidget(gateway),
+        "/magic",
+    )
+    assert (item.path, item.basename, item.key) == (
+        os.path.join("/magic", "subdir/pixel.png"),
+        "pixel.png",
+        ("admin", os.path.join("/magic", "subdir/pixel.png")),
     )
 
 
-def test_history_item_widget_init(hiw):
-    assert hiw
+def test_history_item_details():
+    assert make_item().details.startswith("Added ")
 
 
-def test_history_item_widget__do_load_thumbnail(hiw):
-    hiw._do_load_thumbnail()
-    assert hiw.icon.pixmap()  # XXX
+def test_history_model_data():
+    model = HistoryModel()
+    item = make_item("dir/file.txt")
+    model.add_item(item)
+    index = model.index(0)
+    assert (
+        model.data(index, Qt.DisplayRole),
+        model.data(index, HistoryItemRole),
+        model.data(index, Qt.ToolTipRole).startswith("dir/file.txt"),
+    ) == ("file.txt", item, True)
 
 
-def test_history_item_widget_load_thumbnail(hiw, monkeypatch):
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryItemWidget.isVisible", lambda _: True
-    )
-    hiw.load_thumbnail()
-    assert hiw._thumbnail_loaded is True
+def test_history_model_data_invalid_index():
+    assert HistoryModel().data(QModelIndex()) is None
 
 
-def test_history_item_widget_unhilight(hiw):
-    hiw.button.show()
-    hiw.unhighlight()
-    assert hiw.button.isHidden()
+def test_history_model_add_item_newest_on_top():
+    model = HistoryModel()
+    model.add_item(make_item("b", mtime=2))
+    model.add_item(make_item("c", mtime=3))
+    model.add_item(make_item("a", mtime=1))
+    assert paths(model) == ["c", "b", "a"]
 
 
-def test_history_item_widget_enter_event(hiw):
-    hiw.enterEvent(None)
-    assert hiw.parent.highlighted == hiw
+def test_history_model_add_item_deduplicate():
+    model = HistoryModel()
+    model.add_item(make_item(mtime=1))
+    model.add_item(make_item(mtime=2))
+    assert (model.rowCount(), model.item(0).mtime) == (1, 2)
 
 
-def test_history_item_widget_enter_event_call_unhighlight(hiw):
-    m = MagicMock()
-    hiw.parent.highlighted = m
-    hiw.enterEvent(None)
-    assert m.method_calls == [call.unhighlight()]
+def test_history_model_add_item_deduplicate_among_equal_mtimes():
+    model = HistoryModel()
+    for path in ("a", "b", "c"):
+        model.add_item(make_item(path, mtime=1))
+    model.add_item(make_item("b", mtime=1))
+    assert paths(model) == ["b", "c", "a"]
 
 
-def test_history_item_widget_enter_event_pass_runtime_error(hiw):
-    hiw.parent.highlighted = MagicMock()
-    hiw.parent.highlighted.unhighlight = MagicMock(side_effect=RuntimeError)
-    hiw.enterEvent(None)
-    assert hiw.parent.highlighted == hiw
+def test_history_model_add_item_keeps_different_members():
+    model = HistoryModel()
+    model.add_item(make_item(member="alice"))
+    model.add_item(make_item(member="bob"))
+    assert model.rowCount() == 2
 
 
-@pytest.fixture(scope="function")
-def hlw(tmpdir_factory):
-    directory = str(tmpdir_factory.mktemp("test-magic-folder"))
-    gateway = MagicMock()
-    gateway.get_magic_folder_directory.return_value = directory
-    return HistoryListWidget(gateway)
+def test_history_model_add_item_no_deduplicate():
+    model = HistoryModel(deduplicate=False)
+    model.add_item(make_item(mtime=1))
+    model.add_item(make_item(mtime=2))
+    assert model.rowCount() == 2
 
 
-def test_history_list_widget_on_double_click(hlw, monkeypatch):
-    m = MagicMock()
-    monkeypatch.setattr("gridsync.gui.history.open_enclosing_folder", m)
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.itemWidget", MagicMock()
+def test_history_model_add_item_evicts_oldest():
+    model = HistoryModel(max_items=2)
+    for mtime in (1, 2, 3):
+        model.add_item(make_item(str(mtime), mtime=mtime))
+    model.add_item(make_item("1", mtime=1))  # Older than everything kept
+    assert (paths(model), sorted(model._index)) == (
+        ["3", "2"],
+        [("admin", "2"), ("admin", "3")],
     )
-    hlw.on_double_click(None)
-    assert m.mock_calls
 
 
-def test_history_list_widget_on_right_click(hlw, monkeypatch):
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.itemAt", MagicMock()
-    )
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.itemWidget", MagicMock()
-    )
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.itemWidget", MagicMock()
-    )
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.viewport", MagicMock()
-    )
-    m = MagicMock()
-    monkeypatch.setattr("gridsync.gui.history.QMenu", m)
-    hlw.on_right_click(None)
-    assert m.mock_calls
+def test_history_model_add_item_emits_rows_inserted(qtbot):
+    model = HistoryModel()
+    model.add_item(make_item("a", mtime=2))
+    with qtbot.wait_signal(model.rowsInserted) as blocker:
+        model.add_item(make_item("b", mtime=1))
+    assert blocker.args[1:] == [1, 1]
 
 
-def test_history_list_widget_on_right_click_no_item_return(hlw, monkeypatch):
-    monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.itemAt", lambda x, y: None
+@pytest.mark.parametrize("reset_threshold", [0, 1000])
+def test_history_model_add_items(reset_threshold):
+    model = HistoryModel(max_items=30)
+    model.reset_threshold = reset_threshold
+    model.add_item(make_item("file99", mtime=1))
+    model.add_items(
+        [make_item("file{}".format(i), mtime=i) for i in reversed(range(100))]
     )
-    m = MagicMock()
-    monkeypatch.setattr("gridsync.gui.history.QMenu", m)
-    hlw.on_right_click(None)
-    assert m.mock_calls == []
+    assert paths(model) == ["file{}".format(i) for i in range(99, 69, -1)]
+
+
+@pytest.mark.parametrize("reset_threshold", [0, 1000])
+def test_history_model_add_items_same_as_add_item(reset_threshold):
+    items = [make_item(str(i % 7), mtime=i % 3) for i in range(20)]
+    expected = HistoryModel()
+    expected.add_item(make_item("0", mtime=5))
+    for item in sorted(items, key=lambda i: i.mtime):
+        expected.add_item(item)
+    model = HistoryModel()
+    model.reset_threshold = reset_threshold
+    model.add_item(make_item("0", mtime=5))
+    model.add_items(items)
+    assert paths(model) == paths(expected)
+    assert len(model._index) == model.rowCount()
+
 
+def test_history_model_add_items_resets_model_for_large_batches(qtbot):
+    model = HistoryModel()
+    model.reset_threshold = 10
+    with qtbot.wait_signal(model.modelReset):
+        model.add_items([make_item(str(i), mtime=i) for i in range(11)])
 
-def test_history_list_widget_add_item(hlw):
-    hlw.add_item(
+
+def test_history_model_add_items_inserts_rows_for_small_batches(qtbot):
+    model = HistoryModel()
+    model.reset_threshold = 10
+    with qtbot.assert_not_emitted(model.modelReset):
+        model.add_items([make_item(str(i), mtime=i) for i in range(10)])
+
+
+def test_history_model_clear():
+    model = HistoryModel()
+    model.add_item(make_item())
+    model.clear()
+    assert (model.rowCount(), model._index) == (0, {})
+
+
+@pytest.fixture(scope="function")
+def hlv(tmpdir_factory):
+    src = os.path.join(os.getcwd(), "gridsync", "resources", "pixel.png")
+    directory = str(tmpdir_factory.mktemp("test-magic-folder"))
+    shutil.copy(src, directory)
+    gateway = MagicMock()
+    gateway.get_magic_folder_directory.return_value = directory
+    view = HistoryListView(gateway)
+    view.add_item(
         "TestFolder",
         {
             "action": "added",
@@ -134,86 +185,142 @@ def test_history_list_widget_add_item(hlw):
             "size": 0,
         },
     )
-    assert hlw.count() == 1
+    return view
 
 
-def test_history_list_widget_add_item_deduplicate(hlw):
-    hlw.add_item(
-        "TestFolder",
-        {
-            "action": "updated",
-            "member": "admin",
-            "mtime": 123456788,
-            "path": "pixel.png",
-            "size": 0,
-        },
+def test_history_list_view_add_item(hlv):
+    assert hlv.model().item(0).path == os.path.join(
+        hlv.gateway.get_magic_folder_directory(), "pixel.png"
     )
-    hlw.add_item(
-        "TestFolder",
-        {
-            "action": "updated",
-            "member": "admin",
-            "mtime": 123456789,
-            "path": "pixel.png",
-            "size": 0,
-        },
-    )
-    assert hlw.count() == 1
 
 
-def test_history_list_widget_update_visible_widgets(hlw, monkeypatch):
-    hlw.add_item(
+def test_history_list_view_add_items(hlv):
+    hlv.add_items(
         "TestFolder",
-        {
-            "action": "added",
-            "member": "admin",
-            "mtime": 99999,
-            "path": "pixel.png",
-            "size": 0,
-        },
+        [
+            {
+                "action": "updated",
+                "member": "admin",
+                "mtime": 123456790,
+                "path": "pixel.png",
+                "size": 0,
+            }
+        ],
+    )
+    assert (hlv.model().rowCount(), hlv.model().item(0).action) == (
+        1,
+        "updated",
     )
+
+
+def test_history_list_view_on_double_click(hlv, monkeypatch):
     m = MagicMock()
+    monkeypatch.setattr("gridsync.gui.history.open_enclosing_folder", m)
+    hlv.on_double_click(hlv.model().index(0))
+    m.assert_called_once_with(hlv.model().item(0).path)
+
+
+def test_history_list_view_on_right_click(hlv, monkeypatch):
     monkeypatch.setattr(
-        "gridsync.gui.history.HistoryItemWidget.update_text", m
+        "gridsync.gui.history.HistoryListView.indexAt",
+        lambda *args: hlv.model().index(0),
     )
+    m = MagicMock()
+    monkeypatch.setattr("gridsync.gui.history.QMenu", m)
+    hlv.on_right_click(None)
+    assert m.mock_calls
+
+
+def test_history_list_view_on_right_click_no_item_return(hlv, monkeypatch):
     monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.isVisible", lambda _: True
+        "gridsync.gui.history.HistoryListView.indexAt",
+        lambda *args: QModelIndex(),
     )
-    hlw.update_visible_widgets()
-    assert m.mock_calls == [call()]
+    m = MagicMock()
+    monkeypatch.setattr("gridsync.gui.history.QMenu", m)
+    hlv.on_right_click(None)
+    assert m.mock_calls == []
 
 
-def test_history_list_widget_update_visible_widgets_return(hlw, monkeypatch):
-    hlw.add_item(
-        "TestFolder",
-        {
-            "action": "added",
-            "member": "admin",
-            "mtime": 99999,
-            "path": "pixel.png",
-            "size": 0,
-        },
-    )
+def test_history_list_view_update_visible_rows(hlv, monkeypatch):
     m = MagicMock()
     monkeypatch.setattr(
-        "gridsync.gui.history.HistoryItemWidget.update_text", m
+        "gridsync.gui.history.HistoryListView.isVisible", lambda _: True
     )
     monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.isVisible", lambda _: False
+        "gridsync.gui.history.HistoryListView.viewport", lambda _: m
     )
-    hlw.update_visible_widgets()
-    assert m.mock_calls == []
+    hlv.update_visible_rows()
+    assert m.update.called
 
 
-def test_history_list_widget_update_visible_widgets_on_show_event(
-    hlw, monkeypatch
-):
+def test_history_list_view_update_visible_rows_return(hlv, monkeypatch):
     m = MagicMock()
     monkeypatch.setattr(
-        "gridsync.gui.history.HistoryListWidget.update_visible_widgets", m
+        "gridsync.gui.history.HistoryListView.isVisible", lambda _: False
     )
-    hlw.showEvent(None)
-    assert m.mock_calls == [call()]
+    monkeypatch.setattr(
+        "gridsync.gui.history.HistoryListView.viewport", lambda _: m
+    )
+    hlv.update_visible_rows()
+    assert not m.update.called
+
+
+def test_history_item_delegate_size_hint_is_uniform(hlv):
+    option = QStyleOptionViewItem()
+    option.rect = QRect(0, 0, 300, 0)
+    size = hlv.delegate.sizeHint(option, hlv.model().index(0))
+    assert (size.width(), size.height()) == (300, hlv.delegate.row_height)
+
+
+def test_history_item_delegate_get_pixmap_loads_thumbnail(hlv):
+    delegate = hlv.delegate
+    item = hlv.model().item(0)
+    icon = delegate.get_pixmap(item)
+    assert icon.cacheKey() == delegate.get_file_icon(item.path).cacheKey()
+    delegate.load_thumbnails()
+    thumbnail = delegate.get_pixmap(item)
+    assert (thumbnail.width(), thumbnail.height()) == (48, 48)
+    assert thumbnail.cacheKey() != icon.cacheKey()
+
+
+def test_history_item_delegate_does_not_load_thumbnail_for_non_images(hlv):
+    hlv.delegate.get_pixmap(make_item("/tmp/file.txt"))
+    assert not hlv.delegate._pending_thumbnails
+
+
+def test_history_item_delegate_bounds_thumbnail_cache(hlv):
+    delegate = hlv.delegate
+    delegate.max_thumbnails = 2
+    for mtime in range(3):
+        delegate.get_pixmap(make_item(hlv.model().item(0).path, mtime=mtime))
+    delegate.load_thumbnails()
+    assert [key[1] for key in delegate._thumbnails] == [1, 2]
+
+
+@pytest.mark.parametrize("hovered", [False, True])
+def test_history_item_delegate_paint(hlv, hovered):
+    option = QStyleOptionViewItem()
+    option.rect = QRect(0, 0, 300, hlv.delegate.row_height)
+    if hovered:
+        option.state |= QStyle.State_MouseOver
+    pixmap = QPixmap(300, hlv.delegate.row_height)
+    painter = QPainter(pixmap)
+    hlv.delegate.paint(painter, option, hlv.model().index(0))
+    painter.end()
+
+
+def test_history_item_delegate_action_button_clicked(hlv, qtbot, monkeypatch):
+    monkeypatch.setattr("gridsync.gui.history.QMenu", MagicMock())
+    event = MagicMock()
+    event.type.return_value = QEvent.MouseButtonRelease
+    event.button.return_value = Qt.LeftButton
+    option = QStyleOptionViewItem()
+    option.rect = QRect(0, 0, 300, hlv.delegate.row_height)
+    event.pos.return_value = hlv.delegate.get_action_rect(option.rect).center()
+    with qtbot.wait_signal(hlv.delegate.action_button_clicked) as blocker:
+        hlv.delegate.editorEvent(event, hlv.model(), option, QModelIndex())
+    assert blocker.args == [event.pos.return_value]
 
 
 def test_history_view_init():
@@ -221,3 +328,13 @@ def test_history_view_init():
     mock_gateway.shares_happy = 1
     hv = HistoryView(mock_gateway, MagicMock())
     assert hv
+
+
+def test_history_view_max_items_from_settings(monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.gui.history.settings", {"history": {"max_items": "5"}}
+    )
+    mock_gateway = MagicMock()
+    mock_gateway.shares_happy = 1
+    hv = HistoryView(mock_gateway, MagicMock())
+    assert hv.findChild(HistoryListView).model().max_items == 5
@@ -92,3 +92,29 @@ def test_on_nodes_updated_node_count_in_status_label_when_connecting(
     sp = StatusPanel(fake_tahoe, MagicMock())
     sp.on_nodes_updated(4, 5)
     assert sp.status_label.text() == "Connecting to TestGrid (4/5)..."
+
+
+def test_on_transfer_progress_updated_shown_while_syncing(fake_tahoe):
+    sp = StatusPanel(fake_tahoe, MagicMock())
+    sp.on_sync_state_updated(1)
+    sp.on_transfer_progress_updated(1000000, 4000000)
+    sp.on_transfer_seconds_remaining_updated(120)
+    assert sp.status_label.text() == (
+        "Syncing (1.0 MB of 4.0 MB; 2 minutes remaining)"
+    )
+
+
+def test_on_transfer_speed_updated_in_tooltip(fake_tahoe):
+    sp = StatusPanel(fake_tahoe, MagicMock())
+    sp.on_sync_state_updated(1)
+    sp.on_transfer_speed_updated(2000)
+    assert sp.status_label.toolTip().endswith("Transferring at 2.0 kB/s")
+
+
+def test_on_sync_state_updated_clears_transfer_details(fake_tahoe):
+    sp = StatusPanel(fake_tahoe, MagicMock())
+    sp.on_sync_state_updated(1)
+    sp.on_transfer_progress_updated(1000000, 4000000)
+    sp.on_sync_state_updated(2)
+    sp.on_sync_state_updated(1)
+    assert sp.status_label.text() == "Syncing"
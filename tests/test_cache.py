@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import MagicMock
+
+import pytest
+from twisted.internet.defer import Deferred, fail
+
+from gridsync.cache import ListingCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+def test_listing_cache_miss_calls_fetch(clock):
+    cache = ListingCache(10, clock)
+    fetch = MagicMock(return_value="listing")
+    d = cache.get("URI:DIR2:aaa", fetch)
+    assert (d.result, fetch.call_count) == ("listing", 1)
+
+
+def test_listing_cache_hit_does_not_call_fetch(clock):
+    cache = ListingCache(10, clock)
+    fetch = MagicMock(return_value="listing")
+    cache.get("URI:DIR2:aaa", fetch)
+    d = cache.get("URI:DIR2:aaa", fetch)
+    assert (d.result, fetch.call_count) == ("listing", 1)
+
+
+def test_listing_cache_expires_after_ttl(clock):
+    cache = ListingCache(10, clock)
+    fetch = MagicMock(return_value="listing")
+    cache.get("URI:DIR2:aaa", fetch)
+    clock.now = 10
+    cache.get("URI:DIR2:aaa", fetch)
+    assert fetch.call_count == 2
+
+
+def test_listing_cache_does_not_cache_none(clock):
+    cache = ListingCache(10, clock)
+    fetch = MagicMock(return_value=None)
+    cache.get("URI:DIR2:aaa", fetch)
+    cache.get("URI:DIR2:aaa", fetch)
+    assert fetch.call_count == 2
+
+
+def test_listing_cache_invalidate(clock):
+    cache = ListingCache(10, clock)
+    fetch = MagicMock(return_value="listing")
+    cache.get("URI:DIR2:aaa", fetch)
+    cache.invalidate("URI:DIR2:aaa")
+    cache.get("URI:DIR2:aaa", fetch)
+    assert fetch.call_count == 2
+
+
+def test_listing_cache_clear(clock):
+    cache = ListingCache(10, clock)
+    fetch = MagicMock(return_value="listing")
+    cache.get("URI:DIR2:aaa", fetch)
+    cache.get("URI:DIR2:bbb", fetch)
+    cache.clear()
+    assert cache.get_stats()["size"] == 0
+
+
+def test_listing_cache_coalesces_concurrent_fetches(clock):
+    cache = ListingCache(10, clock)
+    pending = Deferred()
+    fetch = MagicMock(return_value=pending)
+    d1 = cache.get("URI:DIR2:aaa", fetch)
+    d2 = cache.get("URI:DIR2:aaa", fetch)
+    pending.callback("listing")
+    assert (d1.result, d2.result, fetch.call_count) == (
+        "listing",
+        "listing",
+        1,
+    )
+
+
+def test_listing_cache_coalesced_waiters_receive_failure(clock):
+    cache = ListingCache(10, clock)
+    pending = Deferred()
+    cache.get("URI:DIR2:aaa", lambda: pending).addErrback(lambda _: None)
+    d = cache.get("URI:DIR2:aaa", lambda: pending)
+    errors = []
+    d.addErrback(errors.append)
+    pending.errback(ValueError("oops"))
+    assert errors[0].check(ValueError)
+
+
+def test_listing_cache_invalidate_during_fetch_does_not_cache(clock):
+    cache = ListingCache(10, clock)
+    pending = Deferred()
+    cache.get("URI:DIR2:aaa", lambda: pending)
+    cache.invalidate("URI:DIR2:aaa")
+    pending.callback("stale listing")
+    assert cache.get_stats()["size"] == 0
+
+
+def test_listing_cache_does_not_cache_failures(clock):
+    cache = ListingCache(10, clock)
+    cache.get("URI:DIR2:aaa", lambda: fail(ValueError())).addErrback(
+        lambda _: None
+    )
+    assert cache.get_stats()["size"] == 0
+
+
+def test_listing_cache_get_stats(clock):
+    cache = ListingCache(10, clock)
+    pending = Deferred()
+    cache.get("URI:DIR2:aaa", lambda: pending)
+    cache.get("URI:DIR2:aaa", lambda: pending)
+    pending.callback("listing")
+    cache.get("URI:DIR2:aaa", lambda: pending)
+    assert cache.get_stats() == {
+        "hits": 1,
+        "misses": 1,
+        "coalesced": 1,
+        "size": 1,
+    }
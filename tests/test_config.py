@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import os
+from configparser import RawConfigParser
+from unittest.mock import Mock
+
+import pytest
+from atomicwrites import atomic_write
 
 from gridsync.config import Config
 
@@ -45,3 +50,63 @@ def test_config_load(tmpdir):
     with open(config.filename, "w") as f:
         f.write("[test_section]\ntest_option = test_value\n\n")
     assert config.load() == {"test_section": {"test_option": "test_value"}}
+
+
+def test_config_get_cached_until_file_changes(monkeypatch, tmpdir):
+    filename = os.path.join(str(tmpdir), "test_cache.ini")
+    with open(filename, "w") as f:
+        f.write("[test_section]\ntest_option = test_value\n\n")
+    reads = []
+    original_read = RawConfigParser.read
+
+    def counting_read(self, filenames, *args, **kwargs):
+        reads.append(filenames)
+        return original_read(self, filenames, *args, **kwargs)
+
+    monkeypatch.setattr(RawConfigParser, "read", counting_read)
+    config = Config(filename)
+    assert config.get("test_section", "test_option") == "test_value"
+    assert Config(filename).get("test_section", "test_option") == "test_value"
+    assert len(reads) == 1
+    with open(filename, "w") as f:
+        f.write("[test_section]\ntest_option = changed_value\n\n")
+    assert config.get("test_section", "test_option") == "changed_value"
+    assert len(reads) == 2
+
+
+def test_config_set_updates_cache_without_rereading(monkeypatch, tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_set_cache.ini"))
+    config.set("test_section", "test_option", "test_value")
+    monkeypatch.setattr(
+        RawConfigParser, "read", Mock(side_effect=AssertionError("Re-read"))
+    )
+    assert config.get("test_section", "test_option") == "test_value"
+
+
+def test_config_batch_coalesces_writes(monkeypatch, tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_batch.ini"))
+    fake_atomic_write = Mock(wraps=atomic_write)
+    monkeypatch.setattr("gridsync.config.atomic_write", fake_atomic_write)
+    with config.batch():
+        config.set("test_section", "option_1", "value_1")
+        with Config(config.filename).batch():
+            config.set("test_section", "option_2", "value_2")
+        config.save({"other_section": {"option_3": "value_3"}})
+        assert config.get("test_section", "option_2") == "value_2"
+        assert not os.path.exists(config.filename)
+    assert fake_atomic_write.call_count == 1
+    assert Config(config.filename).load() == {
+        "test_section": {"option_1": "value_1", "option_2": "value_2"},
+        "other_section": {"option_3": "value_3"},
+    }
+
+
+def test_config_failed_write_invalidates_cache(monkeypatch, tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_failed_write.ini"))
+    config.set("test_section", "test_option", "test_value")
+    monkeypatch.setattr(
+        "gridsync.config.atomic_write", Mock(side_effect=OSError("Disk full"))
+    )
+    with pytest.raises(OSError):
+        config.set("test_section", "test_option", "unwritten_value")
+    assert config.get("test_section", "test_option") == "test_value"
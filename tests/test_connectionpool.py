@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import MagicMock
+
+from twisted.internet.testing import MemoryReactorClock
+
+from gridsync.connectionpool import ConnectionPool
+
+
+def test_connection_pool_settings():
+    pool = ConnectionPool(MemoryReactorClock(), 5, 30)
+    assert (pool.maxPersistentPerHost, pool.cachedConnectionTimeout) == (5, 30)
+
+
+def test_connection_pool_defaults_persistent():
+    pool = ConnectionPool(MemoryReactorClock())
+    assert pool.persistent is True
+
+
+def test_connection_pool_counts_opened_connections():
+    pool = ConnectionPool(MemoryReactorClock())
+    endpoint = MagicMock()
+    pool.getConnection("key", endpoint)
+    pool.getConnection("key", endpoint)
+    assert (pool.connections_opened, pool.connections_reused) == (2, 0)
+
+
+def test_connection_pool_counts_reused_connections():
+    pool = ConnectionPool(MemoryReactorClock())
+    connection = MagicMock(state="QUIESCENT")
+    pool._putConnection("key", connection)
+    pool.getConnection("key", MagicMock())
+    assert (pool.connections_opened, pool.connections_reused) == (0, 1)
+
+
+def test_connection_pool_get_stats_counts_idle_connections():
+    pool = ConnectionPool(MemoryReactorClock())
+    pool._putConnection("key", MagicMock(state="QUIESCENT"))
+    assert pool.get_stats() == {"opened": 0, "reused": 0, "idle": 1}
+
+
+def test_connection_pool_evicts_idle_connections():
+    reactor = MemoryReactorClock()
+    pool = ConnectionPool(reactor, idle_timeout=10)
+    pool._putConnection("key", MagicMock(state="QUIESCENT"))
+    reactor.advance(11)
+    assert pool.get_stats()["idle"] == 0
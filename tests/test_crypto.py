@@ -2,7 +2,9 @@
 
 from hashlib import sha256
 
-import nacl
+import nacl.exceptions
+import nacl.pwhash
+import nacl.secret
 import pytest
 
 from gridsync.crypto import Crypter, VersionError, decrypt, encrypt
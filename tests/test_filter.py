@@ -3,15 +3,20 @@
 import json
 import os
 from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import Mock
 
 import pytest
 
 from gridsync import autostart_file_path, config_dir, pkgdir
 from gridsync.filter import (
+    Redactor,
     apply_filters,
     filter_tahoe_log_message,
+    filter_tahoe_log_messages,
     get_filters,
+    iter_filter_tahoe_log_messages,
 )
 
 
@@ -141,6 +146,49 @@ def test_apply_filters_filtered_string_in_result(core, string, filtered):
     assert "<Filtered:{}>".format(filtered) in result
 
 
+def test_apply_filters_prefers_longest_match():
+    filters = [("/home/user", "HomeDir"), ("/home/user/Documents", "Dir")]
+    result = apply_filters("cd /home/user/Documents; ls /home/user", filters)
+    assert result == "cd <Filtered:Dir>; ls <Filtered:HomeDir>"
+
+
+def test_apply_filters_first_mask_wins_for_duplicate_strings():
+    filters = [("Alice", "Member:1"), ("Alice", "Member:2")]
+    assert apply_filters("Alice", filters) == "<Filtered:Member:1>"
+
+
+def test_apply_filters_does_not_refilter_masks():
+    filters = [("TestGrid", "GatewayName:1"), ("Filtered", "Oops")]
+    assert apply_filters("TestGrid", filters) == ("<Filtered:GatewayName:1>")
+
+
+def test_apply_filters_ignores_empty_strings_and_masks():
+    filters = [(None, "Rootcap:1"), ("", "Newscap:1"), ("Bob", None)]
+    assert apply_filters("Bob", filters) == "Bob"
+
+
+def test_apply_filters_escapes_regex_metacharacters():
+    filters = [("pb://333@444.example:1234/5555", "StorageServerFurl:1:1")]
+    assert apply_filters("pb://333@444Xexample:1234/5555", filters) == (
+        "pb://333@444Xexample:1234/5555"
+    )
+
+
+def test_apply_filters_accepts_redactor(core):
+    redactor = Redactor(get_filters(core))
+    assert apply_filters("Bob", redactor) == redactor.redact("Bob")
+
+
+def test_redactor_many_filters_with_shared_prefixes():
+    filters = [
+        ("URI:DIR2:{}".format(i), "Cap:{}".format(i)) for i in range(500)
+    ]
+    redactor = Redactor(filters)
+    assert redactor.redact("URI:DIR2:42 URI:DIR2:420") == (
+        "<Filtered:Cap:42> <Filtered:Cap:420>"
+    )
+
+
 @pytest.mark.parametrize(
     "msg,keys",
     [
@@ -619,3 +667,116 @@ def test__apply_filter_by_message_type(msg, keys):
         original_value = str(msg.get(key))
         filtered_msg = filter_tahoe_log_message(json.dumps(msg), "1")
         assert original_value not in filtered_msg
+
+
+def test_filter_tahoe_log_message_reencodes_without_matching_type():
+    message = '{"message_type": "other", "path": "/secret", "z": 1, "a": 2}'
+    assert filter_tahoe_log_message(message, "1") == (
+        '{"a": 2, "message_type": "other", "path": "/secret", "z": 1}'
+    )
+
+
+def test_filter_tahoe_log_message_type_must_match_exactly():
+    msg = {
+        "message_type": "magic-folder:notified-object-disappeared",
+        "path": "/secret",
+        "nickname": "TestGrid",
+    }
+    filtered = json.loads(filter_tahoe_log_message(json.dumps(msg), "1"))
+    assert filtered["path"] != "/secret"
+    assert filtered["nickname"] == "TestGrid"
+
+
+def test_filter_tahoe_log_message_uses_identifier_for_gateway_name():
+    msg = {"action_type": "magic-folder:full-scan", "nickname": "TestGrid"}
+    filtered = json.loads(filter_tahoe_log_message(json.dumps(msg), "3"))
+    assert filtered["nickname"] == "<Filtered:GatewayName:3>"
+
+
+def test_filter_tahoe_log_messages_serial_preserves_order():
+    messages = [
+        json.dumps({"message_type": "magic-folder:maybe-upload", "n": i})
+        for i in range(10)
+    ]
+    filtered = filter_tahoe_log_messages(
+        messages, "1", processes=1, chunk_size=3
+    )
+    assert [json.loads(m)["n"] for m in filtered] == list(range(10))
+
+
+def test_filter_tahoe_log_messages_parallel_preserves_order():
+    messages = [
+        (
+            json.dumps({"message_type": "magic-folder:maybe-upload", "n": i})
+            if i % 2
+            else json.dumps({"message_type": "other", "n": i})
+        )
+        for i in range(1000)
+    ]
+    filtered = filter_tahoe_log_messages(
+        iter(messages), "1", processes=2, chunk_size=100
+    )
+    assert filtered == [filter_tahoe_log_message(m, "1") for m in messages]
+
+
+def test_filter_tahoe_log_messages_falls_back_to_serial(monkeypatch):
+    def broken_pool(*args, **kwargs):
+        raise OSError("No processes for you")
+
+    monkeypatch.setattr("gridsync.filter.ProcessPoolExecutor", broken_pool)
+    messages = [json.dumps({"message_type": "x", "n": i}) for i in range(10)]
+    assert (
+        filter_tahoe_log_messages(messages, "1", processes=2, chunk_size=3)
+        == messages
+    )
+
+
+class FakeExecutor:
+    def __init__(self, *args, fail_at=None, **kwargs):
+        self.submitted = 0
+        self.fail_at = fail_at
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        if self.submitted == self.fail_at:
+            future.set_exception(BrokenProcessPool("Worker died"))
+        else:
+            future.set_result(fn(*args))
+        return future
+
+
+def test_iter_filter_tahoe_log_messages_bounds_chunks_in_flight(monkeypatch):
+    executor = FakeExecutor()
+    monkeypatch.setattr(
+        "gridsync.filter.ProcessPoolExecutor", lambda **_: executor
+    )
+    messages = [json.dumps({"message_type": "x", "n": i}) for i in range(30)]
+    filtered = iter_filter_tahoe_log_messages(
+        messages, "1", processes=2, chunk_size=3
+    )
+    assert next(filtered) == messages[0]
+    assert executor.submitted == 4
+    assert [messages[0]] + list(filtered) == messages
+
+
+def test_iter_filter_tahoe_log_messages_falls_back_mid_stream(monkeypatch):
+    executor = FakeExecutor(fail_at=3)
+    monkeypatch.setattr(
+        "gridsync.filter.ProcessPoolExecutor", lambda **_: executor
+    )
+    messages = [json.dumps({"message_type": "x", "n": i}) for i in range(30)]
+    assert (
+        list(
+            iter_filter_tahoe_log_messages(
+                messages, "1", processes=2, chunk_size=3
+            )
+        )
+        == messages
+    )
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import Mock
+
+import pytest
+
+from gridsync.folderstate import FolderState, FolderStateStore
+
+
+def entry(path, mtime, member="admin", size=1, deleted=False):
+    return {
+        "size": size,
+        "mtime": mtime,
+        "deleted": deleted,
+        "cap": "URI:CHK:{}:{}".format(path, mtime),
+        "path": path,
+        "member": member,
+    }
+
+
+def test_folder_state_keyed_by_member_and_path():
+    state = FolderState([entry("a", 1.0), entry("b", 1.0)])
+    assert len(state) == 2
+
+
+def test_folder_state_replaces_entry_for_same_member_and_path():
+    state = FolderState([entry("a", 1.0, size=5), entry("a", 2.0, size=7)])
+    assert (len(state), state.total_size) == (1, 7)
+
+
+def test_folder_state_values_ordered_by_mtime():
+    state = FolderState([entry("b", 3.0), entry("a", 1.0), entry("c", 2.0)])
+    assert [e["path"] for e in state.values()] == ["a", "c", "b"]
+
+
+def test_folder_state_latest_mtime():
+    state = FolderState([entry("b", 3.0), entry("a", 1.0)])
+    assert state.latest_mtime == 3.0
+
+
+def test_folder_state_latest_mtime_empty():
+    assert FolderState().latest_mtime == 0
+
+
+def test_folder_state_latest_across_members():
+    state = FolderState([entry("a", 2.0, "Bob"), entry("a", 1.0, "Alice")])
+    assert state.latest("a")["member"] == "Bob"
+
+
+def test_folder_state_contains():
+    state = FolderState([entry("a", 1.0, "Alice")])
+    assert ("Alice", "a") in state
+
+
+def test_folder_state_diff_unchanged():
+    previous = FolderState([entry("a", 1.0)])
+    current = FolderState([entry("a", 1.0)])
+    assert current.diff(previous) == []
+
+
+def test_folder_state_diff_added():
+    current = FolderState([entry("a", 1.0)])
+    assert [a for a, _ in current.diff(FolderState())] == ["added"]
+
+
+def test_folder_state_diff_created_directory():
+    current = FolderState([entry("subdir/", 1.0)])
+    assert [a for a, _ in current.diff(FolderState())] == ["created"]
+
+
+def test_folder_state_diff_updated_by_other_member():
+    previous = FolderState([entry("a", 1.0, "Alice")])
+    current = FolderState([entry("a", 1.0, "Alice"), entry("a", 2.0, "Bob")])
+    assert [(a, e["member"]) for a, e in current.diff(previous)] == [
+        ("updated", "Bob")
+    ]
+
+
+def test_folder_state_diff_deleted():
+    previous = FolderState([entry("a", 1.0)])
+    current = FolderState([entry("a", 2.0, deleted=True)])
+    assert [a for a, _ in current.diff(previous)] == ["deleted"]
+
+
+def test_folder_state_diff_restored():
+    previous = FolderState([entry("a", 1.0, deleted=True)])
+    current = FolderState([entry("a", 2.0)])
+    assert [a for a, _ in current.diff(previous)] == ["restored"]
+
+
+def test_folder_state_diff_ordered_by_mtime():
+    current = FolderState([entry("b", 2.0), entry("a", 1.0)])
+    assert [e["path"] for _, e in current.diff(FolderState())] == ["a", "b"]
+
+
+@pytest.fixture()
+def store(tmpdir):
+    store = FolderStateStore(str(tmpdir.join("folder-state.sqlite")))
+    yield store
+    store.close()
+
+
+MEMBERS = [("admin", "URI:DIR2-RO:aaa")]
+
+
+def test_folder_state_store_load_returns_none_if_nothing_saved(store):
+    assert store.load("TestFolder") is None
+
+
+def test_folder_state_store_save_and_load(store):
+    state = FolderState([entry("a", 1.0), entry("b", 2.0, deleted=True)])
+    store.save("TestFolder", "URI:DIR2-RO:c", MEMBERS, state)
+    members, loaded = store.load("TestFolder", "URI:DIR2-RO:c")
+    assert members == MEMBERS
+    assert loaded.values() == state.values()
+
+
+def test_folder_state_store_load_persists_across_instances(store):
+    store.save("TestFolder", None, MEMBERS, FolderState([entry("a", 1.0)]))
+    store.close()
+    other = FolderStateStore(store.path)
+    _, loaded = other.load("TestFolder")
+    other.close()
+    assert len(loaded) == 1
+
+
+def test_folder_state_store_load_ignores_other_collective(store):
+    store.save("TestFolder", "URI:DIR2-RO:old", MEMBERS, FolderState())
+    assert store.load("TestFolder", "URI:DIR2-RO:new") is None
+
+
+def test_folder_state_store_save_writes_only_changes(store):
+    previous = FolderState([entry("a", 1.0), entry("b", 1.0)])
+    store.save("TestFolder", None, MEMBERS, previous)
+    current = FolderState([entry("a", 1.0), entry("b", 2.0), entry("c", 2.0)])
+    assert store.save("TestFolder", None, MEMBERS, current, previous) == 2
+
+
+def test_folder_state_store_save_removes_vanished_entries(store):
+    previous = FolderState([entry("a", 1.0), entry("b", 1.0)])
+    store.save("TestFolder", None, MEMBERS, previous)
+    current = FolderState([entry("a", 1.0)])
+    store.save("TestFolder", None, MEMBERS, current, previous)
+    _, loaded = store.load("TestFolder")
+    assert [e["path"] for e in loaded] == ["a"]
+
+
+def test_folder_state_store_save_skips_write_if_unchanged(store, monkeypatch):
+    state = FolderState([entry("a", 1.0)])
+    store.save("TestFolder", None, MEMBERS, state)
+    monkeypatch.setattr(store, "_connect", Mock(side_effect=AssertionError))
+    assert store.save("TestFolder", None, MEMBERS, state, state) == 0
+
+
+def test_folder_state_store_save_without_previous_replaces_all(store):
+    store.save("TestFolder", None, MEMBERS, FolderState([entry("a", 1.0)]))
+    store.save("TestFolder", None, MEMBERS, FolderState([entry("b", 1.0)]))
+    _, loaded = store.load("TestFolder")
+    assert [e["path"] for e in loaded] == ["b"]
+
+
+def test_folder_state_store_delete(store):
+    store.save("TestFolder", None, MEMBERS, FolderState([entry("a", 1.0)]))
+    store.delete("TestFolder")
+    assert store.load("TestFolder") is None
+
+
+def test_folder_state_store_save_returns_none_on_error(tmpdir):
+    store = FolderStateStore(str(tmpdir.join("missing", "state.sqlite")))
+    assert store.save("TestFolder", None, MEMBERS, FolderState()) is None
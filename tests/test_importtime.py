@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Guards against regressions in the time taken to import the application
+(and so, to start it).
+
+These tests run in the default suite (so that CI fails on a regression);
+the budget can be adjusted for slower machines with the
+``GRIDSYNC_IMPORT_BUDGET_MS`` environment variable.
+"""
+
+import os
+import subprocess
+import sys
+
+# Modules that are only needed for particular user actions (e.g., sending or
+# receiving an invite, or creating a recovery key) and should therefore not
+# be imported at startup.
+DEFERRED_MODULES = [
+    "gridsync.wormhole_",
+    "nacl.pwhash",
+    "txtorcon",
+    "wormhole",
+    "zxcvbn",
+]
+
+
+def run_python(code, *args):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def parse_importtime(output):
+    """
+    :return dict: The cumulative import time, in microseconds, of each
+        module listed in the output of ``python -X importtime``.
+    """
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            times[name.strip()] = int(cumulative)
+        except ValueError:  # The header line
+            continue
+    return times
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        150 |   gridsync.util\n"
+        "import time:      2000 |       5000 | gridsync\n"
+    )
+    assert parse_importtime(output) == {
+        "gridsync.util": 150,
+        "gridsync": 5000,
+    }
+
+
+def test_deferred_modules_not_imported_at_startup():
+    result = run_python(
+        "import sys, gridsync.core; "
+        "print(' '.join(m for m in {} if m in sys.modules))".format(
+            DEFERRED_MODULES
+        )
+    )
+    assert result.stdout.split() == []
+
+
+def test_import_time_within_budget():
+    budget_ms = int(os.environ.get("GRIDSYNC_IMPORT_BUDGET_MS", "2000"))
+    result = run_python("import gridsync.core", "-X", "importtime")
+    elapsed_ms = parse_importtime(result.stderr)["gridsync.core"] / 1000
+    assert elapsed_ms < budget_ms
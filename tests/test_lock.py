@@ -5,7 +5,7 @@ import os
 import pytest
 
 from gridsync.errors import FilesystemLockError
-from gridsync.lock import FilesystemLock
+from gridsync.lock import FilesystemLock, KeyedDeferredLock
 
 
 def test_lock_acquire(tmpdir):
@@ -41,3 +41,72 @@ def test_lock_release(tmpdir):
     lock.release()
     lock.acquire()
     lock.release()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_keyed_lock_different_keys_do_not_contend():
+    lock = KeyedDeferredLock()
+    d1 = lock.acquire("URI:DIR2:one")
+    d2 = lock.acquire("URI:DIR2:two")
+    assert (d1.called, d2.called) == (True, True)
+    assert lock.get_stats()["contended"] == 0
+
+
+def test_keyed_lock_same_key_is_serialized_in_order():
+    lock = KeyedDeferredLock()
+    acquired = []
+    for i in range(3):
+        lock.acquire("URI:DIR2:one").addCallback(
+            lambda _, i=i: acquired.append(i)
+        )
+    assert acquired == [0]
+    lock.release("URI:DIR2:one")
+    assert acquired == [0, 1]
+    lock.release("URI:DIR2:one")
+    assert acquired == [0, 1, 2]
+
+
+def test_keyed_lock_discards_idle_locks():
+    lock = KeyedDeferredLock()
+    lock.acquire("URI:DIR2:one")
+    assert lock.is_locked("URI:DIR2:one")
+    lock.release("URI:DIR2:one")
+    assert not lock.is_locked("URI:DIR2:one")
+    assert lock.get_stats()["held"] == 0
+
+
+def test_keyed_lock_records_wait_times():
+    clock = FakeClock()
+    lock = KeyedDeferredLock(clock)
+    lock.acquire("URI:DIR2:one")
+    lock.acquire("URI:DIR2:one")
+    clock.now = 2.5
+    lock.release("URI:DIR2:one")
+    stats = lock.get_stats()
+    assert (stats["contended"], stats["max_wait"], stats["total_wait"]) == (
+        1,
+        2.5,
+        2.5,
+    )
+
+
+def test_keyed_lock_when_idle_fires_once_all_keys_released():
+    lock = KeyedDeferredLock()
+    lock.acquire("URI:DIR2:one")
+    lock.acquire("URI:DIR2:two")
+    d = lock.when_idle()
+    lock.release("URI:DIR2:one")
+    assert not d.called
+    lock.release("URI:DIR2:two")
+    assert d.called
+
+
+def test_keyed_lock_when_idle_fires_immediately_if_unlocked():
+    assert KeyedDeferredLock().when_idle().called
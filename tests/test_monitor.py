@@ -4,8 +4,17 @@ from unittest.mock import MagicMock, Mock, call
 
 import pytest
 from pytest_twisted import inlineCallbacks
-
-from gridsync.monitor import GridChecker, MagicFolderChecker, Monitor
+from twisted.internet.defer import Deferred, DeferredSemaphore
+from twisted.internet.testing import MemoryReactorClock
+
+from gridsync.folderstate import FolderState
+from gridsync.monitor import (
+    GridChecker,
+    MagicFolderChecker,
+    Monitor,
+    ReadinessTracker,
+    SignalBatcher,
+)
 
 
 @pytest.fixture(scope="function")
@@ -222,7 +231,9 @@ def test_compare_states_emit_file_updated(mfc, qtbot):
         }
     }
     with qtbot.wait_signal(mfc.file_updated):
-        mfc.compare_states(current, previous)
+        mfc.compare_states(
+            FolderState(current.values()), FolderState(previous.values())
+        )
 
 
 def test_compare_states_file_added(mfc):
@@ -237,7 +248,9 @@ def test_compare_states_file_added(mfc):
             "member": "admin",
         }
     }
-    mfc.compare_states(current, previous)
+    mfc.compare_states(
+        FolderState(current.values()), FolderState(previous.values())
+    )
     assert mfc.updated_files[0]["action"] == "added"
 
 
@@ -262,7 +275,9 @@ def test_compare_states_file_updated(mfc):
             "member": "admin",
         }
     }
-    mfc.compare_states(current, previous)
+    mfc.compare_states(
+        FolderState(current.values()), FolderState(previous.values())
+    )
     assert mfc.updated_files[0]["action"] == "updated"
 
 
@@ -287,7 +302,9 @@ def test_compare_states_file_deleted(mfc):
             "member": "admin",
         }
     }
-    mfc.compare_states(current, previous)
+    mfc.compare_states(
+        FolderState(current.values()), FolderState(previous.values())
+    )
     assert mfc.updated_files[0]["action"] == "deleted"
 
 
@@ -312,7 +329,9 @@ def test_compare_states_file_restored(mfc):
             "member": "admin",
         }
     }
-    mfc.compare_states(current, previous)
+    mfc.compare_states(
+        FolderState(current.values()), FolderState(previous.values())
+    )
     assert mfc.updated_files[0]["action"] == "restored"
 
 
@@ -345,13 +364,45 @@ def test_compare_states_directory_created(mfc):
             "member": "admin",
         },
     }
-    mfc.compare_states(current, previous)
+    mfc.compare_states(
+        FolderState(current.values()), FolderState(previous.values())
+    )
     assert mfc.updated_files[0]["action"] == "created"
 
 
+def test_compare_states_same_mtime_files_both_added(mfc):
+    current = FolderState(
+        [
+            {
+                "size": 1024,
+                "mtime": 1234567890.123456,
+                "deleted": False,
+                "cap": "URI:CHK:aaaaaa:bbbbbb:1:1:1024",
+                "path": "file_1",
+                "member": "admin",
+            },
+            {
+                "size": 1024,
+                "mtime": 1234567890.123456,
+                "deleted": False,
+                "cap": "URI:CHK:cccccc:dddddd:1:1:1024",
+                "path": "file_2",
+                "member": "admin",
+            },
+        ]
+    )
+    mfc.compare_states(current, FolderState())
+    assert [f["path"] for f in mfc.updated_files] == ["file_1", "file_2"]
+
+
 fake_gateway = MagicMock()
 fake_gateway.get_magic_folder_state = MagicMock(
-    return_value=([("Alice", "URI:DIR2:aaaa:bbbb")], 2048, 9999, {})
+    return_value=(
+        [("Alice", "URI:DIR2:aaaa:bbbb")],
+        2048,
+        9999,
+        FolderState(),
+    )
 )
 
 
@@ -388,6 +439,22 @@ def test_do_check(mfc):
     assert mfc.do_remote_scan.call_count
 
 
+@inlineCallbacks
+def test_do_check_final_scan_invalidates_cached_listings(mfc):
+    mfc.gateway = MagicMock()
+    mfc.gateway.get_collective_dircap = MagicMock(return_value="URI:coll")
+    mfc.gateway.get_magic_folder_status = MagicMock(return_value=[])
+    mfc.members = [("Alice", "URI:alice")]
+    mfc.state = MagicFolderChecker.SYNCING
+    mfc.initial_scan_completed = True
+    mfc.do_remote_scan = MagicMock()
+    yield mfc.do_check()
+    assert mfc.gateway.listing_cache.invalidate.mock_calls == [
+        call("URI:coll"),
+        call("URI:alice"),
+    ]
+
+
 @inlineCallbacks
 def test_grid_checker_emit_space_updated(qtbot):
     gc = GridChecker(MagicMock(shares_happy=7))
@@ -423,6 +490,42 @@ def test_grid_checker_emit_disconnected(qtbot):
         yield gc.do_check()
 
 
+@inlineCallbacks
+def test_grid_checker_set_gateway_ready():
+    gc = GridChecker(MagicMock(shares_happy=7))
+    gc.gateway.get_grid_status = MagicMock(return_value=(8, 10, 1234))
+    yield gc.do_check()
+    assert gc.gateway.readiness.set_ready.call_args == call(True)
+
+
+@inlineCallbacks
+def test_grid_checker_set_gateway_not_ready():
+    gc = GridChecker(MagicMock(shares_happy=7))
+    gc.gateway.get_grid_status = MagicMock(return_value=(5, 10, 1234))
+    yield gc.do_check()
+    assert gc.gateway.readiness.set_ready.call_args == call(False)
+
+
+def test_readiness_tracker_when_ready_already_fired():
+    tracker = ReadinessTracker()
+    tracker.set_ready(True)
+    assert tracker.when_ready().called
+
+
+def test_readiness_tracker_fires_all_waiters():
+    tracker = ReadinessTracker()
+    waiters = [tracker.when_ready(), tracker.when_ready()]
+    tracker.set_ready(True)
+    assert all(d.called for d in waiters)
+
+
+def test_readiness_tracker_waits_while_not_ready():
+    tracker = ReadinessTracker()
+    d = tracker.when_ready()
+    tracker.set_ready(False)
+    assert not d.called
+
+
 @inlineCallbacks
 def test_grid_checker_not_connected(qtbot):
     gc = GridChecker(MagicMock(shares_happy=0))
@@ -433,6 +536,7 @@ def test_grid_checker_not_connected(qtbot):
 
 def test_monitor_add_magic_folder_checker():
     monitor = Monitor(MagicMock())
+    monitor.gateway.folder_state_store.load.return_value = None
     monitor.add_magic_folder_checker("TestFolder")
     assert "TestFolder" in monitor.magic_folder_checkers
 
@@ -451,6 +555,7 @@ def test_monitor_scan_rootcap_no_folders():
 @inlineCallbacks
 def test_monitor_scan_rootcap_add_folder(qtbot, monkeypatch):
     monitor = Monitor(MagicMock())
+    monitor.gateway.folder_state_store.load.return_value = None
     monitor.gateway.await_ready = MagicMock(return_value=True)
     monitor.gateway.get_magic_folders_from_rootcap = MagicMock(
         return_value={"TestFolder": {"collective_dircap": "URI:DIR2:"}}
@@ -470,6 +575,7 @@ def test_monitor_do_checks_add_magic_folder_checker(monkeypatch):
         "gridsync.monitor.MagicFolderChecker.do_check", lambda _: MagicMock()
     )
     monitor = Monitor(MagicMock(magic_folders={"TestFolder": {}}))
+    monitor.gateway.folder_state_store.load.return_value = None
     monitor.grid_checker = MagicMock()
     yield monitor.do_checks()
     assert "TestFolder" in monitor.magic_folder_checkers
@@ -495,16 +601,17 @@ def test_monitor_emit_check_finished(monkeypatch, qtbot):
         "gridsync.monitor.MagicFolderChecker.do_check", lambda _: MagicMock()
     )
     monitor = Monitor(MagicMock(magic_folders={"TestFolder": {}}))
+    monitor.gateway.folder_state_store.load.return_value = None
     monitor.grid_checker = MagicMock()
     with qtbot.wait_signal(monitor.check_finished):
         yield monitor.do_checks()
 
 
 def test_monitor_start():
-    monitor = Monitor(MagicMock())
-    monitor.timer = MagicMock()
+    monitor = Monitor(MagicMock(), MemoryReactorClock())
+    monitor.do_checks = MagicMock()
     monitor.start()
-    assert monitor.timer.mock_calls == [call.start(2, now=True)]
+    assert monitor.do_checks.call_count == 1
 
 
 def test_monitor_multiple_start():
@@ -512,8 +619,468 @@ def test_monitor_multiple_start():
     Calling ``Monitor.start`` multiple times has no effects beyond those of
     calling it once.
     """
-    monitor = Monitor(MagicMock())
-    monitor.timer = MagicMock()
+    monitor = Monitor(MagicMock(), MemoryReactorClock())
+    monitor.do_checks = MagicMock()
     monitor.start()
     monitor.start()
-    assert monitor.timer.mock_calls == [call.start(2, now=True)]
+    assert monitor.do_checks.call_count == 1
+
+
+def test_monitor_start_schedules_next_check():
+    reactor = MemoryReactorClock()
+    monitor = Monitor(MagicMock(), reactor)
+    monitor.do_checks = MagicMock()
+    monitor.start()
+    reactor.advance(monitor.max_interval * 2)
+    assert monitor.do_checks.call_count > 1
+
+
+def test_monitor_continues_after_check_error():
+    reactor = MemoryReactorClock()
+    monitor = Monitor(MagicMock(), reactor)
+    monitor.do_checks = MagicMock(side_effect=Exception("oops"))
+    monitor.start()
+    reactor.advance(monitor.max_interval * 2)
+    assert monitor.do_checks.call_count > 1
+
+
+def test_monitor_update_interval_fast_while_syncing():
+    monitor = Monitor(MagicMock())
+    monitor.total_sync_state = MagicFolderChecker.SYNCING
+    monitor._update_interval()
+    assert monitor.interval == monitor.min_interval
+
+
+def test_monitor_update_interval_backs_off_when_up_to_date():
+    monitor = Monitor(MagicMock())
+    monitor.grid_checker.is_connected = True
+    monitor.total_sync_state = MagicFolderChecker.UP_TO_DATE
+    monitor.interval = 4
+    monitor._update_interval()
+    assert monitor.interval == 8
+
+
+def test_monitor_update_interval_backoff_ceiling():
+    monitor = Monitor(MagicMock())
+    monitor.grid_checker.is_connected = True
+    monitor.total_sync_state = MagicFolderChecker.UP_TO_DATE
+    for _ in range(20):
+        monitor._update_interval()
+    assert monitor.interval == monitor.max_interval
+
+
+def test_monitor_update_interval_no_backoff_while_disconnected():
+    monitor = Monitor(MagicMock())
+    monitor.grid_checker.is_connected = False
+    monitor.total_sync_state = MagicFolderChecker.UP_TO_DATE
+    for _ in range(20):
+        monitor._update_interval()
+    assert monitor.interval == monitor.base_interval
+
+
+def test_monitor_wake_reschedules_next_check():
+    reactor = MemoryReactorClock()
+    monitor = Monitor(MagicMock(), reactor)
+    monitor.do_checks = MagicMock()
+    monitor.start()
+    monitor._delayed_call.reset(monitor.max_interval)
+    monitor.wake()
+    reactor.advance(monitor.min_interval)
+    assert monitor.do_checks.call_count == 2
+
+
+def test_monitor_wake_resets_interval():
+    monitor = Monitor(MagicMock())
+    monitor.interval = monitor.max_interval
+    monitor.wake()
+    assert monitor.interval == monitor.min_interval
+
+
+@inlineCallbacks
+def test_monitor_do_checks_checks_folders_concurrently():
+    monitor = Monitor(MagicMock(magic_folders={"Folder1": {}, "Folder2": {}}))
+    monitor.gateway.folder_state_store.load.return_value = None
+    monitor.grid_checker = MagicMock()
+    pending = {}
+    for name in ("Folder1", "Folder2"):
+        monitor.add_magic_folder_checker(name)
+        pending[name] = Deferred()
+        monitor.magic_folder_checkers[name].do_check = MagicMock(
+            return_value=pending[name]
+        )
+    d = monitor.do_checks()
+    calls = [
+        mfc.do_check.call_count
+        for mfc in monitor.magic_folder_checkers.values()
+    ]
+    for p in pending.values():
+        p.callback(None)
+    yield d
+    assert calls == [1, 1]
+
+
+@inlineCallbacks
+def test_monitor_do_checks_bounded_concurrency():
+    monitor = Monitor(MagicMock(magic_folders={"Folder1": {}, "Folder2": {}}))
+    monitor.gateway.folder_state_store.load.return_value = None
+    monitor.grid_checker = MagicMock()
+    monitor.check_semaphore = DeferredSemaphore(1)
+    pending = {}
+    for name in ("Folder1", "Folder2"):
+        monitor.add_magic_folder_checker(name)
+        pending[name] = Deferred()
+        monitor.magic_folder_checkers[name].do_check = MagicMock(
+            return_value=pending[name]
+        )
+    d = monitor.do_checks()
+    calls = [
+        mfc.do_check.call_count
+        for mfc in monitor.magic_folder_checkers.values()
+    ]
+    for p in pending.values():
+        p.callback(None)
+    yield d
+    assert calls == [1, 0]
+
+
+@inlineCallbacks
+def test_monitor_do_checks_continues_after_folder_error(qtbot):
+    monitor = Monitor(MagicMock(magic_folders={"Folder1": {}, "Folder2": {}}))
+    monitor.gateway.folder_state_store.load.return_value = None
+    monitor.grid_checker = MagicMock()
+    monitor.add_magic_folder_checker("Folder1")
+    monitor.add_magic_folder_checker("Folder2")
+    monitor.magic_folder_checkers["Folder1"].do_check = MagicMock(
+        side_effect=Exception("oops")
+    )
+    monitor.magic_folder_checkers["Folder2"].do_check = MagicMock()
+    with qtbot.wait_signal(monitor.check_finished):
+        yield monitor.do_checks()
+    assert monitor.magic_folder_checkers["Folder2"].do_check.call_count == 1
+
+
+@inlineCallbacks
+def test_monitor_do_checks_records_check_duration(monkeypatch):
+    monitor = Monitor(MagicMock(magic_folders={}))
+    monitor.grid_checker = MagicMock()
+    times = iter([100.0, 101.5])
+    monkeypatch.setattr("time.monotonic", lambda: next(times))
+    yield monitor.do_checks()
+    assert monitor.last_check_duration == 1.5
+
+
+@pytest.fixture()
+def dispatcher():
+    gateway = MagicMock(
+        magic_folders={
+            "Folder1": {"directory": "/home/user/Folder1"},
+            "Folder2": {"directory": "/home/user/Folder2"},
+        }
+    )
+    monitor = Monitor(gateway, MemoryReactorClock())
+    monitor.wake = MagicMock()
+    return monitor.event_dispatcher
+
+
+def test_dispatcher_ignores_non_magic_folder_messages(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.dispatch(b'{"action_type": "cb-upload"}')
+    assert (
+        dispatcher.schedule_check.call_count,
+        dispatcher.monitor.wake.call_count,
+    ) == (0, 0)
+
+
+def test_dispatcher_ignores_unrouted_magic_folder_events(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.dispatch(b'{"action_type": "magic-folder:scan-remote-dmd"}')
+    assert (
+        dispatcher.schedule_check.call_count,
+        dispatcher.monitor.wake.call_count,
+    ) == (0, 0)
+
+
+def test_dispatcher_routes_by_path(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.dispatch(
+        b'{"action_type": "magic-folder:notified", '
+        b'"path": "/home/user/Folder2/file.txt"}'
+    )
+    dispatcher.schedule_check.assert_called_once_with("Folder2", False)
+
+
+def test_dispatcher_routes_remote_events_to_scan(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.dispatch(
+        b'{"action_type": "magic-folder:write-downloaded-file", '
+        b'"abspath": "/home/user/Folder1/file.txt"}'
+    )
+    dispatcher.schedule_check.assert_called_once_with("Folder1", True)
+
+
+def test_dispatcher_routes_by_task(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.dispatch(
+        b'{"action_type": "magic-folder:notified", "task_uuid": "abc", '
+        b'"path": "/home/user/Folder2/file.txt"}'
+    )
+    dispatcher.dispatch(
+        b'{"message_type": "magic-folder:item:status-change", '
+        b'"task_uuid": "abc", "relpath": "file.txt"}'
+    )
+    assert dispatcher.schedule_check.mock_calls == [
+        call("Folder2", False),
+        call("Folder2", False),
+    ]
+
+
+def test_dispatcher_wakes_monitor_for_unknown_folder(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.dispatch(
+        b'{"message_type": "magic-folder:item:status-change", '
+        b'"task_uuid": "xyz", "relpath": "file.txt"}'
+    )
+    assert dispatcher.monitor.wake.call_count == 1
+
+
+def test_dispatcher_bounded_task_index(dispatcher):
+    dispatcher.schedule_check = MagicMock()
+    dispatcher.max_tasks = 2
+    for task_uuid in ("a", "b", "c"):
+        dispatcher.dispatch(
+            '{{"action_type": "magic-folder:notified", "task_uuid": "{}", '
+            '"path": "/home/user/Folder1/file"}}'.format(task_uuid).encode()
+        )
+    assert list(dispatcher._task_folders) == ["b", "c"]
+
+
+def test_dispatcher_coalesces_checks(dispatcher):
+    checker = MagicMock(remote=False, state=MagicFolderChecker.UP_TO_DATE)
+    dispatcher.monitor.magic_folder_checkers["Folder1"] = checker
+    dispatcher.schedule_check("Folder1")
+    dispatcher.schedule_check("Folder1", True)
+    dispatcher.monitor._reactor.advance(dispatcher.delay)
+    checker.check_now.assert_called_once_with(True)
+
+
+def test_dispatcher_wakes_monitor_while_syncing(dispatcher):
+    checker = MagicMock(remote=False, state=MagicFolderChecker.SYNCING)
+    dispatcher.monitor.magic_folder_checkers["Folder1"] = checker
+    dispatcher.schedule_check("Folder1")
+    dispatcher.monitor._reactor.advance(dispatcher.delay)
+    assert dispatcher.monitor.wake.call_count == 1
+
+
+def test_magic_folder_checker_check_now_remote_scan(mfc):
+    mfc.do_remote_scan = MagicMock()
+    mfc.check_now(remote_scan=True)
+    assert mfc.do_remote_scan.call_count == 1
+
+
+def test_magic_folder_checker_check_now_remote_scan_invalidates_cache(mfc):
+    calls = []
+    mfc.invalidate_cached_listings = lambda: calls.append("invalidate")
+    mfc.do_remote_scan = lambda: calls.append("scan")
+    mfc.check_now(remote_scan=True)
+    assert calls == ["invalidate", "scan"]
+
+
+def test_load_saved_state_emits_saved_state(mfc, qtbot):
+    history = FolderState(
+        [
+            {
+                "size": 2048,
+                "mtime": 9999,
+                "deleted": False,
+                "cap": "URI:CHK:aaa",
+                "path": "file.txt",
+                "member": "Alice",
+            }
+        ]
+    )
+    members = [("Alice", "URI:DIR2:aaaa:bbbb")]
+    mfc.gateway.folder_state_store.load = Mock(return_value=(members, history))
+    with qtbot.wait_signals(
+        [mfc.members_updated, mfc.size_updated, mfc.file_updated]
+    ):
+        mfc.load_saved_state()
+    assert (mfc.members, mfc.history) == (members, history)
+    assert not mfc.initial_scan_completed
+
+
+def test_load_saved_state_nothing_saved(mfc):
+    mfc.gateway.folder_state_store.load = Mock(return_value=None)
+    mfc.load_saved_state()
+    assert (mfc.members, len(mfc.history)) == ([], 0)
+
+
+@inlineCallbacks
+def test_do_remote_scan_saves_state_relative_to_loaded_state(mfc):
+    loaded = FolderState()
+    mfc.gateway.folder_state_store.load = Mock(return_value=([], loaded))
+    mfc.load_saved_state()
+    mfc.gateway.get_magic_folder_state = fake_gateway.get_magic_folder_state
+    yield mfc.do_remote_scan()
+    args = mfc.gateway.folder_state_store.save.call_args[0]
+    assert args[2:] == (mfc.members, mfc.history, loaded)
+
+
+@inlineCallbacks
+def test_do_remote_scan_resaves_everything_after_failed_save(mfc):
+    mfc.gateway.folder_state_store.save = Mock(return_value=None)
+    mfc.gateway.get_magic_folder_state = fake_gateway.get_magic_folder_state
+    yield mfc.do_remote_scan()
+    yield mfc.do_remote_scan()
+    assert mfc.gateway.folder_state_store.save.call_args[0][4] is None
+
+
+def test_on_scan_progress_emits_running_total(mfc, qtbot):
+    mfc._on_scan_progress([{"size": 10}])
+    with qtbot.wait_signal(mfc.size_updated) as blocker:
+        mfc._on_scan_progress([{"size": 5}, {"size": 7}])
+    assert blocker.args == [22]
+
+
+def test_on_scan_progress_no_emit_after_initial_scan(mfc, qtbot):
+    mfc.initial_scan_completed = True
+    with qtbot.assert_not_emitted(mfc.size_updated):
+        mfc._on_scan_progress([{"size": 10}])
+
+
+def test_parse_status_evicts_finished_operations(mfc):
+    mfc.parse_status(status_data)
+    assert sorted(mfc.operations.active) == [
+        "file_2@1",
+        "file_3@1",
+        "file_4@1",
+    ]
+
+
+def test_parse_status_ignores_operations_finished_while_idle(mfc):
+    earlier = {
+        "kind": "upload",
+        "path": "earlier",
+        "percent_done": 100,
+        "queued_at": 10,
+        "size": 1000,
+        "status": "success",
+    }
+    mfc.parse_status([earlier])  # Idle; sync_time_started is 0
+    mfc.parse_status(
+        [
+            earlier,
+            {
+                "kind": "upload",
+                "path": "new",
+                "percent_done": 50,
+                "queued_at": 20,
+                "size": 100,
+                "status": "started",
+            },
+        ]
+    )
+    assert mfc.operations.get_progress(mfc.sync_time_started) == (50, 100)
+
+
+def test_process_status_clears_operations_after_final_scan(mfc):
+    mfc.parse_status(status_data)
+    mfc.state = MagicFolderChecker.SCANNING
+    mfc.initial_scan_completed = True
+    mfc.process_status([])
+    assert len(mfc.operations) == 0
+
+
+def test_monitor_emit_total_transfer_signals(monkeypatch, qtbot):
+    monkeypatch.setattr("time.time", lambda: 2)  # One second has passed
+    monitor = Monitor(MagicMock())
+    checkers = []
+    for name in ("Folder1", "Folder2"):
+        mfc = MagicFolderChecker(monitor.gateway, name)
+        mfc.parse_status(status_data)
+        mfc.state = MagicFolderChecker.SYNCING
+        checkers.append(mfc)
+    with qtbot.wait_signals(
+        [
+            monitor.total_transfer_progress_updated,
+            monitor.total_transfer_speed_updated,
+            monitor.total_transfer_seconds_remaining_updated,
+        ]
+    ) as blocker:
+        monitor.emit_total_transfer_signals(checkers)
+    assert [signal.args for signal in blocker.all_signals_and_args] == [
+        (2048, 8192),  # Bytes transferred, bytes total
+        (2048,),  # Bytes per second
+        (3,),  # Seconds remaining
+    ]
+
+
+def test_monitor_emit_total_transfer_signals_not_syncing(qtbot):
+    monitor = Monitor(MagicMock())
+    mfc = MagicFolderChecker(monitor.gateway, "Folder1")
+    mfc.parse_status(status_data)
+    with qtbot.assert_not_emitted(monitor.total_transfer_progress_updated):
+        monitor.emit_total_transfer_signals([mfc])
+
+
+def test_signal_batcher_delivers_one_batch_per_folder(qtbot):
+    reactor = MemoryReactorClock()
+    batcher = SignalBatcher(reactor, min_interval=0.2)
+    batches = []
+    batcher.batch_ready.connect(lambda *args: batches.append(args))
+    for i in range(1000):
+        batcher.add("Folder1", i)
+    batcher.add("Folder2", "x")
+    assert batches == []
+    reactor.advance(0.2)
+    assert batches == [("Folder1", list(range(1000))), ("Folder2", ["x"])]
+
+
+def test_signal_batcher_schedules_one_delivery_at_a_time():
+    reactor = MemoryReactorClock()
+    batcher = SignalBatcher(reactor)
+    batcher.add("Folder1", 1)
+    batcher.add("Folder1", 2)
+    assert len(reactor.getDelayedCalls()) == 1
+
+
+def test_signal_batcher_stretches_interval_for_slow_subscribers(monkeypatch):
+    reactor = MemoryReactorClock()
+    batcher = SignalBatcher(reactor, min_interval=0.2, max_interval=5)
+    now = [0.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+
+    def slow_slot(*_):
+        now[0] += 1.5
+
+    batcher.batch_ready.connect(slow_slot)
+    batcher.add("Folder1", 1)
+    batcher.flush()
+    assert batcher.interval == 3
+
+
+def test_signal_batcher_interval_bounded_by_max_interval(monkeypatch):
+    reactor = MemoryReactorClock()
+    batcher = SignalBatcher(reactor, min_interval=0.2, max_interval=5)
+    now = [0.0]
+    monkeypatch.setattr("time.monotonic", lambda: now[0])
+
+    def very_slow_slot(*_):
+        now[0] += 60
+
+    batcher.batch_ready.connect(very_slow_slot)
+    batcher.add("Folder1", 1)
+    batcher.flush()
+    assert batcher.interval == 5
+
+
+def test_monitor_batches_file_updated_signals(qtbot):
+    reactor = MemoryReactorClock()
+    monitor = Monitor(MagicMock(), reactor)
+    monitor.gateway.folder_state_store.load.return_value = None
+    monitor.add_magic_folder_checker("TestFolder")
+    mfc = monitor.magic_folder_checkers["TestFolder"]
+    mfc.file_updated.emit({"path": "a"})
+    mfc.file_updated.emit({"path": "b"})
+    with qtbot.wait_signal(monitor.file_updates_batched) as blocker:
+        reactor.advance(monitor.file_update_batcher.interval)
+    assert blocker.args == ["TestFolder", [{"path": "a"}, {"path": "b"}]]
@@ -553,7 +553,7 @@ def test_ensure_recovery_create_rootcap_pass_on_error(monkeypatch, tmpdir):
 
 @inlineCallbacks
 def test_join_folders_emit_joined_folders_signal(monkeypatch, qtbot, tmpdir):
-    monkeypatch.setattr("gridsync.tahoe.Tahoe.link", lambda a, b, c, d: None)
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.set_children", MagicMock())
     sr = SetupRunner([])
     sr.gateway = Tahoe(str(tmpdir.mkdir("TestGrid")))
     sr.gateway.rootcap = "URI:rootcap"
@@ -563,6 +563,29 @@ def test_join_folders_emit_joined_folders_signal(monkeypatch, qtbot, tmpdir):
     assert blocker.args == [["TestFolder"]]
 
 
+@inlineCallbacks
+def test_join_folders_links_all_folders_in_one_request(monkeypatch, tmpdir):
+    fake_set_children = MagicMock()
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.set_children", fake_set_children)
+    sr = SetupRunner([])
+    sr.gateway = Tahoe(str(tmpdir.mkdir("TestGrid")))
+    sr.gateway.rootcap = "URI:rootcap"
+    folders_data = {
+        "FolderOne": {"code": "URI:1+URI:2"},
+        "FolderTwo": {"code": "URI:3+URI:4"},
+    }
+    yield sr.join_folders(folders_data)
+    fake_set_children.assert_called_once_with(
+        "URI:rootcap",
+        {
+            "FolderOne (collective)": "URI:1",
+            "FolderOne (personal)": "URI:2",
+            "FolderTwo (collective)": "URI:3",
+            "FolderTwo (personal)": "URI:4",
+        },
+    )
+
+
 @inlineCallbacks
 def test_run_raise_upgrade_required_error():
     sr = SetupRunner([])
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import signal
+from unittest.mock import MagicMock
+
+import pytest
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.task import Clock
+
+from gridsync.shutdown import (
+    SIGKILL,
+    ShutdownCoordinator,
+    is_running,
+    read_pid,
+    send_signal,
+    terminate,
+)
+
+
+def test_read_pid(tmpdir):
+    pidfile = tmpdir.join("twistd.pid")
+    pidfile.write("1234")
+    assert read_pid(str(pidfile)) == 1234
+
+
+def test_read_pid_returns_none_if_missing(tmpdir):
+    assert read_pid(str(tmpdir.join("twistd.pid"))) is None
+
+
+def test_read_pid_returns_none_if_invalid(tmpdir):
+    pidfile = tmpdir.join("twistd.pid")
+    pidfile.write("not-a-pid")
+    assert read_pid(str(pidfile)) is None
+
+
+def test_send_signal_returns_false_if_no_such_process(monkeypatch):
+    def fake_kill(pid, sig):
+        raise OSError(errno.ESRCH, "No such process")
+
+    monkeypatch.setattr("os.kill", fake_kill)
+    assert send_signal(1234, signal.SIGTERM) is False
+
+
+def test_is_running_true_if_permission_denied(monkeypatch):
+    def fake_kill(pid, sig):
+        raise OSError(errno.EPERM, "Operation not permitted")
+
+    monkeypatch.setattr("os.kill", fake_kill)
+    monkeypatch.setattr("sys.platform", "linux")
+    assert is_running(1234) is True
+
+
+class FakeProcess:
+    """
+    Stands in for ``os.kill``, exiting ``exit_after`` seconds (of ``clock``
+    time) after receiving SIGTERM or immediately upon SIGKILL.
+    """
+
+    def __init__(self, clock, exit_after=None):
+        self.clock = clock
+        self.exit_after = exit_after
+        self.exit_at = None
+        self.signals = []
+
+    def kill(self, pid, sig):
+        if self.exit_at is not None and self.clock.seconds() >= self.exit_at:
+            raise OSError(errno.ESRCH, "No such process")
+        if sig == signal.SIGTERM and self.exit_after is not None:
+            self.exit_at = self.clock.seconds() + self.exit_after
+        elif sig == SIGKILL:
+            self.exit_at = self.clock.seconds()
+        if sig:
+            self.signals.append(sig)
+
+
+@pytest.fixture()
+def fake_process(monkeypatch):
+    def _fake_process(clock, exit_after=None):
+        process = FakeProcess(clock, exit_after)
+        monkeypatch.setattr("os.kill", process.kill)
+        monkeypatch.setattr("sys.platform", "linux")
+        return process
+
+    return _fake_process
+
+
+def test_terminate_does_not_kill_process_that_exits(fake_process):
+    clock = Clock()
+    process = fake_process(clock, exit_after=1)
+    d = terminate(1234, grace_period=5, reactor=clock)
+    clock.pump([0.1] * 20)
+    assert (d.result, process.signals) == (False, [signal.SIGTERM])
+
+
+def test_terminate_escalates_to_sigkill(fake_process):
+    clock = Clock()
+    process = fake_process(clock)
+    d = terminate(1234, grace_period=5, reactor=clock)
+    clock.pump([0.1] * 60)
+    assert (d.result, process.signals) == (True, [signal.SIGTERM, SIGKILL])
+
+
+def test_terminate_returns_false_if_process_not_running(monkeypatch):
+    def fake_kill(pid, sig):
+        raise OSError(errno.ESRCH, "No such process")
+
+    monkeypatch.setattr("os.kill", fake_kill)
+    d = terminate(1234, reactor=Clock())
+    assert d.result is False
+
+
+def fake_gateway(name, stop_result):
+    gateway = MagicMock()
+    gateway.name = name
+    gateway.pidfile = "/nonexistent/twistd.pid"
+    gateway.stop = MagicMock(return_value=stop_result)
+    return gateway
+
+
+def test_stop_gateways_stops_all_gateways_concurrently():
+    clock = Clock()
+    coordinator = ShutdownCoordinator(clock, deadline=10, grace_period=3)
+    d1, d2 = Deferred(), Deferred()
+    gateways = [fake_gateway("One", d1), fake_gateway("Two", d2)]
+    done = coordinator.stop_gateways(gateways)
+    assert [g.stop.call_count for g in gateways] == [1, 1]
+    clock.advance(1)
+    d1.callback(None)
+    clock.advance(1)
+    d2.callback(None)
+    assert done.called
+    assert coordinator.get_durations() == {"One": 1.0, "Two": 2.0}
+
+
+def test_stop_gateways_passes_grace_period():
+    coordinator = ShutdownCoordinator(Clock(), grace_period=3)
+    gateway = fake_gateway("One", succeed(None))
+    coordinator.stop_gateways([gateway])
+    gateway.stop.assert_called_once_with(grace_period=3)
+
+
+def test_stop_gateways_fires_at_deadline(monkeypatch):
+    clock = Clock()
+    coordinator = ShutdownCoordinator(clock, deadline=10)
+    fake_send_signal = MagicMock()
+    monkeypatch.setattr("gridsync.shutdown.read_pid", lambda _: 1234)
+    monkeypatch.setattr("gridsync.shutdown.send_signal", fake_send_signal)
+    gateways = [
+        fake_gateway("Quick", succeed(None)),
+        fake_gateway("Stuck", Deferred()),
+    ]
+    done = coordinator.stop_gateways(gateways)
+    clock.advance(9)
+    assert not done.called
+    clock.advance(1)
+    assert done.called
+    assert coordinator.killed == ["Stuck"]
+    fake_send_signal.assert_called_once_with(1234, SIGKILL)
+    assert coordinator.get_durations() == {"Quick": 0.0, "Stuck": 10.0}
+
+
+def test_stop_gateways_logs_errors_and_continues():
+    clock = Clock()
+    coordinator = ShutdownCoordinator(clock)
+    failing = Deferred()
+    gateways = [fake_gateway("Bad", failing), fake_gateway("Good", Deferred())]
+    done = coordinator.stop_gateways(gateways)
+    failing.errback(RuntimeError("boom"))
+    gateways[1].stop.return_value.callback(None)
+    assert done.called
+    assert not clock.getDelayedCalls()
+
+
+def test_stop_gateways_with_no_gateways():
+    clock = Clock()
+    done = ShutdownCoordinator(clock).stop_gateways([])
+    assert done.called
+    assert not clock.getDelayedCalls()
@@ -1,8 +1,11 @@
+import tracemalloc
+from collections import deque
 from errno import EADDRINUSE
 from json import dumps
 from random import randrange
 from urllib.parse import urlsplit
 
+import pytest
 from autobahn.twisted.websocket import (
     WebSocketServerFactory,
     WebSocketServerProtocol,
@@ -11,9 +14,9 @@ from pytest_twisted import inlineCallbacks
 from twisted.internet.defer import Deferred
 from twisted.internet.endpoints import TCP4ClientEndpoint
 from twisted.internet.error import CannotListenError
-from twisted.internet.task import deferLater
+from twisted.internet.task import Clock, deferLater
 
-from gridsync.streamedlogs import StreamedLogs
+from gridsync.streamedlogs import CompressedLogBuffer, StreamedLogs
 
 
 def test_do_nothing_before_start(reactor, tahoe):
@@ -123,14 +126,191 @@ def test_bounded_streamed_log_buffer(reactor, tahoe):
     Only a limited number of the most recent messages remain in the streamed
     log message buffer.
     """
-    maxlen = 3
-    streamedlogs = StreamedLogs(reactor, maxlen=maxlen)
-    for i in range(maxlen + 1):
+    streamedlogs = StreamedLogs(reactor, max_bytes=4096)
+    for i in range(10000):
         streamedlogs.add_message("{}".format(i).encode("ascii"))
 
     actual = streamedlogs.get_streamed_log_messages()
-    expected = list("{}".format(i) for i in range(1, maxlen + 1))
-    assert actual == expected
+    assert 0 < len(actual) < 10000
+    assert actual == list(
+        "{}".format(i) for i in range(10000 - len(actual), 10000)
+    )
+    assert streamedlogs._buffer.size <= 4096
+
+
+GATEWAY_MESSAGE = (
+    b'{"action_type": "magic-folder:full-scan", "nickname": "TestGrid"}'
+)
+
+
+def test_filter_mode_both_keeps_raw_and_filtered_copies():
+    clock = Clock()
+    streamedlogs = StreamedLogs(clock, filter_mode=StreamedLogs.BOTH)
+    streamedlogs.add_message(GATEWAY_MESSAGE)
+    clock.advance(0)
+    assert streamedlogs.get_streamed_log_messages() == [
+        GATEWAY_MESSAGE.decode("utf-8")
+    ]
+    assert streamedlogs.get_filtered_log("1") == (
+        '{"action_type": "magic-folder:full-scan", '
+        '"nickname": "<Filtered:GatewayName:1>"}'
+    )
+
+
+def test_filter_mode_filtered_keeps_only_filtered_copies():
+    clock = Clock()
+    streamedlogs = StreamedLogs(clock, filter_mode=StreamedLogs.FILTERED)
+    streamedlogs.add_message(GATEWAY_MESSAGE)
+    clock.advance(0)
+    assert streamedlogs.get_streamed_log_messages() == []
+    assert "TestGrid" not in streamedlogs.get_filtered_log()
+
+
+def test_filter_mode_unfiltered_schedules_no_work():
+    clock = Clock()
+    streamedlogs = StreamedLogs(clock)
+    streamedlogs.add_message(GATEWAY_MESSAGE)
+    assert clock.getDelayedCalls() == []
+
+
+def test_filter_mode_invalid_raises_value_error(reactor):
+    with pytest.raises(ValueError):
+        StreamedLogs(reactor, filter_mode="sometimes")
+
+
+def test_filter_batches_are_bounded_and_coalesced():
+    clock = Clock()
+    streamedlogs = StreamedLogs(
+        clock, filter_mode=StreamedLogs.BOTH, filter_batch_size=2
+    )
+    for _ in range(5):
+        streamedlogs.add_message(GATEWAY_MESSAGE)
+    assert len(clock.getDelayedCalls()) == 1
+    streamedlogs._filter_batch()
+    stats = streamedlogs.get_filter_stats()
+    assert (stats["filtered"], stats["pending"]) == (2, 3)
+    clock.advance(0)
+    stats = streamedlogs.get_filter_stats()
+    assert (stats["filtered"], stats["pending"]) == (5, 0)
+
+
+def test_iter_filtered_log_messages_includes_pending_messages():
+    clock = Clock()
+    streamedlogs = StreamedLogs(clock, filter_mode=StreamedLogs.FILTERED)
+    streamedlogs.add_message(GATEWAY_MESSAGE)
+    messages = list(streamedlogs.iter_filtered_log_messages())
+    assert len(messages) == 1
+    assert "TestGrid" not in messages[0]
+
+
+def test_count_messages():
+    clock = Clock()
+    streamedlogs = StreamedLogs(
+        clock, filter_mode=StreamedLogs.BOTH, filter_batch_size=1
+    )
+    streamedlogs.add_message(GATEWAY_MESSAGE)
+    streamedlogs.add_message(GATEWAY_MESSAGE)
+    streamedlogs._filter_batch()  # One message redacted, one pending
+    assert (
+        streamedlogs.count_messages(),
+        streamedlogs.count_messages(filtered=True),
+    ) == (2, 2)
+
+
+def test_filter_drops_malformed_messages():
+    clock = Clock()
+    streamedlogs = StreamedLogs(clock, filter_mode=StreamedLogs.FILTERED)
+    streamedlogs.add_message(b'{"action_type": "magic-folder:full-scan"')
+    clock.advance(0)
+    assert streamedlogs.get_filtered_log() == ""
+
+
+def test_compressed_log_buffer_round_trip():
+    """
+    Messages are returned, in order, after being compressed into blocks.
+    """
+    buf = CompressedLogBuffer(max_bytes=1024 * 1024, block_size=100)
+    messages = ['{{"message": {}}}'.format(i).encode() for i in range(1000)]
+    for message in messages:
+        buf.append(message)
+    assert len(buf._blocks) > 1
+    assert list(buf) == messages
+    assert len(buf) == 1000
+
+
+def test_compressed_log_buffer_compresses_blocks():
+    """
+    Compressible messages take up much less than their raw size.
+    """
+    buf = CompressedLogBuffer(max_bytes=1024 * 1024, block_size=4096)
+    raw = 0
+    for i in range(1000):
+        message = '{{"action_type": "magic-folder:scan", "n": {}}}'.format(i)
+        buf.append(message.encode())
+        raw += len(message)
+    assert buf.size < raw / 4
+
+
+def test_compressed_log_buffer_evicts_whole_blocks_oldest_first():
+    buf = CompressedLogBuffer(max_bytes=300, block_size=100)
+    for i in range(1000):
+        buf.append(bytes(str(i).zfill(10), "ascii"))
+    messages = list(buf)
+    assert messages[-1] == b"0000000999"
+    assert messages[0] != b"0000000000"
+    assert buf.size <= 300
+    assert len(buf) == len(messages)
+
+
+def test_compressed_log_buffer_lzma():
+    buf = CompressedLogBuffer(
+        max_bytes=1024 * 1024, block_size=100, compression="lzma"
+    )
+    messages = [str(i).encode() for i in range(500)]
+    for message in messages:
+        buf.append(message)
+    assert list(buf) == messages
+
+
+@pytest.mark.slow
+def test_compressed_log_buffer_memory_benchmark():
+    """
+    Holding a realistic Eliot log in a ``CompressedLogBuffer`` uses far less
+    memory than holding the same messages in a ``deque``.
+    """
+    template = (
+        '{{"action_type": "magic-folder:process-item", "task_uuid": '
+        '"{:032x}", "timestamp": {}.{}, "action_status": "started", '
+        '"task_level": [1], "item": {{"relpath": "dir/file-{}.txt", '
+        '"size": {}}}}}'
+    )
+
+    def measure(buffer):
+        tracemalloc.start()
+        for i in range(100000):
+            buffer.append(
+                template.format(
+                    i * 7919, 1600000000 + i, i % 997, i, i * 13
+                ).encode()
+            )
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current
+
+    deque_memory = measure(deque())
+    compressed_memory = measure(CompressedLogBuffer(64 * 1024 * 1024))
+    assert compressed_memory < deque_memory / 4
+
+
+def test_observers_receive_messages(reactor):
+    """
+    Observers added with ``add_observer`` are called with each message.
+    """
+    received = []
+    streamedlogs = StreamedLogs(reactor)
+    streamedlogs.add_observer(received.append)
+    streamedlogs.add_message(b"message")
+    assert received == [b"message"]
 
 
 class BinaryMessageServerProtocol(WebSocketServerProtocol):
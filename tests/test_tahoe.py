@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import json
 import os
 from pathlib import Path
 
@@ -11,10 +12,24 @@ except ImportError:
 import pytest
 import yaml
 from pytest_twisted import inlineCallbacks
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    DeferredSemaphore,
+    fail,
+    succeed,
+)
+from twisted.internet.task import Clock
 from twisted.internet.testing import MemoryReactorClock
 
 from gridsync.errors import TahoeCommandError, TahoeError, TahoeWebError
-from gridsync.tahoe import Tahoe, get_nodedirs, is_valid_furl
+from gridsync.streamedlogs import CompressedLogBuffer, StreamedLogs
+from gridsync.tahoe import (
+    Tahoe,
+    get_nodedirs,
+    is_valid_furl,
+    select_executable,
+)
 
 
 def fake_get(*args, **kwargs):
@@ -110,17 +125,74 @@ def test_tahoe_default_nodedir():
     [
         (123456, 123456),
         (0, 0),
-        (None, 2000000),  # Default specified in gridsync.streamedlogs
+        (None, 67108864),  # Default specified in gridsync.streamedlogs
     ],
 )
-def test_tahoe_set_streamedlogs_maxlen_from_config_txt(
+def test_tahoe_set_streamedlogs_max_bytes_from_config_txt(
     monkeypatch, given, expected
 ):
     monkeypatch.setattr(
-        "gridsync.tahoe.global_settings", {"debug": {"log_maxlen": given}}
+        "gridsync.tahoe.global_settings", {"debug": {"log_max_bytes": given}}
+    )
+    client = Tahoe()
+    assert client.streamedlogs._buffer.max_bytes == expected
+
+
+def test_tahoe_set_streamedlogs_filter_mode_from_config_txt(monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.global_settings",
+        {"debug": {"log_filter_mode": "filtered"}},
+    )
+    client = Tahoe()
+    assert client.streamedlogs.filter_mode == StreamedLogs.FILTERED
+
+
+def test_tahoe_subsystems_not_created_until_used(monkeypatch):
+    fake_monitor = Mock()
+    monkeypatch.setattr("gridsync.tahoe.Monitor", fake_monitor)
+    monkeypatch.setattr("gridsync.tahoe.NewscapChecker", Mock())
+    client = Tahoe()
+    assert fake_monitor.call_count == 0
+    assert "streamedlogs" not in client.__dict__
+    client.streamedlogs  # pylint: disable=pointless-statement
+    assert fake_monitor.call_count == 1
+    assert client.monitor is client.monitor
+
+
+def test_tahoe_connection_pool_settings_from_config_txt(monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.global_settings",
+        {"connection_pool": {"max_connections": "7", "idle_timeout": "30"}},
+    )
+    client = Tahoe()
+    assert (
+        client.pool.maxPersistentPerHost,
+        client.pool.cachedConnectionTimeout,
+    ) == (7, 30)
+
+
+def test_tahoe_connection_pool_settings_per_gateway_override(monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.global_settings",
+        {
+            "connection_pool": {"max_connections": "7"},
+            "connection_pool:.tahoe": {"max_connections": "3"},
+        },
     )
     client = Tahoe()
-    assert client.streamedlogs._buffer.maxlen == expected
+    assert client.pool.maxPersistentPerHost == 3
+
+
+def test_tahoe_dispatch_streamed_log_messages_to_monitor(tahoe):
+    tahoe.magic_folders["TestFolder"] = {"directory": "/TestFolder"}
+    tahoe.monitor.event_dispatcher.schedule_check = MagicMock()
+    tahoe.streamedlogs.add_message(
+        b'{"action_type": "magic-folder:notified", '
+        b'"path": "/TestFolder/file.txt"}'
+    )
+    tahoe.monitor.event_dispatcher.schedule_check.assert_called_once_with(
+        "TestFolder", False
+    )
 
 
 def test_tahoe_load_newscap_from_global_settings(tahoe, monkeypatch):
@@ -399,18 +471,39 @@ def test_tahoe_stop_linux_monkeypatch(tahoe, monkeypatch):
 def test_tahoe_stop_locked(locked, call_count, tahoe, monkeypatch):
     lock = MagicMock()
     lock.locked = locked
-    lock.acquire = MagicMock()
-    lock.release = MagicMock()
+    lock.when_idle = MagicMock()
+    lock.get_stats = MagicMock(return_value={})
     tahoe.lock = lock
     monkeypatch.setattr("os.path.isfile", lambda x: True)
     monkeypatch.setattr("sys.platform", "linux")
     monkeypatch.setattr("gridsync.tahoe.Tahoe.command", MagicMock())
     monkeypatch.setattr("os.remove", MagicMock())
     yield tahoe.stop()
-    assert (lock.acquire.call_count, lock.release.call_count) == (
-        call_count,
-        call_count,
-    )
+    assert lock.when_idle.call_count == call_count
+
+
+@inlineCallbacks
+def test_tahoe_links_to_different_dircaps_concurrently(tahoe, monkeypatch):
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
+    responses = []
+
+    def deferred_post(*args, **kwargs):
+        d = Deferred()
+        responses.append(d)
+        return d
+
+    monkeypatch.setattr("treq.post", deferred_post)
+    d1 = tahoe.link("URI:DIR2:one", "a", "URI:CHK:a")
+    d2 = tahoe.link("URI:DIR2:two", "b", "URI:CHK:b")
+    d3 = tahoe.link("URI:DIR2:one", "c", "URI:CHK:c")
+    assert len(responses) == 2  # The second link to "one" must wait
+    for response in list(responses):
+        response.callback(MagicMock(code=200))
+    assert len(responses) == 3
+    responses[2].callback(MagicMock(code=200))
+    yield DeferredList([d1, d2, d3])
+    assert not tahoe.lock.locked
+    assert tahoe.lock.get_stats()["contended"] == 1
 
 
 @pytest.mark.parametrize(
@@ -478,55 +571,51 @@ def test_get_grid_status(tahoe, monkeypatch):
 
 
 @inlineCallbacks
-def test_get_connected_servers(tahoe, monkeypatch):
-    html = b"Connected to <span>3</span>of <span>10</span>"
+def test_get_grid_status_uses_gateway_connection_pool(tahoe, monkeypatch):
+    fake_get = MagicMock(return_value=MagicMock(code=500))
     monkeypatch.setattr("treq.get", fake_get)
-    monkeypatch.setattr("treq.content", lambda _: html)
-    output = yield tahoe.get_connected_servers()
-    assert output == 3
+    yield tahoe.get_grid_status()
+    assert fake_get.call_args[1]["pool"] is tahoe.pool
 
 
 @inlineCallbacks
-def test_is_ready_false_not_shares_happy(tahoe, monkeypatch):
-    output = yield tahoe.is_ready()
-    assert output is False
+def test_await_ready(tahoe):
+    tahoe.readiness.set_ready(True)
+    yield tahoe.await_ready()
+    assert True
 
 
-@inlineCallbacks
-def test_is_ready_false_not_connected_servers(tahoe, monkeypatch):
-    tahoe.shares_happy = 7
-    monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.get_connected_servers", lambda _: None
-    )
-    output = yield tahoe.is_ready()
-    assert output is False
+def test_await_ready_waits_for_readiness(tahoe):
+    d = tahoe.await_ready()
+    assert not d.called
+    tahoe.readiness.set_ready(True)
+    assert d.called
 
 
-@inlineCallbacks
-def test_is_ready_true(tahoe, monkeypatch):
-    tahoe.shares_happy = 7
-    monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.get_connected_servers", lambda _: 10
-    )
-    output = yield tahoe.is_ready()
-    assert output is True
+def test_await_ready_wakes_monitor_if_not_ready(tahoe, monkeypatch):
+    fake_wake = MagicMock()
+    monkeypatch.setattr("gridsync.monitor.Monitor.wake", fake_wake)
+    tahoe.await_ready()
+    assert fake_wake.call_count == 1
 
 
-@inlineCallbacks
-def test_is_ready_false_connected_less_than_happy(tahoe, monkeypatch):
-    tahoe.shares_happy = 7
-    monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.get_connected_servers", lambda _: 3
-    )
-    output = yield tahoe.is_ready()
-    assert output is False
+def test_await_ready_does_not_wake_monitor_if_ready(tahoe, monkeypatch):
+    fake_wake = MagicMock()
+    monkeypatch.setattr("gridsync.monitor.Monitor.wake", fake_wake)
+    tahoe.readiness.set_ready(True)
+    tahoe.await_ready()
+    assert fake_wake.call_count == 0
 
 
 @inlineCallbacks
-def test_await_ready(tahoe, monkeypatch):
-    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", lambda _: True)
-    yield tahoe.await_ready()
-    assert True
+def test_tahoe_stop_wakes_monitor(tahoe, monkeypatch):
+    fake_wake = MagicMock()
+    monkeypatch.setattr("gridsync.monitor.Monitor.wake", fake_wake)
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.command", MagicMock())
+    monkeypatch.setattr("sys.platform", "linux")
+    write_pidfile(tahoe.nodedir)
+    yield tahoe.stop()
+    assert fake_wake.call_count == 1
 
 
 @inlineCallbacks
@@ -616,6 +705,25 @@ def test_tahoe_link(tahoe, monkeypatch):
     assert True
 
 
+@inlineCallbacks
+def test_tahoe_link_invalidates_cached_listing(tahoe, monkeypatch):
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
+    monkeypatch.setattr("treq.post", fake_post)
+    tahoe.listing_cache.invalidate = MagicMock()
+    yield tahoe.link("test_dircap", "test_childname", "test_childcap")
+    tahoe.listing_cache.invalidate.assert_called_once_with("test_dircap")
+
+
+@inlineCallbacks
+def test_tahoe_get_json_cached(tahoe, monkeypatch):
+    fake_get = MagicMock(return_value=MagicMock(code=200))
+    monkeypatch.setattr("treq.get", fake_get)
+    monkeypatch.setattr("treq.content", lambda _: b'["dirnode", {}]')
+    yield tahoe.get_json("URI:DIR2:aaa")
+    output = yield tahoe.get_json("URI:DIR2:aaa")
+    assert (output, fake_get.call_count) == (["dirnode", {}], 1)
+
+
 @inlineCallbacks
 def test_tahoe_link_fail_code_500(tahoe, monkeypatch):
     monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
@@ -625,6 +733,107 @@ def test_tahoe_link_fail_code_500(tahoe, monkeypatch):
         yield tahoe.link("test_dircap", "test_childname", "test_childcap")
 
 
+@inlineCallbacks
+def test_tahoe_set_children_posts_once(tahoe, monkeypatch):
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
+    post = MagicMock(side_effect=fake_post)
+    monkeypatch.setattr("treq.post", post)
+    tahoe.nodeurl = "http://127.0.0.1:65536/"
+    yield tahoe.set_children(
+        "URI:DIR2:aaa",
+        {
+            "One (collective)": "URI:DIR2-RO:bbb",
+            "One (personal)": "URI:DIR2:c",
+        },
+    )
+    assert post.call_count == 1
+    url, body = post.call_args[0]
+    assert url == "http://127.0.0.1:65536/uri/URI:DIR2:aaa/?t=set_children"
+    assert json.loads(body.decode("utf-8")) == {
+        "One (collective)": ["dirnode", {"ro_uri": "URI:DIR2-RO:bbb"}],
+        "One (personal)": ["dirnode", {"rw_uri": "URI:DIR2:c"}],
+    }
+
+
+@inlineCallbacks
+def test_tahoe_set_children_no_children_no_request(tahoe, monkeypatch):
+    post = MagicMock(side_effect=fake_post)
+    monkeypatch.setattr("treq.post", post)
+    yield tahoe.set_children("URI:DIR2:aaa", {})
+    assert post.call_count == 0
+
+
+@inlineCallbacks
+def test_tahoe_set_children_invalidates_cached_listing(tahoe, monkeypatch):
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
+    monkeypatch.setattr("treq.post", fake_post)
+    tahoe.listing_cache.invalidate = MagicMock()
+    yield tahoe.set_children("URI:DIR2:aaa", {"a": "URI:CHK:bbb"})
+    tahoe.listing_cache.invalidate.assert_called_once_with("URI:DIR2:aaa")
+
+
+@inlineCallbacks
+def test_tahoe_set_children_fail_code_500(tahoe, monkeypatch):
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
+    monkeypatch.setattr("treq.post", fake_post_code_500)
+    monkeypatch.setattr("treq.content", lambda _: b"test content")
+    with pytest.raises(TahoeWebError):
+        yield tahoe.set_children("URI:DIR2:aaa", {"a": "URI:CHK:bbb"})
+
+
+@inlineCallbacks
+def test_tahoe_link_magic_folder_to_rootcap_links_once(tahoe, monkeypatch):
+    fake_set_children = MagicMock()
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.set_children", fake_set_children)
+    tahoe.rootcap = "URI:DIR2:root"
+    tahoe.magic_folders["TestFolder"] = {
+        "admin_dircap": "URI:DIR2:admin",
+        "collective_dircap": "URI:DIR2-RO:collective",
+        "upload_dircap": "URI:DIR2:upload",
+    }
+    yield tahoe.link_magic_folder_to_rootcap("TestFolder")
+    fake_set_children.assert_called_once_with(
+        "URI:DIR2:root",
+        {
+            "TestFolder (admin)": "URI:DIR2:admin",
+            "TestFolder (collective)": "URI:DIR2-RO:collective",
+            "TestFolder (personal)": "URI:DIR2:upload",
+        },
+    )
+
+
+@inlineCallbacks
+def test_tahoe_ensure_folder_links_links_missing_folders_once(
+    tahoe, monkeypatch
+):
+    fake_set_children = MagicMock()
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.set_children", fake_set_children)
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.get_magic_folders_from_rootcap",
+        MagicMock(return_value={"Linked": {}}),
+    )
+    tahoe.rootcap = "URI:DIR2:root"
+    tahoe.magic_folders = {
+        name: {
+            "admin_dircap": None,
+            "collective_dircap": "URI:DIR2-RO:" + name,
+            "upload_dircap": "URI:DIR2:" + name,
+        }
+        for name in ("Linked", "One", "Two")
+    }
+    yield tahoe.ensure_folder_links(None)
+    fake_set_children.assert_called_once_with(
+        "URI:DIR2:root",
+        {
+            "One (collective)": "URI:DIR2-RO:One",
+            "One (personal)": "URI:DIR2:One",
+            "Two (collective)": "URI:DIR2-RO:Two",
+            "Two (personal)": "URI:DIR2:Two",
+        },
+    )
+
+
 @inlineCallbacks
 def test_tahoe_unlink(tahoe, monkeypatch):
     monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", MagicMock())
@@ -671,7 +880,7 @@ def test_magic_folder_exists_false(tahoe):
 
 @inlineCallbacks
 def test_tahoe_magic_folder_invite(tahoe, monkeypatch):
-    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", lambda _: True)
+    tahoe.readiness.set_ready(True)
     monkeypatch.setattr(
         "gridsync.tahoe.Tahoe.get_admin_dircap", lambda x, y: "URI:a"
     )
@@ -685,7 +894,7 @@ def test_tahoe_magic_folder_invite(tahoe, monkeypatch):
 
 @inlineCallbacks
 def test_tahoe_magic_folder_invite_raise_tahoe_error(tahoe, monkeypatch):
-    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", lambda _: True)
+    tahoe.readiness.set_ready(True)
     with pytest.raises(TahoeError):
         yield tahoe.magic_folder_invite("Test Folder", "Bob")
 
@@ -772,6 +981,44 @@ def test_tahoe_get_log_apply_filter_use_identifier(tahoe):
     )
 
 
+def test_tahoe_get_log_apply_filter_uses_filtered_on_ingest_copy(tahoe):
+    tahoe.streamedlogs = StreamedLogs(Clock(), filter_mode=StreamedLogs.BOTH)
+    tahoe.streamedlogs.add_message(
+        b'{"action_type": "magic-folder:full-scan", "nickname": "TestGrid"}'
+    )
+    tahoe.streamedlogs._buffer = CompressedLogBuffer(1024)  # Not consulted
+    output = tahoe.get_log(apply_filter=True, identifier="1")
+    assert output == (
+        '{"action_type": "magic-folder:full-scan", '
+        '"nickname": "<Filtered:GatewayName:1>"}'
+    )
+
+
+def test_tahoe_iter_log_tail_filters_only_the_tail(tahoe, monkeypatch):
+    for i in range(10):
+        tahoe.streamedlogs._buffer.append(
+            '{{"message_type": "x", "n": {}}}'.format(i).encode()
+        )
+    filtered = []
+
+    def fake_iter_filter(messages, identifier):
+        messages = list(messages)
+        filtered.extend(messages)
+        return iter(messages)
+
+    monkeypatch.setattr(
+        "gridsync.tahoe.iter_filter_tahoe_log_messages", fake_iter_filter
+    )
+    output = list(tahoe.iter_log(apply_filter=True, tail=2))
+    assert [json.loads(line)["n"] for line in output] == [8, 9]
+    assert filtered == output
+
+
+def test_tahoe_get_log_line_count(tahoe):
+    tahoe.streamedlogs._buffer.append(b'{"A": 1}')
+    assert tahoe.get_log_line_count() == 1
+
+
 @inlineCallbacks
 def test_tahoe_start_use_tor_false(monkeypatch, tmpdir_factory):
     client = Tahoe(str(tmpdir_factory.mktemp("tahoe-start")))
@@ -964,3 +1211,190 @@ def test_restore_magic_folder_raise_tahoe_error(
     else:
         yield client.restore_magic_folder("TestFolder", dest)
     assert m.call_count == call_count
+
+
+def fake_dmd(filename, mtime):
+    return [
+        "dirnode",
+        {
+            "children": {
+                filename: [
+                    "filenode",
+                    {
+                        "size": 10,
+                        "ro_uri": "URI:CHK:" + filename,
+                        "metadata": {"tahoe": {"linkmotime": mtime}},
+                    },
+                ]
+            }
+        },
+    ]
+
+
+def test_get_magic_folder_state_fetches_members_concurrently(tahoe):
+    pending = {}
+
+    def fake_get_json(cap):
+        pending[cap] = Deferred()
+        return pending[cap]
+
+    tahoe.get_json = fake_get_json
+    members = [("Alice", "URI:alice"), ("Bob", "URI:bob")]
+    d = tahoe.get_magic_folder_state("TestFolder", members)
+    assert sorted(pending) == ["URI:alice", "URI:bob"]
+    pending["URI:bob"].callback(fake_dmd("bob.txt", 2.0))
+    pending["URI:alice"].callback(fake_dmd("alice.txt", 1.0))
+    _, size, latest_mtime, history = d.result
+    assert (size, latest_mtime, [v["member"] for v in history.values()]) == (
+        20,
+        2.0,
+        ["Alice", "Bob"],
+    )
+
+
+def test_get_magic_folder_state_bounded_concurrency(tahoe):
+    pending = {}
+
+    def fake_get_json(cap):
+        pending[cap] = Deferred()
+        return pending[cap]
+
+    tahoe.get_json = fake_get_json
+    tahoe.scan_semaphore = DeferredSemaphore(1)
+    members = [("Alice", "URI:alice"), ("Bob", "URI:bob")]
+    tahoe.get_magic_folder_state("TestFolder", members)
+    assert list(pending) == ["URI:alice"]
+
+
+def test_get_magic_folder_state_raise_member_fetch_error(tahoe):
+    tahoe.get_json = lambda cap: fail(TahoeWebError(cap))
+    members = [("Alice", "URI:alice")]
+    d = tahoe.get_magic_folder_state("TestFolder", members)
+    assert d.result.check(TahoeWebError)
+    d.addErrback(lambda _: None)
+
+
+def test_get_magic_folder_state_skips_subdirectory_markers(tahoe):
+    dmd = fake_dmd("sub@_file.txt", 1.0)
+    dmd[1]["children"]["sub@_"] = ["filenode", {}]
+    tahoe.get_json = lambda cap: succeed(dmd)
+    d = tahoe.get_magic_folder_state("TestFolder", [("Alice", "URI:alice")])
+    assert [entry["path"] for entry in d.result[3]] == [
+        os.path.join("sub", "file.txt")
+    ]
+
+
+def test_get_magic_folder_state_reports_progress_per_member(tahoe):
+    pending = {}
+
+    def fake_get_json(cap):
+        pending[cap] = Deferred()
+        return pending[cap]
+
+    tahoe.get_json = fake_get_json
+    batches = []
+    d = tahoe.get_magic_folder_state(
+        "TestFolder",
+        [("Alice", "URI:alice"), ("Bob", "URI:bob")],
+        lambda entries: batches.append([e["path"] for e in entries]),
+    )
+    pending["URI:bob"].callback(fake_dmd("bob.txt", 2.0))
+    assert (batches, d.called) == ([["bob.txt"]], False)
+    pending["URI:alice"].callback(fake_dmd("alice.txt", 1.0))
+    assert batches == [["bob.txt"], ["alice.txt"]]
+
+
+@pytest.fixture
+def fake_executables(monkeypatch, tmpdir):
+    paths = []
+    for name in ("old", "new"):
+        path = tmpdir.mkdir(name).join("tahoe")
+        path.write(name)
+        paths.append(str(path))
+    monkeypatch.setattr("gridsync.tahoe.which", lambda _: paths)
+    probed = []
+
+    def fake_get_features(self):
+        probed.append(self.executable)
+        if self.executable == paths[0]:
+            return succeed((self.executable, True, False))
+        return succeed((self.executable, True, True))
+
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.get_features", fake_get_features)
+    return paths, probed
+
+
+@inlineCallbacks
+def test_select_executable_probes_and_caches_features(
+    fake_executables, tmpdir
+):
+    paths, probed = fake_executables
+    cache_file = str(tmpdir.join("executables.json"))
+    executable = yield select_executable(cache_file)
+    assert executable == paths[1]
+    assert sorted(probed) == sorted(paths)
+    with open(cache_file) as f:
+        assert sorted(json.load(f)) == sorted(paths)
+
+
+@inlineCallbacks
+def test_select_executable_warm_start_probes_nothing(fake_executables, tmpdir):
+    paths, probed = fake_executables
+    cache_file = str(tmpdir.join("executables.json"))
+    yield select_executable(cache_file)
+    probed.clear()
+    executable = yield select_executable(cache_file)
+    assert executable == paths[1]
+    assert probed == []
+
+
+@inlineCallbacks
+def test_select_executable_reprobes_changed_executable(
+    fake_executables, tmpdir
+):
+    paths, probed = fake_executables
+    cache_file = str(tmpdir.join("executables.json"))
+    yield select_executable(cache_file)
+    probed.clear()
+    with open(paths[1], "a") as f:
+        f.write("upgraded")
+    yield select_executable(cache_file)
+    assert probed == [paths[1]]
+
+
+@inlineCallbacks
+def test_select_executable_does_not_cache_unsupported(
+    fake_executables, monkeypatch, tmpdir
+):
+    paths, _ = fake_executables
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.get_features",
+        lambda self: succeed((self.executable, False, False)),
+    )
+    cache_file = str(tmpdir.join("executables.json"))
+    executable = yield select_executable(cache_file)
+    assert executable is None
+    with open(cache_file) as f:
+        assert json.load(f) == {}
+
+
+@inlineCallbacks
+def test_select_executable_ignores_corrupt_cache(fake_executables, tmpdir):
+    paths, _ = fake_executables
+    cache_file = tmpdir.join("executables.json")
+    cache_file.write("{Not JSON")
+    executable = yield select_executable(str(cache_file))
+    assert executable == paths[1]
+
+
+@inlineCallbacks
+def test_tahoe_stop_with_grace_period_terminates_process(tahoe, monkeypatch):
+    mocked_command = MagicMock()
+    mocked_terminate = MagicMock(return_value=succeed(False))
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.command", mocked_command)
+    monkeypatch.setattr("gridsync.tahoe.terminate", mocked_terminate)
+    monkeypatch.setattr("sys.platform", "linux")
+    write_pidfile(tahoe.nodedir)
+    yield tahoe.stop(grace_period=3)
+    assert mocked_command.call_count == 0
+    assert mocked_terminate.call_args[0] == (4194305, 3)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from twisted.internet.defer import Deferred, fail, succeed
+
+from gridsync.timeline import Timeline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_timeline_begin_end_relative_to_origin():
+    clock = FakeClock()
+    timeline = Timeline(clock)
+    clock.now += 1
+    timeline.begin("start", "TestGrid")
+    clock.now += 2
+    timeline.end("start", "TestGrid")
+    assert timeline.phases == [["TestGrid", "start", 1.0, 3.0]]
+
+
+def test_timeline_end_matches_subject():
+    clock = FakeClock()
+    timeline = Timeline(clock)
+    timeline.begin("start", "GridOne")
+    timeline.begin("start", "GridTwo")
+    clock.now += 5
+    timeline.end("start", "GridOne")
+    assert timeline.phases == [
+        ["GridOne", "start", 0.0, 5.0],
+        ["GridTwo", "start", 0.0, None],
+    ]
+
+
+def test_timeline_track_ends_phase_when_deferred_fires():
+    clock = FakeClock()
+    timeline = Timeline(clock)
+    d = Deferred()
+    results = []
+    timeline.track(d, "get_tor").addCallback(results.append)
+    clock.now += 0.5
+    d.callback("tor")
+    assert results == ["tor"]
+    assert timeline.phases == [[None, "get_tor", 0.0, 0.5]]
+
+
+def test_timeline_track_ends_phase_on_failure():
+    timeline = Timeline(FakeClock())
+    d = timeline.track(fail(RuntimeError("No tor")), "get_tor")
+    d.addErrback(lambda _: None)
+    assert timeline.phases[0][3] == 0.0
+
+
+def test_timeline_format():
+    clock = FakeClock()
+    timeline = Timeline(clock)
+    timeline.track(succeed(None), "select_executable")
+    timeline.begin("connect", "TestGrid")
+    assert timeline.format("Startup timeline") == (
+        "Startup timeline (seconds since start):\n"
+        "      0.000 ->     0.000  (  0.000)  select_executable\n"
+        "      0.000 ->       ...  (running)  TestGrid: connect"
+    )
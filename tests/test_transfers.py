@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gridsync.transfers import OperationsTable, RateEstimator
+
+
+def task(path, status, size=100, percent_done=0, queued_at=10):
+    return {
+        "kind": "upload",
+        "path": path,
+        "percent_done": percent_done,
+        "queued_at": queued_at,
+        "size": size,
+        "status": status,
+    }
+
+
+def test_operations_table_keeps_only_active_operations():
+    table = OperationsTable()
+    table.update(
+        [task("a", "queued"), task("b", "started"), task("c", "success")]
+    )
+    assert sorted(table.active) == ["a@10", "b@10"]
+
+
+def test_operations_table_drops_operations_no_longer_reported():
+    table = OperationsTable()
+    table.update([task("a", "queued"), task("b", "queued")])
+    table.update([task("b", "started")])
+    assert list(table.active) == ["b@10"]
+
+
+def test_operations_table_counts_finished_operations_once():
+    table = OperationsTable()
+    table.update([task("a", "success")])
+    table.update([task("a", "success")])
+    assert table.bytes_completed == 100
+
+
+def test_operations_table_does_not_count_failures():
+    table = OperationsTable()
+    table.update([task("a", "failure")])
+    assert table.bytes_completed == 0
+
+
+def test_operations_table_ignores_operations_finished_before_since():
+    table = OperationsTable()
+    table.update([task("a", "success", queued_at=5)], since=10)
+    assert table.bytes_completed == 0
+
+
+def test_operations_table_recounts_when_since_changes():
+    table = OperationsTable()
+    table.update([task("a", "success", size=1000, queued_at=10)])
+    table.update(
+        [
+            task("a", "success", size=1000, queued_at=10),
+            task("b", "started", percent_done=50, queued_at=20),
+        ],
+        since=20,
+    )
+    assert table.get_progress(since=20) == (50, 100)
+
+
+def test_operations_table_bounds_finished_keys():
+    table = OperationsTable(max_finished=2)
+    table.update([task(str(i), "success") for i in range(5)])
+    assert len(table._finished) == 2
+
+
+def test_operations_table_get_progress():
+    table = OperationsTable()
+    table.update(
+        [
+            task("a", "queued", size=200),
+            task("b", "started", size=100, percent_done=150),
+            task("c", "started", size=None),
+            task("d", "success", size=50),
+        ]
+    )
+    assert table.get_progress() == (150, 350)
+
+
+def test_operations_table_clear():
+    table = OperationsTable()
+    table.update([task("a", "queued"), task("b", "success")])
+    table.clear()
+    assert (len(table), table.get_progress()) == (0, (0, 0))
+
+
+def test_rate_estimator_initial_estimate_from_start_time():
+    estimator = RateEstimator()
+    assert estimator.update(1000, now=12, started=10) == 500
+
+
+def test_rate_estimator_no_initial_estimate_without_start_time():
+    estimator = RateEstimator()
+    assert estimator.update(1000, now=12) is None
+    assert estimator.update(2000, now=13) == 1000
+
+
+def test_rate_estimator_converges_to_current_rate():
+    estimator = RateEstimator(half_life=1)
+    estimator.update(0, now=0, started=-100)
+    for second in range(1, 11):  # A sustained 1000 bytes per second
+        rate = estimator.update(second * 1000, now=second)
+    assert rate == pytest.approx(1000, rel=0.01)
+
+
+def test_rate_estimator_half_life():
+    estimator = RateEstimator(half_life=10)
+    estimator.update(0, now=0)
+    estimator.update(0, now=1)  # Rate: 0
+    assert estimator.update(10000, now=11) == pytest.approx(500)
+
+
+def test_rate_estimator_ignores_falling_counts():
+    estimator = RateEstimator()
+    estimator.update(5000, now=0)
+    assert estimator.update(1000, now=1) == 0
+
+
+def test_rate_estimator_get_seconds_remaining():
+    estimator = RateEstimator()
+    estimator.update(1000, now=2, started=1)
+    assert estimator.get_seconds_remaining(3000) == 3
+
+
+def test_rate_estimator_get_seconds_remaining_unknown():
+    assert RateEstimator().get_seconds_remaining(3000) is None
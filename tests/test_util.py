@@ -4,7 +4,13 @@ from binascii import hexlify, unhexlify
 
 import pytest
 
-from gridsync.util import b58decode, b58encode, humanized_list, strip_html_tags
+from gridsync.util import (
+    b58decode,
+    b58encode,
+    humanized_list,
+    lazy_property,
+    strip_html_tags,
+)
 
 # From https://github.com/bitcoin/bitcoin/blob/master/src/test/data/base58_encode_decode.json
 base58_test_pairs = [
@@ -71,3 +77,37 @@ def test_humanized_list(items, kind, humanized):
 )
 def test_strip_html_tags(s, expected):
     assert strip_html_tags(s) == expected
+
+
+def test_lazy_property_computed_once():
+    calls = []
+
+    class Thing:
+        @lazy_property
+        def value(self):
+            calls.append(1)
+            return object()
+
+    thing = Thing()
+    assert thing.value is thing.value
+    assert len(calls) == 1
+
+
+def test_lazy_property_not_computed_until_accessed():
+    class Thing:
+        @lazy_property
+        def value(self):
+            raise AssertionError("Computed eagerly")
+
+    Thing()
+
+
+def test_lazy_property_can_be_assigned():
+    class Thing:
+        @lazy_property
+        def value(self):
+            return "computed"
+
+    thing = Thing()
+    thing.value = "assigned"
+    assert thing.value == "assigned"